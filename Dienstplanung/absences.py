@@ -0,0 +1,248 @@
+from __future__ import annotations
+
+import os
+import time
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Iterable, Iterator, Union
+
+from models import DOCTOR_BY_NAME, Doctor
+
+MAX_WARNINGS = 1000
+
+
+@dataclass(frozen=True)
+class AbsenceInterval:
+    name: str
+    start: date
+    end: date
+
+    def days(self) -> Iterator[date]:
+        for offset in range((self.end - self.start).days + 1):
+            yield self.start + timedelta(days=offset)
+
+
+@dataclass(frozen=True)
+class ParseStats:
+    lines: int
+    intervals: int
+    warnings: int
+    seconds: float
+
+    @property
+    def lines_per_second(self) -> float:
+        return self.lines / self.seconds if self.seconds else 0.0
+
+
+def _parse_day(text: str) -> date | None:
+    try:
+        return date.fromisoformat(text)
+    except ValueError:
+        return None
+
+
+class AbsenceStream:
+    """Reads absence lines one at a time and yields merged intervals.
+
+    ``source`` is a file path or any iterable of lines. A line is either
+    ``2026-03-02: Koch, Frey`` or a range ``2026-03-01..2026-03-14: Koch``.
+    Days of the same doctor that touch or overlap are merged into one
+    interval, which is emitted as soon as a gap shows up, so memory only
+    grows with the number of doctors. Intervals therefore do not come out in
+    date order. Lines are numbered like in ``parse_absences`` (blank lines
+    are skipped), and at most ``MAX_WARNINGS`` warnings are kept.
+    """
+
+    def __init__(self, source: str | os.PathLike | Iterable[str], doctors: list[Doctor] | None = None) -> None:
+        self.source = source
+        self.known = DOCTOR_BY_NAME if doctors is None else {doctor.name for doctor in doctors}
+        self.warnings: list[str] = []
+        self.stats: ParseStats | None = None
+        self._dropped = 0
+
+    def _warn(self, message: str) -> None:
+        if len(self.warnings) < MAX_WARNINGS:
+            self.warnings.append(message)
+        else:
+            self._dropped += 1
+
+    def _lines(self) -> Iterator[str]:
+        if isinstance(self.source, (str, os.PathLike)):
+            with Path(self.source).open(encoding="utf-8") as handle:
+                yield from handle
+        else:
+            yield from self.source
+
+    def __iter__(self) -> Iterator[AbsenceInterval]:
+        started = time.perf_counter()
+        known = self.known
+        open_intervals: dict[str, list[date]] = {}
+        one_day = timedelta(days=1)
+        idx = intervals = 0
+
+        for raw_line in self._lines():
+            line = raw_line.strip()
+            if not line:
+                continue
+            idx += 1
+            if ":" not in line:
+                self._warn(f"Zeile {idx}: ':' fehlt.")
+                continue
+
+            date_part, names_part = line.split(":", 1)
+            date_part = date_part.strip()
+            first_text, separator, last_text = date_part.partition("..")
+            start = _parse_day(first_text.strip())
+            end = _parse_day(last_text.strip()) if separator else start
+            if start is None or end is None:
+                self._warn(f"Zeile {idx}: Ungueltiges Datum '{date_part}'.")
+                continue
+            if end < start:
+                self._warn(f"Zeile {idx}: Ungueltiger Zeitraum '{date_part}'.")
+                continue
+
+            names = {n.strip() for n in names_part.split(",") if n.strip()}
+            unknown = sorted([name for name in names if name not in known])
+            if unknown:
+                self._warn(f"Zeile {idx}: Unbekannte Namen: {', '.join(unknown)}.")
+
+            for name in names:
+                if name not in known:
+                    continue
+                current = open_intervals.get(name)
+                if current is not None and current[0] <= start <= current[1] + one_day:
+                    if end > current[1]:
+                        current[1] = end
+                    continue
+                if current is not None:
+                    intervals += 1
+                    yield AbsenceInterval(name, current[0], current[1])
+                open_intervals[name] = [start, end]
+
+        for name, (start, end) in open_intervals.items():
+            intervals += 1
+            yield AbsenceInterval(name, start, end)
+
+        if self._dropped:
+            self.warnings.append(f"{self._dropped} weitere Warnungen ausgelassen.")
+        self.stats = ParseStats(
+            lines=idx,
+            intervals=intervals,
+            warnings=len(self.warnings) - (1 if self._dropped else 0) + self._dropped,
+            seconds=time.perf_counter() - started,
+        )
+
+
+def absences_by_day(intervals: Iterable[AbsenceInterval]) -> dict[date, set[str]]:
+    absences: dict[date, set[str]] = {}
+    for interval in intervals:
+        for day in interval.days():
+            absences.setdefault(day, set()).add(interval.name)
+    return absences
+
+
+class AbsenceIndex:
+    """Merged, non-overlapping absence intervals per doctor.
+
+    Intervals of one doctor are kept as two sorted lists of start and end
+    days, so adding a range and asking whether a doctor is away on a day are
+    both binary searches. ``get`` mirrors ``dict.get`` on the per-day mapping
+    so the planner can take either form. ``version`` changes with every
+    modification and can be used to cache views of the index.
+    """
+
+    def __init__(self) -> None:
+        self._starts: dict[str, list[date]] = {}
+        self._ends: dict[str, list[date]] = {}
+        self.version = 0
+
+    @classmethod
+    def from_intervals(cls, intervals: Iterable[AbsenceInterval]) -> AbsenceIndex:
+        index = cls()
+        for interval in intervals:
+            index.add(interval.name, interval.start, interval.end)
+        return index
+
+    @classmethod
+    def union(cls, *indexes: AbsenceIndex) -> AbsenceIndex:
+        return cls.from_intervals(interval for index in indexes for interval in index.intervals())
+
+    def __len__(self) -> int:
+        return sum(len(starts) for starts in self._starts.values())
+
+    def add(self, name: str, start: date, end: date) -> None:
+        if end < start:
+            raise ValueError("Enddatum darf nicht vor dem Startdatum liegen.")
+        starts = self._starts.setdefault(name, [])
+        ends = self._ends.setdefault(name, [])
+        one_day = timedelta(days=1)
+        first = bisect_left(ends, start - one_day)
+        last = bisect_right(starts, end + one_day)
+        if first < last:
+            start = min(start, starts[first])
+            end = max(end, ends[last - 1])
+        starts[first:last] = [start]
+        ends[first:last] = [end]
+        self.version += 1
+
+    def remove(self, name: str, start: date, end: date) -> None:
+        # Cuts [start, end] out of the doctor's intervals.
+        if end < start:
+            raise ValueError("Enddatum darf nicht vor dem Startdatum liegen.")
+        starts = self._starts.get(name)
+        if not starts:
+            return
+        ends = self._ends[name]
+        first = bisect_left(ends, start)
+        last = bisect_right(starts, end)
+        if first >= last:
+            return
+        one_day = timedelta(days=1)
+        kept = []
+        if starts[first] < start:
+            kept.append((starts[first], start - one_day))
+        if ends[last - 1] > end:
+            kept.append((end + one_day, ends[last - 1]))
+        starts[first:last] = [interval[0] for interval in kept]
+        ends[first:last] = [interval[1] for interval in kept]
+        self.version += 1
+
+    def clear(self) -> None:
+        self._starts.clear()
+        self._ends.clear()
+        self.version += 1
+
+    def covers(self, name: str, day: date) -> bool:
+        starts = self._starts.get(name)
+        if not starts:
+            return False
+        position = bisect_right(starts, day) - 1
+        return position >= 0 and self._ends[name][position] >= day
+
+    def get(self, day: date, default: set[str] | None = None) -> set[str] | None:
+        names = {name for name in self._starts if self.covers(name, day)}
+        return names if names else default
+
+    def intervals(self, start: date | None = None, end: date | None = None) -> Iterator[AbsenceInterval]:
+        # Intervals overlapping [start, end], sorted by doctor and start day.
+        for name in sorted(self._starts):
+            starts, ends = self._starts[name], self._ends[name]
+            first = 0 if start is None else bisect_left(ends, start)
+            for position in range(first, len(starts)):
+                if end is not None and starts[position] > end:
+                    break
+                yield AbsenceInterval(name, starts[position], ends[position])
+
+    def window(self, start: date, end: date) -> dict[date, set[str]]:
+        absences: dict[date, set[str]] = {}
+        for interval in self.intervals(start, end):
+            clipped = AbsenceInterval(interval.name, max(interval.start, start), min(interval.end, end))
+            for day in clipped.days():
+                absences.setdefault(day, set()).add(interval.name)
+        return absences
+
+
+# The planner accepts absences either per day or as an interval index.
+Absences = Union[dict[date, set[str]], AbsenceIndex]
@@ -0,0 +1,69 @@
+"""Streams a large synthetic HR absence export through ``AbsenceStream``.
+
+Run from the Dienstplanung directory: ``python benchmarks/absence_import.py``.
+Writes ``--lines`` lines to a temporary file, parses them and reports lines
+per second. With ``--memory`` a second, much slower pass under tracemalloc
+reports the peak Python heap usage of the parse.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import tempfile
+import tracemalloc
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from absences import AbsenceStream  # noqa: E402
+from suite import synthetic_roster  # noqa: E402
+
+
+def write_export(path: Path, lines: int, doctors: int, seed: int = 0) -> None:
+    rng = random.Random(seed)
+    names = [doctor.name for doctor in synthetic_roster(doctors, seed)]
+    day = date(2020, 1, 1)
+    with path.open("w", encoding="utf-8") as handle:
+        for idx in range(lines):
+            if idx % 50 == 49:
+                day += timedelta(days=1)
+            picked = ", ".join(rng.sample(names, rng.randint(1, 4)))
+            if rng.random() < 0.2:
+                end = day + timedelta(days=rng.randint(1, 14))
+                handle.write(f"{day.isoformat()}..{end.isoformat()}: {picked}\n")
+            else:
+                handle.write(f"{day.isoformat()}: {picked}\n")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, default=1_000_000)
+    parser.add_argument("--doctors", type=int, default=300)
+    parser.add_argument("--memory", action="store_true")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "abwesenheiten.txt"
+        write_export(path, args.lines, args.doctors)
+        roster = synthetic_roster(args.doctors)
+        stream = AbsenceStream(path, roster)
+        intervals = sum(1 for _ in stream)
+        stats = stream.stats
+        print(f"{stats.lines} Zeilen ({path.stat().st_size / 1e6:.1f} MB) -> {intervals} Intervalle")
+        print(f"{stats.seconds:.2f} s, {stats.lines_per_second:,.0f} Zeilen/s, {stats.warnings} Warnungen")
+
+        if args.memory:
+            tracemalloc.start()
+            for _ in AbsenceStream(path, roster):
+                pass
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(f"Spitzenbedarf beim Einlesen: {peak / 1e6:.2f} MB")
+
+
+if __name__ == "__main__":
+    main()
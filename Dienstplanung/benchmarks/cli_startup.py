@@ -0,0 +1,79 @@
+"""Cold start of the command-line entry point.
+
+Run from the Dienstplanung directory: ``python benchmarks/cli_startup.py``.
+Every sample is a fresh ``python -m dienstplanung_cli`` process, so the
+numbers include interpreter start-up and all imports. The last two rows
+plan ``--departments`` departments once in a single process and once as one
+process per department, which is what a cron job calling the CLI in a loop
+would pay.
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+HEAVY_MODULES = ("streamlit", "pandas", "numpy", "pyarrow")
+
+
+def _run(args: list[str]) -> float:
+    started = time.perf_counter()
+    subprocess.run([sys.executable, "-m", "dienstplanung_cli", *args], cwd=ROOT, check=True, capture_output=True)
+    return time.perf_counter() - started
+
+
+def _median_ms(args: list[str], repeats: int) -> float:
+    return statistics.median(_run(args) for _ in range(repeats)) * 1000
+
+
+def loaded_modules(args: list[str]) -> set[str]:
+    """Top-level packages imported by a CLI run, taken from ``-X importtime``."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "dienstplanung_cli", *args],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+    )
+    modules = set()
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            modules.add(line.rsplit("|", 1)[1].strip().split(".")[0])
+    return modules
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Kaltstart der Kommandozeile messen.")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--departments", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    heavy = sorted(module for module in HEAVY_MODULES if module in loaded_modules(["--help"]))
+    print(f"--help laedt:                     {', '.join(heavy) or 'keine schweren Module'}")
+    print(f"--help:                           {_median_ms(['--help'], args.repeats):8.1f} ms")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        out = ["--out", tmp, "--quiet"]
+        print(f"1 Monat, CSV:                     {_median_ms(['--month', '2026-03', *out], args.repeats):8.1f} ms")
+        every_format = ["--format", "csv", "--format", "parquet", "--format", "json"]
+        all_formats = _median_ms(["--month", "2026-03", *every_format, *out], args.repeats)
+        print(f"1 Monat, CSV+Parquet+JSON:        {all_formats:8.1f} ms")
+        departments = []
+        for idx in range(args.departments):
+            directory = Path(tmp) / f"abteilung_{idx:02d}"
+            directory.mkdir()
+            departments += ["--department", str(directory)]
+        single = _run(["--month", "2026-03", *departments, *out])
+        separate = sum(_run(["--month", "2026-03", "--department", path, *out]) for path in departments[1::2])
+    print(f"{args.departments} Abteilungen, ein Prozess:      {single * 1000:8.1f} ms")
+    print(f"{args.departments} Abteilungen, je ein Prozess:   {separate * 1000:8.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+"""Planning time for many departments with rotating doctors.
+
+Run from the Dienstplanung directory: ``python benchmarks/department_scaling.py``.
+Splits a synthetic roster evenly into departments and lets a share of the
+doctors rotate into a second department, then plans one month for all of
+them with ``plan_departments``. Prints the wall time per worker count, the
+number of rounds and the spread of duties per FTE over all persons, and
+checks that no doctor is booked in two departments on the same day.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from departments import Department, MultiDepartmentPlan, plan_departments  # noqa: E402
+from plan_table import plan_assignments  # noqa: E402
+from planner import month_dates  # noqa: E402
+from shifts import plan_columns  # noqa: E402
+from suite import synthetic_absences, synthetic_roster  # noqa: E402
+
+
+def synthetic_departments(count: int, doctors: int, rotating: float = 0.1, seed: int = 0) -> list[Department]:
+    roster = synthetic_roster(doctors, seed)
+    members = [roster[number::count] for number in range(count)]
+    rng = random.Random(seed)
+    for number in range(count):
+        for doctor in list(members[number]):
+            if count > 1 and rng.random() < rotating:
+                other = rng.choice([other for other in range(count) if other != number])
+                members[other].append(doctor)
+    return [Department(f"Abteilung{number:02d}", tuple(members[number])) for number in range(count)]
+
+
+def double_bookings(result: MultiDepartmentPlan, departments: list[Department]) -> pd.DataFrame:
+    # Doctors with duties in more than one department on the same day.
+    frames = []
+    for department in departments:
+        plan_df = result.departments[department.name].plan_df
+        long_df = plan_assignments(plan_df, plan_columns() if department.shift_types is None else None)
+        frames.append(pd.DataFrame({"Datum": long_df["Datum"].astype(str), "Arzt": long_df["Arzt"].astype(str)}))
+        frames[-1]["Abteilung"] = department.name
+    booked = pd.concat(frames, ignore_index=True)
+    per_day = booked.groupby(["Datum", "Arzt"])["Abteilung"].nunique()
+    return per_day[per_day > 1].reset_index()
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Planung vieler Abteilungen mit rotierenden Aerzten messen.")
+    parser.add_argument("--departments", type=int, default=50)
+    parser.add_argument("--doctors", type=int, default=1000)
+    parser.add_argument("--rotating", type=float, default=0.1)
+    parser.add_argument("--workers", type=int, nargs="+", default=sorted({1, os.cpu_count() or 1}))
+    parser.add_argument("--year", type=int, default=2026)
+    parser.add_argument("--month", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    departments = synthetic_departments(args.departments, args.doctors, args.rotating)
+    roster = {doctor.name: doctor for department in departments for doctor in department.doctors}
+    absences = synthetic_absences(list(roster.values()), month_dates(args.year, args.month), "sparse")
+    print(f"{os.cpu_count()} Kerne, {args.departments} Abteilungen, {len(roster)} Aerzte")
+    for workers in args.workers:
+        started = time.perf_counter()
+        result = plan_departments(args.year, args.month, departments, absences, max_workers=workers)
+        elapsed = time.perf_counter() - started
+        print(f"{workers:2d} Worker: {elapsed:6.2f} s")
+
+    per_fte = result.stats_df["Dienste_pro_FTE"]
+    warnings = sum(len(plan.warnings) for plan in result.departments.values())
+    print(f"{len(result.shared)} Aerzte in mehreren Abteilungen, {len(result.rounds)} Runden, {warnings} Warnungen")
+    print(f"Dienste/FTE pro Person: min {per_fte.min():.2f}, Median {per_fte.median():.2f}, max {per_fte.max():.2f}")
+    conflicts = double_bookings(result, departments)
+    print(f"Doppelbuchungen ueber Abteilungen: {len(conflicts)}")
+    return 1 if len(conflicts) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
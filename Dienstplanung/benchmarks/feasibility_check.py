@@ -0,0 +1,55 @@
+"""Run time of the feasibility check before planning.
+
+Run from the Dienstplanung directory: ``python benchmarks/feasibility_check.py``.
+Checks one month of synthetic absences for growing rosters and compares
+the time with a greedy plan of the same month.
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from feasibility import check_feasibility  # noqa: E402
+from planner import generate_plan  # noqa: E402
+from suite import Case, synthetic_absences, synthetic_roster  # noqa: E402
+
+
+def _median_ms(call, repeats: int) -> float:
+    samples = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        call()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Laufzeit der Machbarkeitspruefung messen.")
+    parser.add_argument("--doctors", type=int, nargs="+", default=[12, 100, 1000])
+    parser.add_argument("--pattern", choices=("sparse", "worst"), default="worst")
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    print(f"{'Aerzte':>7} {'Pruefung':>10} {'Greedy':>10}  Ergebnis")
+    for size in args.doctors:
+        case = Case(doctors=size, months=1, pattern=args.pattern)
+        roster = synthetic_roster(size)
+        absences = synthetic_absences(roster, case.days, case.pattern)
+        year, month = case.days[0].year, case.days[0].month
+        report = check_feasibility(year, month, absences, doctors=roster)
+        check_ms = _median_ms(lambda: check_feasibility(year, month, absences, doctors=roster), args.repeats)
+        plan_ms = _median_ms(lambda: generate_plan(year, month, absences, size, doctors=roster), args.repeats)
+        verdict = "machbar" if report.feasible else f"{len(report.unfillable) + len(report.shortages)} Engpaesse"
+        print(f"{size:>7} {check_ms:>8.1f}ms {plan_ms:>8.1f}ms  {verdict}, {len(report.bottlenecks)} kritische Aerzte")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,212 @@
+"""Property-based fuzzing of the planner against the plan verifier.
+
+Run from the Dienstplanung directory::
+
+    python benchmarks/fuzz_planner.py --seconds 60
+    python benchmarks/fuzz_planner.py --engine optimize --cases 200
+    python benchmarks/fuzz_planner.py --seed 7 --start 1234 --cases 1
+
+Every case draws a random roster (size, capabilities, FTE, weekend caps),
+a random set of absence intervals, the month, ``max_parallel_absent`` and
+``friday_night_rest_days`` from its own seed, plans it and checks two
+properties: planning does not raise and :func:`verifier.verify_plan` finds
+no violation, and every slot left empty is reported by a "Kein Kandidat"
+warning. A failing case is
+shrunk by dropping absences and doctors as long as it still fails and
+printed with the arguments that replay it. The exit code is 1 on failure.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from dataclasses import dataclass, replace
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from absences import AbsenceIndex, AbsenceInterval  # noqa: E402
+from models import Doctor  # noqa: E402
+from planner import generate_plan  # noqa: E402
+from shifts import shift_slots  # noqa: E402
+from verifier import verify_plan  # noqa: E402
+
+ENGINES = ("greedy", "optimize")
+
+
+@dataclass(frozen=True)
+class FuzzCase:
+    seed: int
+    year: int
+    month: int
+    doctors: tuple[Doctor, ...]
+    absences: tuple[AbsenceInterval, ...]
+    max_parallel_absent: int
+    friday_night_rest_days: int
+    use_index: bool
+
+    def absence_input(self):
+        if self.use_index:
+            return AbsenceIndex.from_intervals(self.absences)
+        by_day: dict[date, set[str]] = {}
+        for interval in self.absences:
+            for day in interval.days():
+                by_day.setdefault(day, set()).add(interval.name)
+        return by_day
+
+
+def case_seed(seed: int, number: int) -> int:
+    return seed * 1_000_003 + number
+
+
+def random_case(seed: int) -> FuzzCase:
+    rng = random.Random(seed)
+    year, month = rng.randint(2024, 2028), rng.randint(1, 12)
+    doctors = []
+    for idx in range(rng.randint(2, 30)):
+        full_service = rng.random() < rng.choice((0.3, 0.6, 0.9))
+        doctors.append(
+            Doctor(
+                f"A{idx:02d}",
+                can_day=rng.random() < 0.9,
+                can_visit=rng.random() < 0.8,
+                can_full_service=full_service,
+                fte=rng.choice((0.25, 0.5, 0.75, 1.0, 1.0)),
+                max_weekends_per_month=rng.choice((None, None, 0, 1, 2)),
+            )
+        )
+    # Absences reach into the neighbouring months to cover rest windows and
+    # days off at the edges of the plan.
+    first = date(year, month, 1) - timedelta(days=10)
+    intervals = []
+    for _ in range(rng.choice((0, 2, 10, 40))):
+        start = first + timedelta(days=rng.randint(0, 50))
+        end = start + timedelta(days=rng.choice((0, 0, 1, 3, 7, 14)))
+        intervals.append(AbsenceInterval(rng.choice(doctors).name, start, end))
+    return FuzzCase(
+        seed=seed,
+        year=year,
+        month=month,
+        doctors=tuple(doctors),
+        absences=tuple(intervals),
+        max_parallel_absent=rng.randint(0, 5),
+        friday_night_rest_days=rng.choice((0, 1, 3, 3, 5, 8)),
+        use_index=rng.random() < 0.5,
+    )
+
+
+def _unwarned_gaps(plan_df, warnings: list[str]) -> list[str]:
+    # Every empty slot must come with the planner's "Kein Kandidat" warning,
+    # which names the slot by its anchor day (the Friday for weekend slots).
+    rows = {date.fromisoformat(row["Datum"]): row for row in plan_df.to_dict("records")}
+    warned = set(warnings)
+    return [
+        f"{slot.anchor.isoformat()}: {slot.shift_type.label} leer ohne Warnung."
+        for slot in shift_slots(sorted(rows), 0)
+        if not rows[slot.days[0]][slot.shift_type.column] and slot.warning not in warned
+    ]
+
+
+def check_case(case: FuzzCase, engine: str = "greedy", time_limit: float = 0.05) -> list[str]:
+    """Plans ``case`` and returns the broken properties as messages."""
+    absences = case.absence_input()
+    try:
+        plan_df, _, warnings = generate_plan(
+            case.year,
+            case.month,
+            absences,
+            case.max_parallel_absent,
+            case.friday_night_rest_days,
+            engine=engine,
+            time_limit=time_limit,
+            doctors=list(case.doctors),
+        )
+    except Exception as exc:  # noqa: BLE001 - a crash is a failing case as well
+        return [f"{type(exc).__name__}: {exc}"]
+    failures = list(verify_plan(plan_df, absences, case.friday_night_rest_days, list(case.doctors))["Meldung"])
+    return failures + _unwarned_gaps(plan_df, warnings)
+
+
+def shrink(case: FuzzCase, engine: str = "greedy", time_limit: float = 0.05) -> FuzzCase:
+    """Drops absences, then doctors, while the case keeps failing."""
+    changed = True
+    while changed:
+        changed = False
+        for position in range(len(case.absences) - 1, -1, -1):
+            smaller = replace(case, absences=case.absences[:position] + case.absences[position + 1 :])
+            if check_case(smaller, engine, time_limit):
+                case, changed = smaller, True
+        for position in range(len(case.doctors) - 1, -1, -1):
+            name = case.doctors[position].name
+            smaller = replace(
+                case,
+                doctors=case.doctors[:position] + case.doctors[position + 1 :],
+                absences=tuple(interval for interval in case.absences if interval.name != name),
+            )
+            if len(smaller.doctors) > 1 and check_case(smaller, engine, time_limit):
+                case, changed = smaller, True
+    return case
+
+
+def fuzz(
+    seed: int = 0,
+    cases: int | None = None,
+    seconds: float | None = None,
+    start: int = 0,
+    engine: str = "greedy",
+    time_limit: float = 0.05,
+) -> tuple[int, FuzzCase | None, list[str]]:
+    """Checks cases ``start``, ``start + 1``, ... until ``cases`` or ``seconds`` run out.
+
+    Returns the number of cases checked and the first failing case (already
+    shrunk) with its messages, or ``None``.
+    """
+    deadline = time.perf_counter() + seconds if seconds is not None else None
+    number = start
+    while (cases is None or number < start + cases) and (deadline is None or time.perf_counter() < deadline):
+        case = random_case(case_seed(seed, number))
+        number += 1
+        if check_case(case, engine, time_limit):
+            case = shrink(case, engine, time_limit)
+            return number - start, case, check_case(case, engine, time_limit)
+    return number - start, None, []
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Planer mit Zufallsfaellen gegen die Planpruefung testen.")
+    parser.add_argument("--seconds", type=float, help="Laufzeit (Standard: 60 s, falls --cases fehlt).")
+    parser.add_argument("--cases", type=int)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--start", type=int, default=0, help="Nummer des ersten Falls.")
+    parser.add_argument("--engine", choices=ENGINES, default="greedy")
+    parser.add_argument("--time-limit", type=float, default=0.05, help="Zeitlimit je Fall fuer --engine optimize.")
+    args = parser.parse_args(argv)
+    seconds = args.seconds if args.seconds is not None or args.cases is not None else 60.0
+
+    started = time.perf_counter()
+    checked, failing, messages = fuzz(args.seed, args.cases, seconds, args.start, args.engine, args.time_limit)
+    elapsed = time.perf_counter() - started
+    print(f"{checked} Faelle in {elapsed:.1f} s ({checked / elapsed * 60:.0f} pro Minute), Verfahren {args.engine}.")
+    if failing is None:
+        print("Keine Regelverletzung gefunden.")
+        return 0
+    number = args.start + checked - 1
+    print(f"Fall {number} verletzt Regeln (--seed {args.seed} --start {number} --cases 1):")
+    print(
+        f"  {failing.month:02d}/{failing.year}, max_parallel_absent={failing.max_parallel_absent}, "
+        f"friday_night_rest_days={failing.friday_night_rest_days}, AbsenceIndex={failing.use_index}"
+    )
+    for doctor in failing.doctors:
+        print(f"  {doctor}")
+    for interval in failing.absences:
+        print(f"  {interval.start.isoformat()}..{interval.end.isoformat()}: {interval.name}")
+    for message in messages:
+        print(f"  {message}")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,70 @@
+"""Multi-start greedy planning: quality spread and parallel speedup.
+
+Run from the Dienstplanung directory: ``python benchmarks/multi_start_speedup.py``.
+Plans the same month with ``--starts`` randomized tie-breaking variants for
+every worker count in ``--workers`` and prints wall time, speedup and where
+the plain greedy plan (start 0) lands among the variants. The speedup is
+bounded by the number of cores of the machine.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from multistart import multi_start  # noqa: E402
+from suite import Case, synthetic_absences, synthetic_roster  # noqa: E402
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Mehrfachstart der Greedy-Planung messen.")
+    parser.add_argument("--starts", type=int, default=64)
+    parser.add_argument("--doctors", type=int, default=30)
+    parser.add_argument("--workers", type=int, nargs="+", default=sorted({1, 2, 4, os.cpu_count() or 1}))
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    case = Case(doctors=args.doctors, months=1, pattern="sparse")
+    roster = synthetic_roster(args.doctors)
+    absences = synthetic_absences(roster, case.days, case.pattern, args.seed)
+    first = case.days[0]
+    print(f"{os.cpu_count()} Kerne, {args.starts} Starts, {args.doctors} Aerzte")
+
+    serial = None
+    for workers in args.workers:
+        started = time.perf_counter()
+        result = multi_start(
+            first.year,
+            first.month,
+            absences,
+            3,
+            starts=args.starts,
+            seed=args.seed,
+            doctors=roster,
+            max_workers=workers,
+        )
+        elapsed = time.perf_counter() - started
+        serial = serial or elapsed
+        print(f"{workers:2d} Worker: {elapsed * 1000:8.1f} ms, Speedup {serial / elapsed:4.2f}")
+
+    scores = result.scores
+    spread = scores["Spannweite_Dienste_pro_FTE"]
+    greedy = scores[scores["Start"] == 0].to_dict("records")[0]
+    print(f"Spannweite Dienste/FTE: min {spread.min():.2f}, Median {spread.median():.2f}, max {spread.max():.2f}")
+    print(f"Unbesetzt: min {scores['Unbesetzt'].min()}, max {scores['Unbesetzt'].max()}")
+    print(
+        f"Reiner Greedy-Plan: Rang {greedy['Rang']} von {len(scores)}, "
+        f"Spannweite {greedy['Spannweite_Dienste_pro_FTE']:.2f}, Unbesetzt {greedy['Unbesetzt']}"
+    )
+    print(f"Bester Start: Seed {result.seed}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
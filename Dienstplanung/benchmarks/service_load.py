@@ -0,0 +1,144 @@
+"""Load test for the planning service.
+
+Run from the Dienstplanung directory: ``python benchmarks/service_load.py``.
+Starts ``service.py`` on a free local port (or uses ``--url``) and lets
+``--concurrency`` client threads submit ``--requests`` jobs drawn from
+``--distinct`` different requests, so that identical in-flight requests
+are deduplicated. Clients retry after a 429 as the service asks them to,
+poll the job and fetch the result. Reports client-side latency and
+throughput next to the service's own ``/metrics``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from models import DOCTORS  # noqa: E402
+
+
+def _request(url: str, body: object = None) -> tuple[int, dict, dict]:
+    data = json.dumps(body).encode("utf-8") if body is not None else None
+    request = urllib.request.Request(url, data=data, headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(request, timeout=60) as response:
+            return response.status, dict(response.headers), json.loads(response.read())
+    except urllib.error.HTTPError as error:
+        return error.code, dict(error.headers), json.loads(error.read() or b"null")
+
+
+def request_bodies(distinct: int, seed: int = 0) -> list[dict]:
+    rng = random.Random(seed)
+    names = [doctor.name for doctor in DOCTORS]
+    bodies = []
+    for idx in range(distinct):
+        month = idx % 12 + 1
+        lines = [
+            f"2026-{month:02d}-{day:02d}..2026-{month:02d}-{day + rng.randint(0, 4):02d}: {name}"
+            for name, day in ((rng.choice(names), rng.randint(1, 20)) for _ in range(rng.randint(1, 4)))
+        ]
+        bodies.append({"month": f"2026-{month:02d}", "absences": lines})
+    return bodies
+
+
+def run_client(base: str, body: dict) -> tuple[float, int, bool]:
+    started = time.perf_counter()
+    retries = 0
+    while True:
+        status, headers, job = _request(f"{base}/jobs", body)
+        if status != 429:
+            break
+        retries += 1
+        time.sleep(float(headers.get("Retry-After", "1")) * random.uniform(0.1, 0.5))
+    if status != 202:
+        raise RuntimeError(f"Unerwartete Antwort {status}: {job}")
+    while True:
+        status, _, result = _request(f"{base}/jobs/{job['id']}/result")
+        if status != 409:
+            break
+        time.sleep(0.01)
+    if status != 200:
+        raise RuntimeError(f"Auftrag {job['id']} fehlgeschlagen: {result}")
+    return time.perf_counter() - started, retries, job["dedupliziert"]
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _start_service(workers: int, queue_size: int) -> tuple[subprocess.Popen, str]:
+    port = _free_port()
+    process = subprocess.Popen(
+        [sys.executable, "service.py", "--port", str(port), "--workers", str(workers), "--queue-size", str(queue_size)],
+        cwd=ROOT,
+    )
+    base = f"http://127.0.0.1:{port}"
+    deadline = time.perf_counter() + 30
+    while time.perf_counter() < deadline:
+        try:
+            if _request(f"{base}/health")[2].get("status") == "ok":
+                return process, base
+        except OSError:
+            pass
+        time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError("Dienst ist nicht gestartet.")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Lasttest fuer den Planungsdienst.")
+    parser.add_argument("--url", help="Laufenden Dienst verwenden statt einen zu starten.")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--distinct", type=int, default=50)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--queue-size", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    process = None
+    base = args.url.rstrip("/") if args.url else None
+    if base is None:
+        process, base = _start_service(args.workers, args.queue_size)
+    try:
+        rng = random.Random(args.seed)
+        pool = request_bodies(args.distinct, args.seed)
+        bodies = [rng.choice(pool) for _ in range(args.requests)]
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as clients:
+            results = list(clients.map(lambda body: run_client(base, body), bodies))
+        elapsed = time.perf_counter() - started
+        metrics = _request(f"{base}/metrics")[2]
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait(timeout=10)
+
+    latencies = sorted(latency for latency, _, _ in results)
+    p95 = latencies[max(0, int(0.95 * len(latencies)) - 1)]
+    print(f"Anfragen:              {len(results)} in {elapsed:.2f} s ({len(results) / elapsed:.1f}/s)")
+    print(f"Latenz Client:         p50 {statistics.median(latencies) * 1000:.1f} ms, p95 {p95 * 1000:.1f} ms")
+    print(f"429 mit Wiederholung:  {sum(retries for _, retries, _ in results)}")
+    print(f"Dedupliziert:          {sum(shared for _, _, shared in results)}")
+    print("Dienst /metrics:")
+    print(json.dumps(metrics, indent=1, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
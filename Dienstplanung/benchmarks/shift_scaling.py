@@ -0,0 +1,88 @@
+"""Planning time for a growing number of shift types.
+
+Run from the Dienstplanung directory: ``python benchmarks/shift_scaling.py``.
+Adds extra wards to the default shift types, alternating a weekday night
+(like a second ICU night) and a Sa/So day shift, and plans one month for a
+roster that grows with the number of shifts. The time per planned slot
+should stay flat, since every slot costs a few roster-wide array
+operations no matter how many shift types there are.
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from planner import generate_plan, month_dates  # noqa: E402
+from shifts import SHIFT_TYPES, ShiftType, shift_slots  # noqa: E402
+from suite import synthetic_roster  # noqa: E402
+
+
+def ward_types(count: int) -> tuple[ShiftType, ...]:
+    """The default shift types plus ``count`` extra ones."""
+    extra = []
+    for number in range(1, count + 1):
+        if number % 2:
+            extra.append(
+                ShiftType(
+                    f"ward_night_{number}",
+                    f"Nachtdienst_Station_{number}",
+                    f"Nachtdienst Station {number}",
+                    weekdays=(0, 1, 2, 3),
+                    off_days=(0, 1),
+                    phase="nachtdienste",
+                )
+            )
+        else:
+            extra.append(
+                ShiftType(
+                    f"ward_weekend_{number}",
+                    f"Wochenenddienst_Station_{number}",
+                    f"Sa/So Dienst Station {number}",
+                    weekdays=(4,),
+                    start=1,
+                    length=2,
+                    off_days=(5,),
+                    weekend=True,
+                )
+            )
+    return SHIFT_TYPES + tuple(extra)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Planungszeit bei wachsender Zahl von Schichtarten messen.")
+    parser.add_argument("--types", type=int, nargs="+", default=[6, 10, 15, 20])
+    parser.add_argument("--doctors-per-type", type=int, default=8)
+    parser.add_argument("--year", type=int, default=2026)
+    parser.add_argument("--month", type=int, default=3)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    print(f"{'Schichtarten':>12} {'Aerzte':>7} {'Slots':>6} {'Planung':>10} {'pro Slot':>10}  Warnungen")
+    for count in args.types:
+        shift_types = ward_types(max(count - len(SHIFT_TYPES), 0))
+        roster = synthetic_roster(args.doctors_per_type * len(shift_types))
+        slots = len(shift_slots(month_dates(args.year, args.month), 3, shift_types))
+        samples = []
+        for _ in range(args.repeats):
+            started = time.perf_counter()
+            _, _, warnings = generate_plan(
+                args.year, args.month, {}, len(roster), doctors=roster, shift_types=shift_types
+            )
+            samples.append(time.perf_counter() - started)
+        elapsed = statistics.median(samples) * 1000
+        print(
+            f"{len(shift_types):>12} {len(roster):>7} {slots:>6} {elapsed:>8.1f}ms "
+            f"{elapsed / slots * 1000:>8.0f}us  {len(warnings)}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,236 @@
+"""Benchmark suite for the Dienstplanung planner.
+
+Run from the Dienstplanung directory::
+
+    python benchmarks/suite.py --preset quick --output results.json
+    python benchmarks/suite.py --baseline benchmarks/baseline.json --threshold 0.25
+
+Every case builds a synthetic roster and absence pattern, renders the
+absences as text and times ``parse_absences`` plus the phases reported by
+the planner metrics (weekends, weekday nights, day shifts, DataFrames).
+With ``--baseline`` the phases are compared against an earlier result file
+and the exit code is 1 if any phase got slower than the threshold allows.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+from dataclasses import dataclass
+from datetime import date, timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from models import Doctor  # noqa: E402
+from planner import generate_horizon, parse_absences  # noqa: E402
+
+PATTERNS = ("sparse", "ferien", "worst")
+PRESETS = {
+    "quick": {"sizes": (12, 100, 300), "months": (1, 12), "patterns": PATTERNS},
+    "full": {"sizes": (12, 100, 300, 2000), "months": (1, 12, 36), "patterns": PATTERNS},
+}
+# School holiday windows as (month, first day, length in days).
+HOLIDAYS = ((4, 1, 14), (7, 25, 42), (10, 27, 7), (12, 23, 14))
+
+
+@dataclass(frozen=True)
+class Case:
+    doctors: int
+    months: int
+    pattern: str
+    year: int = 2026
+
+    @property
+    def name(self) -> str:
+        return f"{self.doctors}x{self.months}m-{self.pattern}"
+
+    @property
+    def days(self) -> list[date]:
+        start = date(self.year, 1, 1)
+        end_year, end_month = divmod(self.year * 12 + self.months, 12)
+        end = date(end_year, end_month + 1, 1) - timedelta(days=1)
+        return [start + timedelta(days=offset) for offset in range((end - start).days + 1)]
+
+
+def synthetic_roster(size: int, seed: int = 0) -> list[Doctor]:
+    rng = random.Random(seed)
+    doctors = []
+    for idx in range(size):
+        full_service = rng.random() < 0.6
+        doctors.append(
+            Doctor(
+                f"Arzt{idx:04d}",
+                can_day=True,
+                can_visit=rng.random() < 0.9,
+                can_full_service=full_service,
+                fte=rng.choice((0.5, 0.75, 1.0, 1.0, 1.0)),
+                max_weekends_per_month=rng.choice((None, None, 1, 2)) if full_service else None,
+            )
+        )
+    return doctors
+
+
+def synthetic_absences(doctors: list[Doctor], days: list[date], pattern: str, seed: int = 0) -> dict[date, set[str]]:
+    rng = random.Random(seed)
+    absences: dict[date, set[str]] = {}
+
+    def mark(name: str, day: date) -> None:
+        absences.setdefault(day, set()).add(name)
+
+    planned = set(days)
+    if pattern == "sparse":
+        for doctor in doctors:
+            for day in days:
+                if rng.random() < 0.02:
+                    mark(doctor.name, day)
+    elif pattern == "ferien":
+        # A third of the roster takes a block inside every school holiday.
+        years = sorted({day.year for day in days})
+        for doctor in doctors:
+            for year in years:
+                for month, first, length in HOLIDAYS:
+                    if rng.random() >= 1 / 3:
+                        continue
+                    start = date(year, month, first) + timedelta(days=rng.randrange(max(length - 7, 1)))
+                    for offset in range(rng.choice((7, 10, 14))):
+                        if start + timedelta(days=offset) in planned:
+                            mark(doctor.name, start + timedelta(days=offset))
+    elif pattern == "worst":
+        # Most full-service doctors are away on weekends, the rest of the
+        # roster on a rotating share of the weekdays.
+        for doctor in doctors:
+            for day in days:
+                share = 0.7 if day.weekday() >= 4 and doctor.can_full_service else 0.3
+                if rng.random() < share:
+                    mark(doctor.name, day)
+    else:
+        raise ValueError(f"Unbekanntes Abwesenheitsmuster '{pattern}'.")
+    return absences
+
+
+def absence_text(absences: dict[date, set[str]]) -> str:
+    return "\n".join(f"{day.isoformat()}: {', '.join(sorted(names))}" for day, names in sorted(absences.items()))
+
+
+def run_case(case: Case, repeats: int = 3, seed: int = 0) -> dict[str, object]:
+    doctors = synthetic_roster(case.doctors, seed)
+    days = case.days
+    raw = absence_text(synthetic_absences(doctors, days, case.pattern, seed))
+    max_parallel_absent = max(3, case.doctors // 4)
+
+    phases: dict[str, float] = {}
+
+    def keep_best(phase: str, seconds: float) -> None:
+        phases[phase] = min(phases.get(phase, float("inf")), seconds)
+
+    for _ in range(repeats):
+        started = time.perf_counter()
+        absences, _ = parse_absences(raw, doctors)
+        keep_best("parse_absences", time.perf_counter() - started)
+        horizon = generate_horizon(days[0], days[-1], absences, max_parallel_absent, doctors=doctors, metrics=True)
+        metrics = horizon.plan_df.attrs["metrics"]
+        for phase, seconds in metrics.phases.items():
+            keep_best(phase, seconds)
+
+    return {
+        "case": case.name,
+        "doctors": case.doctors,
+        "months": case.months,
+        "pattern": case.pattern,
+        "days": len(days),
+        "absence_lines": raw.count("\n") + 1 if raw else 0,
+        "warnings": len(horizon.warnings),
+        "picks": metrics.picks,
+        "average_pool": round(metrics.average_pool, 2),
+        "rejected": metrics.rejected,
+        "phases": {phase: round(seconds, 6) for phase, seconds in phases.items()},
+        "total": round(sum(phases.values()), 6),
+    }
+
+
+def compare(
+    results: list[dict[str, object]],
+    baseline: list[dict[str, object]],
+    threshold: float,
+    min_seconds: float = 0.001,
+) -> list[str]:
+    # Differences below ``min_seconds`` are timer noise and never flagged.
+    previous = {row["case"]: row for row in baseline}
+    regressions = []
+    for row in results:
+        old = previous.get(row["case"])
+        if old is None:
+            continue
+        pairs = [(phase, seconds, old["phases"].get(phase)) for phase, seconds in row["phases"].items()]
+        pairs.append(("total", row["total"], old["total"]))
+        for phase, seconds, before in pairs:
+            if before is None or seconds - before < min_seconds:
+                continue
+            if seconds > before * (1 + threshold):
+                regressions.append(f"{row['case']} {phase}: {before * 1000:.1f} ms -> {seconds * 1000:.1f} ms")
+    return regressions
+
+
+def _cases(args: argparse.Namespace) -> list[Case]:
+    preset = PRESETS[args.preset]
+    sizes = args.sizes or preset["sizes"]
+    months = args.months or preset["months"]
+    patterns = args.patterns or preset["patterns"]
+    return [Case(size, horizon, pattern) for size in sizes for horizon in months for pattern in patterns]
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark fuer den Dienstplan-Planer.")
+    parser.add_argument("--preset", choices=sorted(PRESETS), default="quick")
+    parser.add_argument("--sizes", type=int, nargs="+")
+    parser.add_argument("--months", type=int, nargs="+")
+    parser.add_argument("--patterns", choices=PATTERNS, nargs="+")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path)
+    parser.add_argument("--baseline", type=Path)
+    parser.add_argument("--threshold", type=float, default=0.25, help="erlaubte Verlangsamung, 0.25 = 25 %%")
+    args = parser.parse_args(argv)
+
+    results = []
+    for case in _cases(args):
+        row = run_case(case, repeats=args.repeats, seed=args.seed)
+        results.append(row)
+        phases = "  ".join(f"{phase} {seconds * 1000:8.1f}" for phase, seconds in row["phases"].items())
+        print(f"{case.name:<22} {phases}  gesamt {row['total'] * 1000:8.1f} ms")
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "machine": platform.machine(),
+            "repeats": args.repeats,
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))["results"]
+        regressions = compare(results, baseline, args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            return 1
+        print(f"Keine Regression gegenueber {args.baseline} (Schwelle {args.threshold:.0%}).")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
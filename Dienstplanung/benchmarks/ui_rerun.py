@@ -0,0 +1,103 @@
+"""Rerun latency of the Streamlit UI.
+
+Run from the Dienstplanung directory::
+
+    python benchmarks/ui_rerun.py --repeats 10
+
+Uses Streamlit's ``AppTest`` to click "Plan generieren" once and then edit
+the wish form repeatedly. ``AppTest`` always executes the whole script, so
+the "ganze App" rows show what every widget interaction cost before the UI
+was split into fragments. The "Fragment" rows execute only the fragment
+functions, which is what the server reruns for an interaction inside them.
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from streamlit.testing.v1 import AppTest
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from models import DOCTORS  # noqa: E402
+
+STATE_KEYS = ("urlaub_index", "sperr_index", "wunsch_entries", "plan_result")
+
+
+def _median_ms(samples: list[float]) -> float:
+    return statistics.median(samples) * 1000
+
+
+def _fragment_script(name: str) -> None:
+    import ui
+
+    ui._init_state()
+    fragment = getattr(ui, name)
+    if name == "_render_constraints_ui":
+        fragment(2026, 3)
+    else:
+        fragment()
+
+
+def _fragment_rerun(session: dict, name: str, repeats: int) -> list[float]:
+    at = AppTest.from_function(_fragment_script, args=(name,), default_timeout=60)
+    for key, value in session.items():
+        at.session_state[key] = value
+    at.run()
+    samples = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        at.run()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Rerun-Latenz der Streamlit-Oberflaeche.")
+    parser.add_argument("--repeats", type=int, default=10)
+    parser.add_argument("--range", choices=("Monat", "Ganzes Jahr"), default="Monat")
+    args = parser.parse_args(argv)
+    logging.getLogger("streamlit").setLevel(logging.CRITICAL)
+
+    at = AppTest.from_file(str(ROOT / "dienstplanung_app.py"), default_timeout=60)
+    at.run()
+    at.radio[0].set_value(args.range)
+    at.run()
+    started = time.perf_counter()
+    next(button for button in at.button if button.label == "Plan generieren").click().run()
+    generate = time.perf_counter() - started
+
+    names = [doctor.name for doctor in DOCTORS]
+    full = []
+    for idx in range(args.repeats):
+        started = time.perf_counter()
+        at.selectbox(key="wish_doc").set_value(names[idx % len(names)]).run()
+        full.append(time.perf_counter() - started)
+    if at.exception:
+        print(f"Fehler: {at.exception[0].value}")
+        return 1
+
+    print(f"Plan generieren ({args.range}):        {generate * 1000:8.1f} ms")
+    print(f"Wunsch bearbeiten, ganze App:     {_median_ms(full):8.1f} ms")
+
+    import ui
+
+    session = {key: at.session_state[key] for key in STATE_KEYS if key in at.session_state}
+    for label, name in (
+        ("Wunsch bearbeiten, Fragment:", "_render_constraints_ui"),
+        ("Planansicht, Fragment:", "_render_plan_view"),
+        ("Statistik, Fragment:", "_render_statistics"),
+    ):
+        if hasattr(ui, name):
+            print(f"{label:<34}{_median_ms(_fragment_rerun(session, name, args.repeats)):8.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,313 @@
+from __future__ import annotations
+
+import math
+import os
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from dataclasses import dataclass, field, replace
+from datetime import date, timedelta
+from typing import Callable, Iterable, Sequence, TypeVar
+
+import numpy as np
+import pandas as pd
+
+from absences import AbsenceIndex, Absences
+from models import Doctor
+from optimizer import Placement
+from planner import Commitments, _plan_frame, _run_from_placements, _run_planner, _stats_frame, month_dates
+from shifts import ShiftType, check_shift_types, days_after
+
+_Job = TypeVar("_Job")
+_Result = TypeVar("_Result")
+
+
+@dataclass(frozen=True)
+class Department:
+    name: str
+    doctors: tuple[Doctor, ...]
+    max_parallel_absent: int = 3
+    shift_types: tuple[ShiftType, ...] | None = None
+
+
+@dataclass
+class DepartmentPlan:
+    plan_df: pd.DataFrame
+    stats_df: pd.DataFrame
+    warnings: list[str]
+
+
+@dataclass
+class MultiDepartmentPlan:
+    departments: dict[str, DepartmentPlan]
+    stats_df: pd.DataFrame
+    rounds: list[list[str]]
+    shared: dict[str, list[str]] = field(repr=False)
+
+
+class ConflictIndex:
+    """Calendar and counts of the doctors who work in several departments.
+
+    Planned departments commit their slots; the duties, days off and weekend
+    counts of the shared doctors then apply to every department planned
+    later (see :meth:`commitments`), so nobody is booked twice on one day,
+    the rest rules hold across departments and fairness counts the person.
+    """
+
+    def __init__(self, names: Iterable[str], origin: date, n_days: int) -> None:
+        self.names = tuple(names)
+        self.index = {name: idx for idx, name in enumerate(self.names)}
+        self.origin = origin
+        shape = (len(self.names), n_days)
+        self.busy = np.zeros(shape, dtype=np.int8)
+        self.off = np.zeros(shape, dtype=bool)
+        self.rest_start = np.zeros(shape, dtype=bool)
+        self.duties = np.zeros(len(self.names), dtype=np.int64)
+        self.weekends = np.zeros(len(self.names), dtype=np.int64)
+        self.monthly_weekends: dict[tuple[int, int], np.ndarray] = defaultdict(
+            lambda: np.zeros(len(self.names), dtype=np.int64)
+        )
+
+    def col(self, day: date) -> int:
+        return (day - self.origin).days
+
+    def commit(self, placements: Iterable[Placement], shift_types: Sequence[ShiftType]) -> None:
+        by_key = {shift_type.key: shift_type for shift_type in shift_types}
+        for placement in placements:
+            idx = self.index.get(placement.name)
+            if idx is None:
+                continue
+            shift_type = by_key[placement.shift]
+            cols = [self.col(day) for day in placement.days]
+            self.busy[idx, cols] += 1
+            self.off[idx, [self.col(day) for day in placement.off_days]] = True
+            if shift_type.rest_before:
+                self.rest_start[idx, cols[0]] = True
+            self.duties[idx] += len(cols) * shift_type.weight
+            if placement.weekend_month is not None:
+                self.weekends[idx] += 1
+                self.monthly_weekends[placement.weekend_month][idx] += 1
+
+    def conflicts(self) -> list[tuple[str, date]]:
+        # Days on which a shared doctor holds more than one slot; empty as
+        # long as departments are only planned through plan_departments.
+        doc_idx, cols = np.nonzero(self.busy > 1)
+        return [(self.names[idx], self.origin + timedelta(days=int(col))) for idx, col in zip(doc_idx, cols)]
+
+    def commitments(self, names: Sequence[str], blocked: Iterable[str] = ()) -> Commitments:
+        # The committed state of ``names``; ``blocked`` doctors are
+        # unavailable on every day.
+        rows = [self.index[name] for name in names]
+        blocked = set(blocked)
+        blocked_rows = [position for position, name in enumerate(names) if name in blocked]
+        unavailable = self.off[rows]
+        unavailable[blocked_rows] = True
+        return Commitments(
+            tuple(names),
+            self.origin,
+            self.busy[rows],
+            unavailable,
+            self.rest_start[rows],
+            self.duties[rows],
+            self.weekends[rows],
+            {month_key: counts[rows] for month_key, counts in self.monthly_weekends.items()},
+        )
+
+
+@dataclass(frozen=True)
+class _DepartmentJob:
+    department: Department
+    days: list[date]
+    absences: dict[date, set[str]] = field(repr=False)
+    friday_night_rest_days: int
+    commitments: Commitments | None = field(repr=False)
+    placements: list[Placement] = field(default_factory=list, repr=False)
+    warnings: list[str] = field(default_factory=list)
+
+    @property
+    def shift_types(self) -> tuple[ShiftType, ...]:
+        return check_shift_types(self.department.shift_types)
+
+
+def _plan_slots(job: _DepartmentJob) -> tuple[list[Placement], list[str]]:
+    run = _run_planner(
+        job.days,
+        job.absences,
+        job.department.max_parallel_absent,
+        job.friday_night_rest_days,
+        job.department.doctors,
+        shift_types=job.shift_types,
+        commitments=job.commitments,
+        fill=False,
+    )
+    return run.placements, run.warnings
+
+
+def _plan_department(job: _DepartmentJob) -> DepartmentPlan:
+    run = _run_from_placements(
+        job.days,
+        job.absences,
+        job.department.max_parallel_absent,
+        job.friday_night_rest_days,
+        job.placements,
+        [],
+        job.department.doctors,
+        job.shift_types,
+        job.commitments,
+    )
+    plan_df = _plan_frame(run.board, job.days, job.absences)
+    return DepartmentPlan(plan_df, _stats_frame(run.duties, run.weekends, run.board.roster), job.warnings)
+
+
+def department_rounds(departments: Sequence[Department]) -> list[list[int]]:
+    """Groups departments without common doctors into rounds.
+
+    Each department joins the first round that has none of its doctors yet
+    (a greedy colouring of the graph of shared doctors), so the departments
+    of a round can be planned at the same time.
+    """
+    rounds: list[list[int]] = []
+    staffed: list[set[str]] = []
+    for position, department in enumerate(departments):
+        names = {doctor.name for doctor in department.doctors}
+        for number, taken in enumerate(staffed):
+            if not names & taken:
+                rounds[number].append(position)
+                taken |= names
+                break
+        else:
+            rounds.append([position])
+            staffed.append(names)
+    return rounds
+
+
+def _check_departments(departments: Sequence[Department]) -> dict[str, list[str]]:
+    # Departments per doctor name; a person must have the same FTE and
+    # weekend limit everywhere.
+    if not departments:
+        raise ValueError("Mindestens eine Abteilung ist noetig.")
+    if len({department.name for department in departments}) != len(departments):
+        raise ValueError("Abteilungsnamen muessen eindeutig sein.")
+    member_of: dict[str, list[str]] = defaultdict(list)
+    person: dict[str, Doctor] = {}
+    for department in departments:
+        names = [doctor.name for doctor in department.doctors]
+        if not names:
+            raise ValueError(f"Abteilung '{department.name}': Keine Aerzte gefunden.")
+        if len(set(names)) != len(names):
+            raise ValueError(f"Abteilung '{department.name}': Aerztenamen muessen eindeutig sein.")
+        check_shift_types(department.shift_types)
+        for doctor in department.doctors:
+            known = person.setdefault(doctor.name, doctor)
+            if (known.fte, known.max_weekends_per_month) != (doctor.fte, doctor.max_weekends_per_month):
+                raise ValueError(
+                    f"Arzt '{doctor.name}': FTE und Wochenendlimit muessen in allen Abteilungen gleich sein."
+                )
+            member_of[doctor.name].append(department.name)
+    return dict(member_of)
+
+
+def _department_absences(absences: dict[date, set[str]], names: set[str]) -> dict[date, set[str]]:
+    filtered = {}
+    for day, absent in absences.items():
+        if absent & names:
+            filtered[day] = absent & names
+    return filtered
+
+
+def _person_stats(plans: dict[str, DepartmentPlan], member_of: dict[str, list[str]]) -> pd.DataFrame:
+    frames = pd.concat([plan.stats_df for plan in plans.values()], ignore_index=True)
+    totals = frames.groupby("Arzt", sort=True).agg(
+        FTE=("FTE", "first"), Dienste_gesamt=("Dienste_gesamt", "sum"), Wochenenden=("Wochenenden", "sum")
+    )
+    stats_df = pd.DataFrame(
+        {
+            "Arzt": totals.index,
+            "Abteilungen": [", ".join(member_of[name]) for name in totals.index],
+            "FTE": totals["FTE"].to_numpy(),
+            "Dienste_gesamt": totals["Dienste_gesamt"].to_numpy(),
+            "Dienste_pro_FTE": (totals["Dienste_gesamt"] / totals["FTE"]).round(2).to_numpy(),
+            "Wochenenden": totals["Wochenenden"].to_numpy(),
+        }
+    )
+    return stats_df.sort_values(by="Dienste_pro_FTE", kind="stable").reset_index(drop=True)
+
+
+def plan_departments(
+    year: int,
+    month: int,
+    departments: Sequence[Department],
+    absences: Absences,
+    friday_night_rest_days: int = 3,
+    max_workers: int | None = None,
+) -> MultiDepartmentPlan:
+    """Plans one month for several departments that share doctors.
+
+    Departments are planned in rounds (:func:`department_rounds`), the
+    departments of a round in parallel worker processes. A
+    :class:`ConflictIndex` carries the slots of the doctors who work in
+    several departments from round to round: their duties and days off
+    block them in later departments and their duty and weekend counts
+    enter the fair order and the weekend limit there. Shifts staffed by
+    everyone (the day shift) are filled at the end, for a shared doctor
+    only in the first department listing them (the home department) and
+    on days without a duty or day off anywhere else. Without shared
+    doctors every department gets the plan of :func:`generate_plan`.
+
+    ``stats_df`` sums the duties and weekends of each person over all
+    departments. The result does not depend on ``max_workers``.
+    """
+    member_of = _check_departments(departments)
+    shared = {name: listed for name, listed in member_of.items() if len(listed) > 1}
+    days = month_dates(year, month)
+    pad_before = max(friday_night_rest_days, 1)
+    n_days = len(days) + pad_before + max(days_after(check_shift_types(d.shift_types)) for d in departments)
+    index = ConflictIndex(sorted(shared), days[0] - timedelta(days=pad_before), n_days)
+    last_day = index.origin + timedelta(days=n_days - 1)
+    if isinstance(absences, AbsenceIndex):
+        absences = absences.window(index.origin, last_day)
+    else:
+        absences = {day: names for day, names in absences.items() if index.origin <= day <= last_day}
+
+    jobs = [
+        _DepartmentJob(
+            department,
+            days,
+            _department_absences(absences, {doctor.name for doctor in department.doctors}),
+            friday_night_rest_days,
+            None,
+        )
+        for department in departments
+    ]
+    rounds = department_rounds(departments)
+    workers = min(max_workers or os.cpu_count() or 1, len(departments))
+
+    with ProcessPoolExecutor(max_workers=workers) if workers > 1 else nullcontext() as pool:
+
+        def run(function: Callable[[_Job], _Result], batch: list[_Job]) -> list[_Result]:
+            if pool is None:
+                return [function(job) for job in batch]
+            return list(pool.map(function, batch, chunksize=max(1, math.ceil(len(batch) / (workers * 4)))))
+
+        for positions in rounds:
+            batch = []
+            for position in positions:
+                names = [doctor.name for doctor in departments[position].doctors if doctor.name in shared]
+                batch.append(replace(jobs[position], commitments=index.commitments(names) if names else None))
+            for position, job, (placements, warnings) in zip(positions, batch, run(_plan_slots, batch)):
+                index.commit(placements, job.shift_types)
+                jobs[position] = replace(job, placements=placements, warnings=warnings)
+
+        # Day shifts of a shared doctor belong to their home department.
+        for position, department in enumerate(departments):
+            names = [doctor.name for doctor in department.doctors if doctor.name in shared]
+            away = [name for name in names if shared[name][0] != department.name]
+            jobs[position] = replace(jobs[position], commitments=index.commitments(names, away) if names else None)
+        plans = dict(zip([department.name for department in departments], run(_plan_department, jobs)))
+
+    return MultiDepartmentPlan(
+        departments=plans,
+        stats_df=_person_stats(plans, member_of),
+        rounds=[[departments[position].name for position in positions] for positions in rounds],
+        shared=shared,
+    )
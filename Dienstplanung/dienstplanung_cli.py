@@ -0,0 +1,298 @@
+"""Headless planning without Streamlit.
+
+Run from the Dienstplanung directory::
+
+    python -m dienstplanung_cli --roster aerzte.csv --absences abwesenheiten.txt --month 2026-03
+    python -m dienstplanung_cli --department stationen/kardio --department stationen/neuro --year 2026 --jobs 4
+
+A department directory holds ``roster.csv`` (or ``roster.json``),
+``absences.txt`` and optionally ``wishes.csv``; missing files mean the
+default roster, no absences and no wishes. Results are written to
+``<out>/<department>/dienstplan_<period>.<format>``.
+
+Only the standard library is imported at module level. pandas and the
+planner are loaded once the arguments are valid, pyarrow only for Parquet,
+so ``--help`` and argument errors return immediately and one process can
+plan many departments instead of paying the start-up once per department.
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+
+OUTPUT_FORMATS = ("csv", "parquet", "json")
+ENGINES = ("greedy", "optimize", "improve")
+ROSTER_FILES = ("roster.csv", "roster.json")
+ABSENCE_FILE = "absences.txt"
+WISH_FILE = "wishes.csv"
+
+
+@dataclass(frozen=True)
+class Department:
+    name: str
+    roster: Path | None
+    absences: Path | None
+    wishes: Path | None
+
+
+@dataclass(frozen=True)
+class PlanJob:
+    department: Department
+    periods: tuple[str, ...]
+    out: Path
+    formats: tuple[str, ...]
+    engine: str
+    max_parallel_absent: int
+    wish_weight: float
+
+
+def read_roster(path: Path) -> list:
+    """Reads doctors from CSV or JSON with the field names of ``Doctor``."""
+    from models import doctors_from_records
+
+    if path.suffix.lower() == ".json":
+        rows = json.loads(path.read_text(encoding="utf-8"))
+    else:
+        with path.open(encoding="utf-8", newline="") as handle:
+            rows = list(csv.DictReader(handle))
+    try:
+        return doctors_from_records(rows)
+    except ValueError as exc:
+        raise ValueError(f"{path}: {exc}") from None
+
+
+def _department(directory: Path) -> Department:
+    if not directory.is_dir():
+        raise ValueError(f"Abteilung '{directory}' ist kein Verzeichnis.")
+    roster = next((directory / name for name in ROSTER_FILES if (directory / name).exists()), None)
+    absences = directory / ABSENCE_FILE
+    wishes = directory / WISH_FILE
+    return Department(
+        name=directory.name,
+        roster=roster,
+        absences=absences if absences.exists() else None,
+        wishes=wishes if wishes.exists() else None,
+    )
+
+
+def _period(text: str) -> str:
+    try:
+        year, month = (int(part) for part in text.split("-"))
+        date(year, month, 1)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Ungueltiger Monat '{text}', erwartet JJJJ-MM.") from None
+    return f"{year:04d}-{month:02d}"
+
+
+def _write(plan_df, stats_df, warnings: list[str], assignments, job: PlanJob, period: str) -> list[Path]:
+    from plan_table import export_table, plan_payload
+
+    target = job.out / job.department.name
+    target.mkdir(parents=True, exist_ok=True)
+    stem = target / f"dienstplan_{period.replace('-', '_')}"
+    written = []
+    for fmt in job.formats:
+        path = stem.with_suffix(f".{fmt}")
+        if fmt == "csv":
+            export_table(plan_df, "csv", path)
+        elif fmt == "parquet":
+            export_table(assignments, "parquet", path)
+        else:
+            payload = {
+                "abteilung": job.department.name,
+                "zeitraum": period,
+                **plan_payload(plan_df, stats_df, warnings),
+            }
+            path.write_text(json.dumps(payload, ensure_ascii=False, indent=1), encoding="utf-8")
+        written.append(path)
+    return written
+
+
+def plan_period(
+    period: str,
+    absences,
+    max_parallel_absent: int,
+    engine: str = "greedy",
+    doctors: list | None = None,
+    wishes=None,
+    wish_weight: float = 1.0,
+):
+    """Plans a month ("JJJJ-MM") or a whole year ("JJJJ") like the UI does.
+
+    Returns ``plan_df``, ``stats_df``, the warnings and the long assignment
+    table. ``engine`` is one of :data:`ENGINES`; a year is always greedy.
+    """
+    from plan_table import plan_assignments
+    from planner import generate_horizon, generate_plan, improve_plan
+
+    if engine not in ENGINES:
+        raise ValueError(f"Unbekanntes Planungsverfahren '{engine}'.")
+    if len(period) == 4:
+        year = int(period)
+        horizon = generate_horizon(
+            start=date(year, 1, 1),
+            end=date(year, 12, 31),
+            absences=absences,
+            max_parallel_absent=max_parallel_absent,
+            doctors=doctors,
+            wishes=wishes,
+            wish_weight=wish_weight,
+        )
+        return horizon.plan_df, horizon.stats_df, horizon.warnings, horizon.assignments
+    year, month = (int(part) for part in period.split("-"))
+    plan_df, stats_df, warnings = generate_plan(
+        year=year,
+        month=month,
+        absences=absences,
+        max_parallel_absent=max_parallel_absent,
+        engine="optimize" if engine == "optimize" else "greedy",
+        doctors=doctors,
+        wishes=wishes,
+        wish_weight=wish_weight,
+    )
+    if engine == "improve":
+        plan_df, stats_df, warnings = improve_plan(
+            year=year,
+            month=month,
+            plan_df=plan_df,
+            absences=absences,
+            max_parallel_absent=max_parallel_absent,
+            doctors=doctors,
+            wishes=wishes,
+            wish_weight=wish_weight,
+        )
+    return plan_df, stats_df, warnings, plan_assignments(plan_df)
+
+
+def plan_department(job: PlanJob) -> tuple[str, list[Path], list[str]]:
+    """Plans all periods of one department and writes the output files."""
+    import pandas as pd
+
+    from absences import AbsenceIndex, AbsenceStream
+
+    department = job.department
+    doctors = read_roster(department.roster) if department.roster is not None else None
+    messages: list[str] = []
+    absences = AbsenceIndex()
+    if department.absences is not None:
+        stream = AbsenceStream(department.absences, doctors)
+        absences = AbsenceIndex.from_intervals(stream)
+        messages.extend(f"{department.absences.name}: {warning}" for warning in stream.warnings)
+    wishes = pd.read_csv(department.wishes, dtype=str, keep_default_na=False) if department.wishes else None
+
+    written = []
+    for period in job.periods:
+        plan_df, stats_df, warnings, assignments = plan_period(
+            period, absences, job.max_parallel_absent, job.engine, doctors, wishes, job.wish_weight
+        )
+        written.extend(_write(plan_df, stats_df, warnings, assignments, job, period))
+        messages.extend(f"{period}: {warning}" for warning in warnings)
+    return department.name, written, messages
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m dienstplanung_cli",
+        description="Dienstplaene ohne Oberflaeche fuer eine oder mehrere Abteilungen erstellen.",
+    )
+    source = parser.add_argument_group("Eingaben einer einzelnen Abteilung")
+    source.add_argument("--roster", type=Path, help="Aerzteliste als CSV oder JSON (Felder wie models.Doctor).")
+    source.add_argument("--absences", type=Path, help="Abwesenheiten im Format 'JJJJ-MM-TT[..JJJJ-MM-TT]: Name, ...'.")
+    source.add_argument("--wishes", type=Path, help="Wuensche als CSV mit Datum, Arzt, Wunsch und optional Gewicht.")
+    source.add_argument("--name", default="abteilung", help="Name des Ausgabeordners (Standard: abteilung).")
+    parser.add_argument(
+        "--department",
+        type=Path,
+        action="append",
+        default=[],
+        metavar="DIR",
+        help=f"Abteilungsordner mit {ROSTER_FILES[0]}, {ABSENCE_FILE} und {WISH_FILE}; mehrfach angebbar.",
+    )
+    period = parser.add_mutually_exclusive_group(required=True)
+    period.add_argument("--month", type=_period, action="append", metavar="JJJJ-MM", help="Monat; mehrfach angebbar.")
+    period.add_argument("--year", type=int, help="Ganzes Jahr als ein zusammenhaengender Plan.")
+    parser.add_argument("--out", type=Path, default=Path("dienstplaene"), help="Ausgabeverzeichnis.")
+    parser.add_argument("--format", choices=OUTPUT_FORMATS, action="append", dest="formats", help="Standard: csv.")
+    parser.add_argument("--engine", choices=ENGINES, default="greedy")
+    parser.add_argument("--max-parallel-absent", type=int, default=3)
+    parser.add_argument("--wish-weight", type=float, default=1.0)
+    parser.add_argument("--jobs", type=int, default=1, help="Abteilungen parallel in so vielen Prozessen planen.")
+    parser.add_argument("--quiet", action="store_true", help="Nur Fehler ausgeben.")
+    return parser
+
+
+def _jobs(args: argparse.Namespace, parser: argparse.ArgumentParser) -> list[PlanJob]:
+    if args.year is not None and args.engine != "greedy":
+        parser.error("--year unterstuetzt nur --engine greedy.")
+    if args.department and (args.roster or args.absences or args.wishes):
+        parser.error("--department kann nicht mit --roster, --absences oder --wishes kombiniert werden.")
+    for path in (args.roster, args.absences, args.wishes):
+        if path is not None and not path.is_file():
+            parser.error(f"Datei '{path}' nicht gefunden.")
+    try:
+        departments = [_department(directory) for directory in args.department]
+    except ValueError as exc:
+        parser.error(str(exc))
+    if not departments:
+        departments = [Department(args.name, args.roster, args.absences, args.wishes)]
+    if len({department.name for department in departments}) != len(departments):
+        parser.error("Abteilungsordner muessen unterschiedliche Namen haben.")
+    periods = (str(args.year),) if args.year is not None else tuple(dict.fromkeys(args.month))
+    formats = tuple(dict.fromkeys(args.formats or ["csv"]))
+    return [
+        PlanJob(department, periods, args.out, formats, args.engine, args.max_parallel_absent, args.wish_weight)
+        for department in departments
+    ]
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    jobs = _jobs(args, parser)
+    started = time.perf_counter()
+
+    failed = 0
+    if args.jobs > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=min(args.jobs, len(jobs))) as pool:
+            futures = [pool.submit(plan_department, job) for job in jobs]
+            results = []
+            for job, future in zip(jobs, futures):
+                try:
+                    results.append(future.result())
+                except (OSError, ValueError) as exc:
+                    failed += 1
+                    print(f"{job.department.name}: Fehler: {exc}", file=sys.stderr)
+    else:
+        results = []
+        for job in jobs:
+            try:
+                results.append(plan_department(job))
+            except (OSError, ValueError) as exc:
+                failed += 1
+                print(f"{job.department.name}: Fehler: {exc}", file=sys.stderr)
+
+    for name, written, messages in results:
+        if args.quiet:
+            continue
+        for message in messages:
+            print(f"{name}: {message}", file=sys.stderr)
+        for path in written:
+            print(path)
+    if not args.quiet:
+        print(
+            f"{len(results)} Abteilung(en) in {time.perf_counter() - started:.2f} s geplant, {failed} fehlgeschlagen.",
+            file=sys.stderr,
+        )
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
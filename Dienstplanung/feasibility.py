@@ -0,0 +1,272 @@
+from __future__ import annotations
+
+import calendar
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Sequence
+
+from absences import Absences
+from models import Doctor, Roster
+from optimizer import SlotModel
+from shifts import ShiftType, check_shift_types
+
+
+@dataclass(frozen=True)
+class Shortage:
+    """Slots that together have fewer eligible doctors than they need."""
+
+    scope: str
+    slots: tuple[str, ...]
+    doctors: tuple[str, ...]
+    missing: int
+
+
+@dataclass
+class FeasibilityReport:
+    slots: int
+    unfillable: list[str]
+    shortages: list[Shortage]
+    # Doctor -> slots that cannot all be staffed without them.
+    bottlenecks: dict[str, list[str]] = field(default_factory=dict)
+    seconds: float = 0.0
+
+    @property
+    def feasible(self) -> bool:
+        return not self.unfillable and not self.shortages
+
+    def messages(self) -> list[str]:
+        messages = [f"{slot}: kein Arzt verfuegbar." for slot in self.unfillable]
+        for shortage in self.shortages:
+            doctors = ", ".join(shortage.doctors) or "niemand"
+            messages.append(
+                f"{shortage.scope}: {shortage.missing} von {len(shortage.slots)} Diensten nicht besetzbar "
+                f"({'; '.join(shortage.slots)}), verfuegbar: {doctors}."
+            )
+        return messages
+
+
+def _bits(mask: int):
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def _match(eligible: list[int], capacity: list[int]) -> list[int]:
+    """Maximum b-matching of slots to doctors by augmenting paths.
+
+    ``eligible`` holds one doctor bitmask per slot, ``capacity`` how many of
+    the slots a doctor may take. Returns the doctor per slot or -1.
+    """
+    owner = [-1] * len(eligible)
+    held: dict[int, list[int]] = {}
+
+    def augment(k: int, seen: list[int]) -> bool:
+        for idx in _bits(eligible[k] & ~seen[0]):
+            seen[0] |= 1 << idx
+            slots = held.setdefault(idx, [])
+            if len(slots) < capacity[idx]:
+                slots.append(k)
+                owner[k] = idx
+                return True
+            for position, other in enumerate(slots):
+                if augment(other, seen):
+                    slots[position] = k
+                    owner[k] = idx
+                    return True
+        return False
+
+    for k in range(len(eligible)):
+        augment(k, [0])
+    return owner
+
+
+def _violator(eligible: list[int], owner: list[int]) -> tuple[set[int], int]:
+    # Slots reachable from the unmatched ones by alternating paths form the
+    # Hall violator; their eligible doctors are all used up inside the set.
+    stack = [k for k, idx in enumerate(owner) if idx < 0]
+    slots = set(stack)
+    doctors = 0
+    while stack:
+        k = stack.pop()
+        for idx in _bits(eligible[k] & ~doctors):
+            doctors |= 1 << idx
+            for other, holder in enumerate(owner):
+                if holder == idx and other not in slots:
+                    slots.add(other)
+                    stack.append(other)
+    return slots, doctors
+
+
+def _weekend_flow(eligible: list[int], weekends: list[int], capacity: list[int]) -> tuple[int, set[int], int]:
+    """Max flow of weekend slots to doctors, at most one slot per weekend each.
+
+    Source -> slot (1) -> doctor on that weekend (1) -> doctor (``capacity``)
+    -> sink. Returns the number of slots left over and, from the minimum
+    cut, the slots and doctors that cause it.
+    """
+    residual: dict[tuple, dict[tuple, int]] = {}
+
+    def edge(tail: tuple, head: tuple, amount: int) -> None:
+        residual.setdefault(tail, {})[head] = residual.get(tail, {}).get(head, 0) + amount
+        residual.setdefault(head, {}).setdefault(tail, 0)
+
+    source, sink = ("source",), ("sink",)
+    for k, mask in enumerate(eligible):
+        edge(source, ("slot", k), 1)
+        for idx in _bits(mask):
+            edge(("slot", k), ("weekend", idx, weekends[k]), 1)
+            residual[("weekend", idx, weekends[k])][("doctor", idx)] = 1
+            residual.setdefault(("doctor", idx), {}).setdefault(("weekend", idx, weekends[k]), 0)
+            residual[("doctor", idx)][sink] = capacity[idx]
+            residual.setdefault(sink, {}).setdefault(("doctor", idx), 0)
+
+    def reachable() -> dict[tuple, tuple | None]:
+        parent: dict[tuple, tuple | None] = {source: None}
+        queue = deque([source])
+        while queue and sink not in parent:
+            node = queue.popleft()
+            for head, amount in residual.get(node, {}).items():
+                if amount > 0 and head not in parent:
+                    parent[head] = node
+                    queue.append(head)
+        return parent
+
+    flow = 0
+    while True:
+        parent = reachable()
+        if sink not in parent:
+            break
+        node = sink
+        while parent[node] is not None:
+            tail = parent[node]
+            residual[tail][node] -= 1
+            residual[node][tail] += 1
+            node = tail
+        flow += 1
+    slots = {node[1] for node in parent if node[0] == "slot"}
+    doctors = 0
+    for node in parent:
+        if node[0] in ("weekend", "doctor"):
+            doctors |= 1 << node[1]
+    return len(eligible) - flow, slots, doctors
+
+
+def _shortfall(eligible: list[int], weekends: list[int] | None, capacity: list[int]) -> tuple[int, set[int], int]:
+    if weekends is not None:
+        return _weekend_flow(eligible, weekends, capacity)
+    owner = _match(eligible, capacity)
+    missing = sum(idx < 0 for idx in owner)
+    if not missing:
+        return 0, set(), 0
+    slots, doctors = _violator(eligible, owner)
+    return missing, slots, doctors
+
+
+def _groups(model: SlotModel, fillable: list[int]) -> list[tuple[str, tuple[int, ...]]]:
+    # On each day the slots covering it need different doctors. A slot whose
+    # days off or rest window cover the day excludes all of them as well, but
+    # two such slots do not exclude each other, so each one forms its own group.
+    covering: dict[int, list[int]] = {}
+    blocking: dict[int, list[int]] = {}
+    for k in fillable:
+        for col in model.cols[k]:
+            covering.setdefault(col, []).append(k)
+        for col in set(model.off_cols[k]) | set(model.rest_cols[k]):
+            if col not in model.cols[k]:
+                blocking.setdefault(col, []).append(k)
+    groups: dict[tuple[int, ...], str] = {}
+    for col, slots in sorted(covering.items()):
+        scope = (model.origin + timedelta(days=col)).isoformat()
+        for extra in blocking.get(col) or [None]:
+            group = tuple(sorted(slots if extra is None else [*slots, extra]))
+            if len(group) > 1:
+                groups.setdefault(group, scope)
+    return [(scope, group) for group, scope in groups.items()]
+
+
+def check_feasibility(
+    year: int,
+    month: int,
+    absences: Absences,
+    friday_night_rest_days: int = 3,
+    doctors: list[Doctor] | Roster | None = None,
+    shift_types: Sequence[ShiftType] | None = None,
+) -> FeasibilityReport:
+    """Finds night, weekend, visit and Friday slots no valid plan can staff.
+
+    Each slot is matched against the doctors that are qualified and not
+    absent on its days. Two necessary conditions are checked: the slots that
+    need different doctors on one day (including days off after a night and
+    the rest window before a weekend night) as a bipartite matching, and the
+    weekend slots of a month as a max flow that respects one slot per
+    weekend and ``max_weekends_per_month``. A shortage is reported with the
+    slots and the doctors that are all used up among them (the minimum cut).
+    A doctor is a bottleneck when a day's matching fails without them or
+    when they are a slot's only candidate. Rules that depend on earlier
+    choices are relaxed, so a feasible report does not guarantee a plan
+    without warnings; a shortage does prove that warnings are unavoidable.
+    """
+    started = time.perf_counter()
+    _, last_day = calendar.monthrange(year, month)
+    days = [date(year, month, day) for day in range(1, last_day + 1)]
+    model = SlotModel(days, absences, friday_night_rest_days, doctors, check_shift_types(shift_types))
+    labels = [f"{slot.days[0].isoformat()} {slot.shift_type.label}" for slot in model.slots]
+    no_weekends = sum(1 << idx for idx, cap in enumerate(model.caps) if cap is not None and cap <= 0)
+
+    eligible = []
+    for k, cols in enumerate(model.cols):
+        blocked = no_weekends if model.month[k] >= 0 else 0
+        for col in cols:
+            blocked |= model.absent[col]
+        eligible.append(model.capable[k] & ~blocked)
+    unfillable = [k for k, mask in enumerate(eligible) if not mask]
+    fillable = [k for k, mask in enumerate(eligible) if mask]
+
+    checks: list[tuple[str, tuple[int, ...], list[int] | None, list[int]]] = [
+        (scope, group, None, [1] * len(model.names)) for scope, group in _groups(model, fillable)
+    ]
+    # Weekend slots of one month: nobody works two of them on the same
+    # weekend, and nobody more weekends than ``max_weekends_per_month``.
+    for position, (weekend_year, weekend_month) in enumerate(model.weekend_months):
+        group = tuple(k for k in fillable if model.month[k] == position)
+        capacity = [len(group) if cap is None else cap for cap in model.caps]
+        weekends = [model.cols[k][-1] for k in group]
+        checks.append((f"Wochenenden {weekend_month:02d}/{weekend_year}", group, weekends, capacity))
+
+    shortages: list[Shortage] = []
+    bottlenecks: dict[str, set[str]] = {}
+    for scope, group, weekends, capacity in checks:
+        masks = [eligible[k] for k in group]
+        missing, slots, doctors = _shortfall(masks, weekends, capacity)
+        if missing:
+            shortages.append(
+                Shortage(
+                    scope=scope,
+                    slots=tuple(labels[group[k]] for k in sorted(slots)),
+                    doctors=tuple(model.names[idx] for idx in _bits(doctors)),
+                    missing=missing,
+                )
+            )
+            continue
+        if weekends is not None:
+            continue
+        # Only doctors used by a maximum matching can be indispensable.
+        for idx in sorted(set(_match(masks, capacity))):
+            without = [mask & ~(1 << idx) for mask in masks]
+            missing, slots, _ = _shortfall(without, None, capacity)
+            if missing:
+                bottlenecks.setdefault(model.names[idx], set()).update(labels[group[k]] for k in slots)
+    for k in fillable:
+        if eligible[k] & (eligible[k] - 1) == 0:
+            bottlenecks.setdefault(model.names[eligible[k].bit_length() - 1], set()).add(labels[k])
+
+    return FeasibilityReport(
+        slots=len(model.slots),
+        unfillable=[labels[k] for k in unfillable],
+        shortages=shortages,
+        bottlenecks={name: sorted(slots) for name, slots in sorted(bottlenecks.items())},
+        seconds=time.perf_counter() - started,
+    )
@@ -1,6 +1,15 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+import hashlib
+import json
+from dataclasses import asdict, dataclass, field
+from functools import cached_property, lru_cache
+from typing import Any, Iterable, Iterator, Mapping
+
+import numpy as np
+
+_TRUE = {"1", "true", "ja", "yes", "x"}
+_FALSE = {"0", "false", "nein", "no", ""}
 
 
 @dataclass(frozen=True)
@@ -35,3 +44,140 @@ DOCTORS: list[Doctor] = [
 ]
 
 DOCTOR_BY_NAME = {doctor.name: doctor for doctor in DOCTORS}
+
+CAPABILITIES = ("day", "visit", "full")
+# Weekend cap of doctors without max_weekends_per_month.
+NO_WEEKEND_CAP = np.iinfo(np.int32).max
+
+
+@dataclass(frozen=True, eq=False)
+class Roster:
+    """A roster compiled for planning, see :func:`compile_roster`.
+
+    Doctors are addressed by their integer ID, the position in ``doctors``.
+    Capabilities are boolean arrays and bitmasks (bit ``idx`` for doctor
+    ``idx``), ``pools`` holds the IDs per capability in roster order and
+    ``name_rank`` the alphabetical position of each name, which breaks ties
+    like the name itself. Names are only needed again for output. Iterating
+    yields the doctors, so a roster can stand in for a list of them.
+    """
+
+    doctors: tuple[Doctor, ...]
+    names: tuple[str, ...] = field(init=False)
+    index: dict[str, int] = field(init=False)
+    capable: dict[str, np.ndarray] = field(init=False)
+    masks: dict[str, int] = field(init=False)
+    pools: dict[str, np.ndarray] = field(init=False)
+    fte: np.ndarray = field(init=False)
+    weekend_caps: np.ndarray = field(init=False)
+    name_rank: np.ndarray = field(init=False)
+
+    def __post_init__(self) -> None:
+        names = tuple(doctor.name for doctor in self.doctors)
+        flags = {
+            "day": [doctor.can_day for doctor in self.doctors],
+            "visit": [doctor.can_visit for doctor in self.doctors],
+            "full": [doctor.can_full_service for doctor in self.doctors],
+        }
+        capable = {key: np.array(flag, dtype=bool) for key, flag in flags.items()}
+        caps = [NO_WEEKEND_CAP if d.max_weekends_per_month is None else d.max_weekends_per_month for d in self.doctors]
+        rank = np.empty(len(names), dtype=np.int64)
+        rank[sorted(range(len(names)), key=names.__getitem__)] = np.arange(len(names))
+        compiled = {
+            "names": names,
+            "index": {name: idx for idx, name in enumerate(names)},
+            "capable": capable,
+            "masks": {key: sum(1 << int(idx) for idx in np.flatnonzero(mask)) for key, mask in capable.items()},
+            "pools": {key: np.flatnonzero(mask) for key, mask in capable.items()},
+            "fte": np.array([doctor.fte for doctor in self.doctors], dtype=float),
+            "weekend_caps": np.array(caps, dtype=np.int64),
+            "name_rank": rank,
+        }
+        # The compiled roster is cached and shared, so its arrays are read-only.
+        for array in [compiled["fte"], compiled["weekend_caps"], rank, *capable.values(), *compiled["pools"].values()]:
+            array.flags.writeable = False
+        for key, value in compiled.items():
+            object.__setattr__(self, key, value)
+
+    def __len__(self) -> int:
+        return len(self.doctors)
+
+    def __iter__(self) -> Iterator[Doctor]:
+        return iter(self.doctors)
+
+    @cached_property
+    def fingerprint(self) -> str:
+        payload = json.dumps([asdict(doctor) for doctor in self.doctors], sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    @property
+    def can_day(self) -> np.ndarray:
+        return self.capable["day"]
+
+    @property
+    def can_visit(self) -> np.ndarray:
+        return self.capable["visit"]
+
+    @property
+    def can_full_service(self) -> np.ndarray:
+        return self.capable["full"]
+
+    def names_of(self, ids: Iterable[int]) -> list[str]:
+        return [self.names[idx] for idx in ids]
+
+
+@lru_cache(maxsize=64)
+def _compile(doctors: tuple[Doctor, ...]) -> Roster:
+    return Roster(doctors)
+
+
+def compile_roster(doctors: Iterable[Doctor] | Roster | None = None) -> Roster:
+    """Compiles ``doctors`` (default :data:`DOCTORS`) once and reuses the result.
+
+    Rosters are cached by content, so every planning run, the statistics
+    and the UI share one compiled roster per distinct doctor list.
+    """
+    if isinstance(doctors, Roster):
+        return doctors
+    return _compile(tuple(DOCTORS if doctors is None else doctors))
+
+
+def _flag(value: Any, field_name: str, row: int) -> bool:
+    text = str(value).strip().lower()
+    if text in _TRUE:
+        return True
+    if text in _FALSE:
+        return False
+    raise ValueError(f"Zeile {row}: Ungueltiger Wert '{value}' fuer {field_name}.")
+
+
+def doctors_from_records(rows: Iterable[Mapping[str, Any]]) -> list[Doctor]:
+    """Builds a roster from dicts with the field names of ``Doctor``.
+
+    Values may be strings as read from CSV ("1"/"0", "ja"/"nein") or JSON
+    types; missing capability flags default to day and visit duty only.
+    """
+    doctors = []
+    for row_number, row in enumerate(rows, start=1):
+        name = str(row.get("name") or "").strip()
+        if not name:
+            raise ValueError(f"Zeile {row_number}: Name fehlt.")
+        max_weekends = row.get("max_weekends_per_month")
+        fte = float(row["fte"]) if row.get("fte") not in (None, "") else 1.0
+        if fte <= 0:
+            raise ValueError(f"Zeile {row_number}: FTE muss groesser als 0 sein.")
+        doctors.append(
+            Doctor(
+                name,
+                can_day=_flag(row.get("can_day", "1"), "can_day", row_number),
+                can_visit=_flag(row.get("can_visit", "1"), "can_visit", row_number),
+                can_full_service=_flag(row.get("can_full_service", "0"), "can_full_service", row_number),
+                fte=fte,
+                max_weekends_per_month=int(max_weekends) if max_weekends not in (None, "") else None,
+            )
+        )
+    if not doctors:
+        raise ValueError("Keine Aerzte gefunden.")
+    if len({doctor.name for doctor in doctors}) != len(doctors):
+        raise ValueError("Aerztenamen muessen eindeutig sein.")
+    return doctors
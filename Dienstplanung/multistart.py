@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import math
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+
+import pandas as pd
+
+from absences import Absences
+from models import Doctor, Roster, compile_roster
+from planner import generate_plan
+from scenarios import plan_scores
+from wishes import WishInput
+
+# Lower is better in every column but the wish rate; the start number keeps
+# the order total, so the winner does not depend on the worker count.
+RANK_COLUMNS = ["Unbesetzt", "Warnungen", "Spannweite_Dienste_pro_FTE", "Wochenenden_Spannweite", "Wunschverfehlung"]
+
+
+@dataclass(frozen=True)
+class _Start:
+    start: int
+    seed: int | None
+    year: int
+    month: int
+    absences: Absences = field(repr=False)
+    max_parallel_absent: int
+    friday_night_rest_days: int
+    doctors: list[Doctor] | Roster | None = field(repr=False)
+    wishes: WishInput | None = field(repr=False)
+    wish_weight: float
+
+    def plan(self) -> tuple[pd.DataFrame, pd.DataFrame, list[str]]:
+        return generate_plan(
+            self.year,
+            self.month,
+            self.absences,
+            self.max_parallel_absent,
+            self.friday_night_rest_days,
+            doctors=self.doctors,
+            wishes=self.wishes,
+            wish_weight=self.wish_weight,
+            seed=self.seed,
+        )
+
+
+@dataclass
+class MultiStartResult:
+    plan_df: pd.DataFrame
+    stats_df: pd.DataFrame
+    warnings: list[str]
+    seed: int | None
+    scores: pd.DataFrame
+
+
+def start_seeds(starts: int, seed: int = 0) -> list[int | None]:
+    # Start 0 is the plain greedy plan, so more starts never make it worse.
+    rng = random.Random(seed)
+    return [None] + [rng.getrandbits(32) for _ in range(starts - 1)]
+
+
+def _score(job: _Start) -> dict[str, object]:
+    plan_df, stats_df, warnings = job.plan()
+    scores = plan_scores(plan_df, stats_df, warnings, compile_roster(job.doctors))
+    wish_rate = scores.setdefault("Wunscherfuellung", 1.0)
+    return {"Start": job.start, "Seed": job.seed, **scores, "Wunschverfehlung": round(1.0 - wish_rate, 4)}
+
+
+def multi_start(
+    year: int,
+    month: int,
+    absences: Absences,
+    max_parallel_absent: int,
+    friday_night_rest_days: int = 3,
+    starts: int = 16,
+    seed: int = 0,
+    doctors: list[Doctor] | Roster | None = None,
+    wishes: WishInput | None = None,
+    wish_weight: float = 1.0,
+    max_workers: int | None = None,
+) -> MultiStartResult:
+    """Runs ``starts`` greedy plans with randomized tie-breaking and keeps the best.
+
+    Every start is scored on unfilled slots, warnings, the spread of duties
+    per FTE and of weekends, and the weighted wish fulfilment, and ranked in
+    that order. ``scores`` holds the ranked table of all starts. The same
+    ``seed`` yields the same plan regardless of ``max_workers``.
+    """
+    if starts < 1:
+        raise ValueError("Mindestens ein Planungsdurchlauf ist noetig.")
+    jobs = [
+        _Start(
+            start=start,
+            seed=start_seed,
+            year=year,
+            month=month,
+            absences=absences,
+            max_parallel_absent=max_parallel_absent,
+            friday_night_rest_days=friday_night_rest_days,
+            doctors=doctors,
+            wishes=wishes,
+            wish_weight=wish_weight,
+        )
+        for start, start_seed in enumerate(start_seeds(starts, seed))
+    ]
+    workers = min(max_workers or os.cpu_count() or 1, len(jobs))
+    if workers <= 1:
+        rows = [_score(job) for job in jobs]
+    else:
+        chunksize = max(1, math.ceil(len(jobs) / (workers * 4)))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            rows = list(pool.map(_score, jobs, chunksize=chunksize))
+
+    scores = pd.DataFrame(rows).sort_values(by=[*RANK_COLUMNS, "Start"], kind="stable", ignore_index=True)
+    scores = scores.drop(columns="Wunschverfehlung").astype({"Seed": "Int64"})
+    scores.insert(0, "Rang", range(1, len(scores) + 1))
+    # Only the scores travel back from the workers; the winner is cheap to
+    # plan again and deterministic for its seed.
+    best = jobs[int(scores.loc[0, "Start"])]
+    plan_df, stats_df, warnings = best.plan()
+    return MultiStartResult(plan_df, stats_df, warnings, best.seed, scores)
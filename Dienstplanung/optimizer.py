@@ -0,0 +1,704 @@
+from __future__ import annotations
+
+import math
+import random
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import date, timedelta
+
+import pandas as pd
+
+from absences import AbsenceIndex, Absences
+from models import Doctor, Roster, compile_roster
+from shifts import SHIFT_TYPES, ShiftType, days_after, shift_slots
+
+UNFILLED_PENALTY = 1_000_000.0
+WEEKEND_WEIGHT = 10.0
+WISH_WEIGHT = 10.0
+
+
+@dataclass(frozen=True)
+class Placement:
+    shift: str
+    name: str
+    days: tuple[date, ...]
+    off_days: tuple[date, ...]
+    weekend_month: tuple[int, int] | None = None
+
+
+@dataclass(frozen=True)
+class SolverReport:
+    engine: str
+    solve_seconds: float
+    nodes: int
+    iterations: int
+    solutions: int
+    objective: float
+    initial_objective: float
+    unfilled: int
+    proven_optimal: bool
+
+
+class _Timeout(Exception):
+    pass
+
+
+class SlotModel:
+    """One-doctor slots of a period (see :func:`shifts.shift_slots`) with the roster as bitmasks.
+
+    Shared by the solvers here and by the feasibility check.
+    """
+
+    def __init__(
+        self,
+        days: list[date],
+        absences: Absences,
+        friday_night_rest_days: int,
+        doctors: list[Doctor] | Roster | None = None,
+        shift_types: tuple[ShiftType, ...] = SHIFT_TYPES,
+    ) -> None:
+        self.roster = compile_roster(doctors)
+        self.shift_types = shift_types
+        self.doctors = self.roster.doctors
+        self.names = list(self.roster.names)
+        self.index = self.roster.index
+        self.fte = self.roster.fte.tolist()
+        self.caps = [doctor.max_weekends_per_month for doctor in self.doctors]
+        # Slots are ordered chronologically so that rest windows and planned
+        # days off only ever refer to slots that were decided earlier.
+        self.slots = shift_slots(days, friday_night_rest_days, shift_types)
+        pad = max(friday_night_rest_days, 1)
+        self.origin = days[0] - timedelta(days=pad)
+        self.n_cols = len(days) + pad + days_after(shift_types)
+        self.absent = [0] * self.n_cols
+        if isinstance(absences, AbsenceIndex):
+            absences = absences.window(self.origin, self.origin + timedelta(days=self.n_cols - 1))
+        for day, day_names in absences.items():
+            col = (day - self.origin).days
+            if 0 <= col < self.n_cols:
+                for name in day_names:
+                    if name in self.index:
+                        self.absent[col] |= 1 << self.index[name]
+
+        self.cols = [self._cols(slot.days) for slot in self.slots]
+        self.off_cols = [self._cols(slot.off_days) for slot in self.slots]
+        self.rest_cols = [self._cols(slot.rest_days) for slot in self.slots]
+        self.capable = [self.roster.masks[slot.capability] for slot in self.slots]
+        self.length = [len(slot.days) * slot.shift_type.weight for slot in self.slots]
+        self.weekend_months = sorted({slot.weekend_month for slot in self.slots if slot.weekend_month is not None})
+        self.month = [
+            self.weekend_months.index(slot.weekend_month) if slot.weekend_month else -1 for slot in self.slots
+        ]
+
+    def _cols(self, dates: tuple[date, ...]) -> tuple[int, ...]:
+        return tuple((day - self.origin).days for day in dates)
+
+    def wish_values(self, wishes: pd.DataFrame) -> list[dict[int, float]]:
+        # Signed wish weight per slot and doctor ID, counted like the greedy
+        # planner does: wishes for the slot's duty on its days, minus wanted
+        # day shifts on the days the slot rules out.
+        signed: dict[tuple[str, date], dict[int, float]] = defaultdict(lambda: defaultdict(float))
+        columns = wishes[["Datum", "Arzt", "Dienst", "Gewuenscht", "Gewicht"]]
+        for day_text, name, duty, wanted, weight in columns.itertuples(index=False):
+            if name in self.index:
+                signed[duty, date.fromisoformat(day_text)][self.index[name]] += weight if wanted else -weight
+        fill = [shift_type for shift_type in self.shift_types if shift_type.staff_all and shift_type.wish is not None]
+        values: list[dict[int, float]] = []
+        for slot in self.slots:
+            value: dict[int, float] = defaultdict(float)
+            if slot.shift_type.wish is not None:
+                for day in slot.days:
+                    for idx, weight in signed.get((slot.shift_type.wish, day), {}).items():
+                        value[idx] += weight
+            for day in sorted({*slot.days, *slot.off_days}):
+                for shift_type in fill:
+                    if day.weekday() in shift_type.weekdays:
+                        for idx, weight in signed.get((shift_type.wish, day), {}).items():
+                            value[idx] -= max(weight, 0.0)
+            values.append({idx: weight for idx, weight in value.items() if weight})
+        return values
+
+    def choices(self, placements: list[Placement]) -> list[int]:
+        slot_index = {(slot.shift, slot.days[0]): k for k, slot in enumerate(self.slots)}
+        choice = [-1] * len(self.slots)
+        for placement in placements:
+            k = slot_index.get((placement.shift, placement.days[0]))
+            if k is not None and placement.name in self.index:
+                choice[k] = self.index[placement.name]
+        return choice
+
+    def result(self, choice: list[int]) -> tuple[list[Placement], list[str]]:
+        placements: list[Placement] = []
+        warnings: list[str] = []
+        for k, idx in enumerate(choice):
+            slot = self.slots[k]
+            if idx < 0:
+                warnings.append(slot.warning)
+                continue
+            placements.append(Placement(slot.shift, self.names[idx], slot.days, slot.off_days, slot.weekend_month))
+        return placements, warnings
+
+
+def solve(
+    days: list[date],
+    absences: Absences,
+    friday_night_rest_days: int,
+    time_limit: float,
+    incumbent: list[Placement] | None = None,
+    doctors: list[Doctor] | Roster | None = None,
+    shift_types: tuple[ShiftType, ...] = SHIFT_TYPES,
+) -> tuple[list[Placement], list[str], SolverReport]:
+    """Anytime branch and bound over the one-doctor slots of ``shift_types``.
+
+    The search is an iterated limited discrepancy search: round ``k`` explores
+    every assignment that deviates from the fairness order by at most ``k``
+    ranks in total. Partial objectives only grow, so branches that cannot beat
+    the best plan found so far are cut. Day shifts are not searched; the
+    planner derives them from the result exactly as in the greedy engine.
+
+    An ``incumbent`` plan (usually the greedy one) is used as the starting
+    point if it satisfies the solver's rules, so the result is never worse.
+    """
+    started = time.perf_counter()
+    deadline = started + time_limit
+    model = SlotModel(days, absences, friday_night_rest_days, doctors, shift_types)
+    names = model.names
+    n = len(names)
+    fte = model.fte
+    caps = model.caps
+    name_rank = {idx: rank for rank, idx in enumerate(sorted(range(n), key=lambda idx: names[idx]))}
+    slots = model.slots
+    n_cols = model.n_cols
+    absent = model.absent
+    slot_cols = model.cols
+    slot_off = model.off_cols
+    slot_rest = model.rest_cols
+    slot_mask = model.capable
+    slot_duty = model.length
+    weekend_months = model.weekend_months
+    slot_month = model.month
+
+    busy = [0] * n_cols
+    off = [0] * n_cols
+    duty = [0] * n
+    weekends = [0] * n
+    month_weekends = [[0] * n for _ in weekend_months]
+    exhausted = sum(1 << idx for idx, cap in enumerate(caps) if cap is not None and cap <= 0)
+    capped = [exhausted] * len(weekend_months)
+    choice: list[int] = [-1] * len(slots)
+
+    roster = model.roster
+    service_doctors = sorted({*roster.pools["full"].tolist(), *roster.pools["visit"].tolist()})
+    weekend_doctors = roster.pools["full"].tolist()
+    service_fte = sum(fte[idx] for idx in service_doctors) or 1.0
+    weekend_fte = sum(fte[idx] for idx in weekend_doctors) or 1.0
+    remaining_duty = [0] * (len(slots) + 1)
+    remaining_weekends = [0] * (len(slots) + 1)
+    for k in range(len(slots) - 1, -1, -1):
+        remaining_duty[k] = remaining_duty[k + 1] + slot_duty[k]
+        remaining_weekends[k] = remaining_weekends[k + 1] + (slot_month[k] >= 0)
+
+    best_cost = float("inf")
+    best_choice: list[int] = []
+    initial_cost = float("inf")
+    nodes = 0
+    solutions = 0
+    truncated = False
+
+    def candidates(k: int) -> list[int]:
+        blocked = 0
+        for col in slot_cols[k]:
+            blocked |= absent[col] | busy[col] | off[col]
+        for col in slot_rest[k]:
+            blocked |= busy[col]
+        if slot_month[k] >= 0:
+            blocked |= capped[slot_month[k]]
+        mask = slot_mask[k] & ~blocked
+        found = [idx for idx in range(n) if mask >> idx & 1]
+        if slot_month[k] >= 0:
+            found.sort(key=lambda idx: (weekends[idx] / fte[idx], duty[idx] / fte[idx], name_rank[idx]))
+        else:
+            found.sort(key=lambda idx: (duty[idx] / fte[idx], duty[idx], name_rank[idx]))
+        return found
+
+    def place(k: int, idx: int) -> tuple[float, list[int], list[int], int]:
+        bit = 1 << idx
+        saved_busy = [busy[col] for col in slot_cols[k]]
+        saved_off = [off[col] for col in slot_off[k]]
+        for col in slot_cols[k]:
+            busy[col] |= bit
+        for col in slot_off[k]:
+            off[col] |= bit
+        before = duty[idx]
+        duty[idx] += slot_duty[k]
+        delta = (duty[idx] ** 2 - before**2) / fte[idx]
+        month = slot_month[k]
+        saved_capped = 0
+        if month >= 0:
+            delta += WEEKEND_WEIGHT * ((weekends[idx] + 1) ** 2 - weekends[idx] ** 2) / fte[idx]
+            weekends[idx] += 1
+            month_weekends[month][idx] += 1
+            saved_capped = capped[month]
+            if caps[idx] is not None and month_weekends[month][idx] >= caps[idx]:
+                capped[month] |= bit
+        choice[k] = idx
+        return delta, saved_busy, saved_off, saved_capped
+
+    def unplace(k: int, idx: int, saved_busy: list[int], saved_off: list[int], saved_capped: int) -> None:
+        choice[k] = -1
+        month = slot_month[k]
+        if month >= 0:
+            capped[month] = saved_capped
+            month_weekends[month][idx] -= 1
+            weekends[idx] -= 1
+        duty[idx] -= slot_duty[k]
+        for col, value in zip(slot_off[k], saved_off):
+            off[col] = value
+        for col, value in zip(slot_cols[k], saved_busy):
+            busy[col] = value
+
+    def lower_bound(k: int) -> float:
+        # Spreading R remaining duty days over doctors whose load per FTE is
+        # at least m costs at least 2*m*R + R**2 / sum(fte) (Cauchy-Schwarz).
+        # Without qualified doctors the slots stay empty and add no fairness cost.
+        remaining = remaining_duty[k]
+        bound = 0.0
+        if remaining and service_doctors:
+            lowest = min(duty[idx] / fte[idx] for idx in service_doctors)
+            bound += 2 * lowest * remaining + remaining**2 / service_fte
+        remaining = remaining_weekends[k]
+        if remaining and weekend_doctors:
+            lowest = min(weekends[idx] / fte[idx] for idx in weekend_doctors)
+            bound += WEEKEND_WEIGHT * (2 * lowest * remaining + remaining**2 / weekend_fte)
+        return bound
+
+    def dfs(k: int, budget: int, cost: float) -> None:
+        nonlocal nodes, best_cost, best_choice, solutions, truncated
+        nodes += 1
+        if nodes & 255 == 0 and best_choice and time.perf_counter() > deadline:
+            raise _Timeout
+        if cost + lower_bound(k) >= best_cost:
+            return
+        if k == len(slots):
+            best_cost = cost
+            best_choice = list(choice)
+            solutions += 1
+            return
+
+        found = candidates(k)
+        if not found:
+            dfs(k + 1, budget, cost + UNFILLED_PENALTY)
+            return
+
+        for rank, idx in enumerate(found):
+            if rank > budget:
+                truncated = True
+                break
+            delta, saved_busy, saved_off, saved_capped = place(k, idx)
+            try:
+                dfs(k + 1, budget - rank, cost + delta)
+            finally:
+                unplace(k, idx, saved_busy, saved_off, saved_capped)
+
+    def replay(forced: list[int]) -> float | None:
+        # Scores a complete assignment under the solver's rules, or returns
+        # None if one of its placements is not allowed.
+        cost = 0.0
+        placed: list[tuple[int, int, list[int], list[int], int]] = []
+        try:
+            for k, idx in enumerate(forced):
+                if idx < 0:
+                    cost += UNFILLED_PENALTY
+                    continue
+                if idx not in candidates(k):
+                    return None
+                delta, saved_busy, saved_off, saved_capped = place(k, idx)
+                placed.append((k, idx, saved_busy, saved_off, saved_capped))
+                cost += delta
+            return cost
+        finally:
+            for k, idx, saved_busy, saved_off, saved_capped in reversed(placed):
+                unplace(k, idx, saved_busy, saved_off, saved_capped)
+
+    if incumbent:
+        forced = model.choices(incumbent)
+        incumbent_cost = replay(forced)
+        if incumbent_cost is not None:
+            best_cost = incumbent_cost
+            best_choice = forced
+            initial_cost = incumbent_cost
+
+    iterations = 0
+    proven_optimal = False
+    try:
+        for budget in range(0, max(len(slots), 1) * n + 1):
+            iterations += 1
+            truncated = False
+            dfs(0, budget, 0.0)
+            if initial_cost == float("inf"):
+                initial_cost = best_cost
+            if not truncated:
+                proven_optimal = True
+                break
+    except _Timeout:
+        pass
+
+    placements, warnings = model.result(best_choice)
+    report = SolverReport(
+        engine="optimize",
+        solve_seconds=round(time.perf_counter() - started, 4),
+        nodes=nodes,
+        iterations=iterations,
+        solutions=solutions,
+        objective=round(best_cost, 4),
+        initial_objective=round(initial_cost, 4),
+        unfilled=len(warnings),
+        proven_optimal=proven_optimal,
+    )
+    return placements, warnings, report
+
+
+class _Roster:
+    """Slot holders with per-doctor day rows, changed one placement at a time.
+
+    Unlike the bitmask state of :func:`solve`, the rows hold counts, so any
+    placement can be removed in any order. ``allowed`` checks a doctor
+    against both directions of every rule: their existing duties must not
+    fall on the new slot's days off, and the new slot must not fall into the
+    rest window of a weekend night they already hold.
+    """
+
+    def __init__(self, model: SlotModel) -> None:
+        self.model = model
+        n = len(model.names)
+        n_slots = len(model.slots)
+        self.absent = [[bool(model.absent[col] >> idx & 1) for col in range(model.n_cols)] for idx in range(n)]
+        self.pools = [[idx for idx in range(n) if model.capable[k] >> idx & 1] for k in range(n_slots)]
+        self.rest_dependents: list[list[int]] = [[] for _ in range(n_slots)]
+        for j in range(n_slots):
+            window = set(model.rest_cols[j])
+            if not window:
+                continue
+            for k in range(n_slots):
+                if window.intersection(model.cols[k]):
+                    self.rest_dependents[k].append(j)
+        self.busy = [[0] * model.n_cols for _ in range(n)]
+        self.off = [[0] * model.n_cols for _ in range(n)]
+        self.duty = [0] * n
+        self.weekends = [0] * n
+        self.month_weekends = [[0] * n for _ in model.weekend_months]
+        self.choice = [-1] * n_slots
+
+    def allowed(self, k: int, idx: int) -> bool:
+        model = self.model
+        if not model.capable[k] >> idx & 1:
+            return False
+        row_busy, row_off, row_absent = self.busy[idx], self.off[idx], self.absent[idx]
+        for col in model.cols[k]:
+            if row_absent[col] or row_busy[col] or row_off[col]:
+                return False
+        for col in model.off_cols[k]:
+            if row_busy[col]:
+                return False
+        for col in model.rest_cols[k]:
+            if row_busy[col]:
+                return False
+        for j in self.rest_dependents[k]:
+            if self.choice[j] == idx:
+                return False
+        month = model.month[k]
+        cap = model.caps[idx]
+        return month < 0 or cap is None or self.month_weekends[month][idx] < cap
+
+    def put(self, k: int, idx: int) -> None:
+        model = self.model
+        row_busy, row_off = self.busy[idx], self.off[idx]
+        for col in model.cols[k]:
+            row_busy[col] += 1
+        for col in model.off_cols[k]:
+            row_off[col] += 1
+        self.duty[idx] += model.length[k]
+        month = model.month[k]
+        if month >= 0:
+            self.weekends[idx] += 1
+            self.month_weekends[month][idx] += 1
+        self.choice[k] = idx
+
+    def take(self, k: int) -> int:
+        model = self.model
+        idx = self.choice[k]
+        row_busy, row_off = self.busy[idx], self.off[idx]
+        for col in model.cols[k]:
+            row_busy[col] -= 1
+        for col in model.off_cols[k]:
+            row_off[col] -= 1
+        self.duty[idx] -= model.length[k]
+        month = model.month[k]
+        if month >= 0:
+            self.weekends[idx] -= 1
+            self.month_weekends[month][idx] -= 1
+        self.choice[k] = -1
+        return idx
+
+    def load_delta(self, idx: int, change: int, weekend_change: int) -> float:
+        if idx < 0:
+            return 0.0
+        fte = self.model.fte[idx]
+        duty = self.duty[idx]
+        delta = ((duty + change) ** 2 - duty**2) / fte
+        if weekend_change:
+            weekends = self.weekends[idx]
+            delta += WEEKEND_WEIGHT * ((weekends + weekend_change) ** 2 - weekends**2) / fte
+        return delta
+
+    def objective(self) -> float:
+        fte = self.model.fte
+        unfilled = sum(1 for idx in self.choice if idx < 0)
+        load = sum(
+            (self.duty[idx] ** 2 + WEEKEND_WEIGHT * self.weekends[idx] ** 2) / fte[idx] for idx in range(len(fte))
+        )
+        return unfilled * UNFILLED_PENALTY + load
+
+    def fair_candidates(self, k: int) -> list[int]:
+        # Same order as the greedy pickers: weekend slots balance weekends
+        # first, all other slots balance duties per FTE.
+        model = self.model
+        fte, names = model.fte, model.names
+        found = [idx for idx in self.pools[k] if self.allowed(k, idx)]
+        if model.month[k] >= 0:
+            found.sort(key=lambda idx: (self.weekends[idx] / fte[idx], self.duty[idx] / fte[idx], names[idx]))
+        else:
+            found.sort(key=lambda idx: (self.duty[idx] / fte[idx], self.duty[idx], names[idx]))
+        return found
+
+
+@dataclass(frozen=True)
+class SearchReport:
+    engine: str
+    solve_seconds: float
+    moves: int
+    accepted: int
+    moves_per_second: float
+    objective: float
+    initial_objective: float
+    unfilled: int
+    initial_unfilled: int
+    seed: int
+
+
+def improve(
+    days: list[date],
+    absences: Absences,
+    friday_night_rest_days: int,
+    placements: list[Placement],
+    time_limit: float = 1.0,
+    max_moves: int = 200_000,
+    seed: int = 0,
+    doctors: list[Doctor] | Roster | None = None,
+    shift_types: tuple[ShiftType, ...] = SHIFT_TYPES,
+    wishes: pd.DataFrame | None = None,
+) -> tuple[list[Placement], list[str], SearchReport]:
+    """Simulated annealing over an existing plan.
+
+    Moves hand a slot to another eligible doctor or swap the doctors of two
+    slots. A move only touches the counters and day rows of the doctors
+    involved, so it is scored in constant time. Placements that break a rule
+    are dropped up front and left for the search to refill. The cooling
+    schedule runs over ``max_moves``; with an unchanged seed the move
+    sequence is the same on every run and ``time_limit`` only cuts it short.
+    ``wishes`` (a :func:`wishes.wish_frame`) lower the objective by
+    ``WISH_WEIGHT`` per unit of wish weight a slot holder fulfils.
+    """
+    started = time.perf_counter()
+    deadline = started + time_limit
+    rng = random.Random(seed)
+    model = SlotModel(days, absences, friday_night_rest_days, doctors, shift_types)
+    roster = _Roster(model)
+    n_slots = len(model.slots)
+    length = model.length
+    slot_month = model.month
+    pools = roster.pools
+    choice = roster.choice
+    allowed, put, take, load_delta = roster.allowed, roster.put, roster.take, roster.load_delta
+    gains = model.wish_values(wishes) if wishes is not None else [{}] * n_slots
+
+    def wish_delta(k: int, old: int, new: int) -> float:
+        gain = gains[k]
+        return WISH_WEIGHT * (gain.get(old, 0.0) - gain.get(new, 0.0)) if gain else 0.0
+
+    initial_unfilled = 0
+    for k, idx in enumerate(model.choices(placements)):
+        if idx >= 0 and allowed(k, idx):
+            put(k, idx)
+        else:
+            initial_unfilled += 1
+    cost = roster.objective() + sum(wish_delta(k, -1, idx) for k, idx in enumerate(choice) if idx >= 0)
+    initial_cost = cost
+    best_cost = cost
+    best_choice = list(choice)
+
+    start_temperature, end_temperature = 20.0, 0.05
+    cooling = (end_temperature / start_temperature) ** (1.0 / max(max_moves, 1))
+    temperature = start_temperature
+    moves = accepted = 0
+    while moves < max_moves and n_slots:
+        if moves & 1023 == 0 and time.perf_counter() > deadline:
+            break
+        moves += 1
+        temperature *= cooling
+        k = rng.randrange(n_slots)
+        current = choice[k]
+        if current >= 0 and rng.random() < 0.5:
+            other = rng.randrange(n_slots)
+            partner = choice[other]
+            if other == k or partner < 0 or partner == current:
+                continue
+            weekend_k, weekend_other = int(slot_month[k] >= 0), int(slot_month[other] >= 0)
+            diff = length[other] - length[k]
+            delta = load_delta(current, diff, weekend_other - weekend_k) + load_delta(
+                partner, -diff, weekend_k - weekend_other
+            )
+            delta += wish_delta(k, current, partner) + wish_delta(other, partner, current)
+            if delta > 0 and rng.random() >= math.exp(-delta / temperature):
+                continue
+            take(k)
+            take(other)
+            if allowed(k, partner):
+                put(k, partner)
+                if allowed(other, current):
+                    put(other, current)
+                    accepted += 1
+                    cost += delta
+                    if cost < best_cost - 1e-9:
+                        best_cost = cost
+                        best_choice = list(choice)
+                    continue
+                take(k)
+            put(k, current)
+            put(other, partner)
+            continue
+
+        pool = pools[k]
+        if not pool:
+            continue
+        candidate = pool[rng.randrange(len(pool))]
+        if candidate == current:
+            continue
+        weekend = int(slot_month[k] >= 0)
+        delta = load_delta(current, -length[k], -weekend) + load_delta(candidate, length[k], weekend)
+        delta += wish_delta(k, current, candidate)
+        if current < 0:
+            delta -= UNFILLED_PENALTY
+        if delta > 0 and rng.random() >= math.exp(-delta / temperature):
+            continue
+        if current >= 0:
+            take(k)
+        if not allowed(k, candidate):
+            if current >= 0:
+                put(k, current)
+            continue
+        put(k, candidate)
+        accepted += 1
+        cost += delta
+        if cost < best_cost - 1e-9:
+            best_cost = cost
+            best_choice = list(choice)
+
+    result, warnings = model.result(best_choice)
+    elapsed = time.perf_counter() - started
+    report = SearchReport(
+        engine="local_search",
+        solve_seconds=round(elapsed, 4),
+        moves=moves,
+        accepted=accepted,
+        moves_per_second=round(moves / elapsed, 1) if elapsed > 0 else 0.0,
+        objective=round(best_cost, 4),
+        initial_objective=round(initial_cost, 4),
+        unfilled=len(warnings),
+        initial_unfilled=initial_unfilled,
+        seed=seed,
+    )
+    return result, warnings, report
+
+
+@dataclass(frozen=True)
+class RepairReport:
+    affected_slots: int
+    reassigned_slots: int
+    ejections: int
+    unfilled: int
+
+
+def repair(
+    days: list[date],
+    absences: dict[date, set[str]],
+    friday_night_rest_days: int,
+    placements: list[Placement],
+    changed_days: set[date],
+    doctors: list[Doctor] | Roster | None = None,
+    shift_types: tuple[ShiftType, ...] = SHIFT_TYPES,
+) -> tuple[list[Placement], list[str], RepairReport]:
+    """Keeps every placement that an absence change cannot have touched.
+
+    Slots on ``changed_days`` are re-checked; holders that are now absent
+    lose the slot. Open slots are then refilled in fairness order.
+    If no doctor is free, a doctor whose only obstacle is one other nearby
+    slot takes over, and that slot is handed on (a one-step ejection chain).
+    Days off of removed holders disappear with their slot, so rest rules
+    stay satisfied without touching further slots.
+    """
+    model = SlotModel(days, absences, friday_night_rest_days, doctors, shift_types)
+    roster = _Roster(model)
+    previous = model.choices(placements)
+    affected = [k for k, slot in enumerate(model.slots) if changed_days.intersection(slot.days)]
+    affected_set = set(affected)
+
+    for k, idx in enumerate(previous):
+        if idx >= 0 and k not in affected_set:
+            roster.put(k, idx)
+    for k in affected:
+        idx = previous[k]
+        if idx >= 0 and not any(roster.absent[idx][col] for col in model.cols[k]):
+            roster.put(k, idx)
+
+    ejections = 0
+    for k in range(len(model.slots)):
+        if roster.choice[k] >= 0:
+            continue
+        found = roster.fair_candidates(k)
+        if found:
+            roster.put(k, found[0])
+            continue
+        if _eject_into(roster, k):
+            ejections += 1
+
+    result, warnings = model.result(roster.choice)
+    reassigned = sum(1 for k, idx in enumerate(roster.choice) if idx != previous[k])
+    report = RepairReport(
+        affected_slots=len(affected),
+        reassigned_slots=reassigned,
+        ejections=ejections,
+        unfilled=len(warnings),
+    )
+    return result, warnings, report
+
+
+def _eject_into(roster: _Roster, k: int) -> bool:
+    model = roster.model
+    first, last = min(model.cols[k]) - 7, max(model.cols[k]) + 7
+    nearby = [j for j, slot_cols in enumerate(model.cols) if j != k and first <= slot_cols[0] <= last]
+    for idx in roster.pools[k]:
+        for j in nearby:
+            if roster.choice[j] != idx:
+                continue
+            roster.take(j)
+            if roster.allowed(k, idx):
+                roster.put(k, idx)
+                substitutes = [other for other in roster.fair_candidates(j) if other != idx]
+                if substitutes:
+                    roster.put(j, substitutes[0])
+                    return True
+                roster.take(k)
+            roster.put(j, idx)
+    return False
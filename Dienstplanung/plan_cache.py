@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable
+
+from absences import AbsenceIndex, Absences
+from models import Doctor, Roster, compile_roster
+
+# Bump when the planner output for identical inputs changes, so that stale
+# on-disk entries are never served.
+CACHE_VERSION = 3
+
+
+def roster_fingerprint(doctors: list[Doctor] | Roster | None = None) -> str:
+    # Computed once per compiled roster.
+    return compile_roster(doctors).fingerprint
+
+
+def plan_key(absences: Absences, doctors: list[Doctor] | Roster | None = None, **inputs: Any) -> str:
+    # Absences are hashed as merged intervals, so the per-day form and an
+    # AbsenceIndex with the same days share one key.
+    if not isinstance(absences, AbsenceIndex):
+        index = AbsenceIndex()
+        for day, names in absences.items():
+            for name in names:
+                index.add(name, day, day)
+        absences = index
+    canonical = {
+        "version": CACHE_VERSION,
+        "roster": roster_fingerprint(doctors),
+        "absences": [
+            (interval.name, interval.start.isoformat(), interval.end.isoformat()) for interval in absences.intervals()
+        ],
+        "inputs": inputs,
+    }
+    payload = json.dumps(canonical, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    disk_evictions: int = 0
+
+
+class PlanCache:
+    """Two-tier cache for planner results keyed by :func:`plan_key`.
+
+    The memory tier is an LRU of ``max_entries`` results. If ``directory`` is
+    given, results are also pickled there and the least recently used files
+    are removed once the directory grows beyond ``max_disk_bytes``. Cached
+    objects are shared, so callers must not modify returned DataFrames.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 64,
+        directory: str | Path | None = None,
+        max_disk_bytes: int = 64 * 1024 * 1024,
+    ) -> None:
+        self.max_entries = max_entries
+        self.directory = Path(directory) if directory is not None else None
+        self.max_disk_bytes = max_disk_bytes
+        self.stats = CacheStats()
+        self._memory: OrderedDict[str, Any] = OrderedDict()
+        self._lock = threading.Lock()
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+
+    def __len__(self) -> int:
+        return len(self._memory)
+
+    def get(self, key: str) -> Any | None:
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.stats.hits += 1
+                return self._memory[key]
+        value = self._read_disk(key)
+        with self._lock:
+            if value is None:
+                self.stats.misses += 1
+                return None
+            self.stats.disk_hits += 1
+            self._remember(key, value)
+        return value
+
+    def put(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._remember(key, value)
+        self._write_disk(key, value)
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any]) -> Any:
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+        if self.directory is not None:
+            for path in self.directory.glob("*.pkl"):
+                path.unlink(missing_ok=True)
+
+    def _remember(self, key: str, value: Any) -> None:
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.stats.evictions += 1
+
+    def _path(self, key: str) -> Path:
+        assert self.directory is not None
+        return self.directory / f"{key}.pkl"
+
+    def _read_disk(self, key: str) -> Any | None:
+        if self.directory is None:
+            return None
+        path = self._path(key)
+        try:
+            with path.open("rb") as handle:
+                value = pickle.load(handle)
+            os.utime(path)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+        return value
+
+    def _write_disk(self, key: str, value: Any) -> None:
+        if self.directory is None:
+            return
+        handle, temp_name = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(handle, "wb") as temp:
+                pickle.dump(value, temp, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_name, self._path(key))
+        except OSError:
+            Path(temp_name).unlink(missing_ok=True)
+            return
+        self._evict_disk()
+
+    def _evict_disk(self) -> None:
+        assert self.directory is not None
+        entries = []
+        for path in self.directory.glob("*.pkl"):
+            try:
+                info = path.stat()
+            except OSError:
+                continue
+            entries.append((info.st_mtime, info.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_disk_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            self.stats.disk_evictions += 1
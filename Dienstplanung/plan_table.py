@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import io
+from datetime import date
+from pathlib import Path
+from typing import Sequence
+
+import numpy as np
+import pandas as pd
+
+ASSIGNMENT_COLUMNS = ("Tagdienst", "Freitag_bis_19", "Nachtdienst", "Wochenend_Tagdienst", "Visitendienst")
+DUTY_TYPES = pd.CategoricalDtype(list(ASSIGNMENT_COLUMNS))
+WEEKDAYS = ("Mo", "Di", "Mi", "Do", "Fr", "Sa", "So")
+EXPORT_FORMATS = ("csv", "parquet", "arrow")
+
+
+def assignment_table(
+    days: Sequence[date],
+    names: Sequence[str],
+    day_codes: np.ndarray,
+    doctor_codes: np.ndarray,
+    duty_codes: np.ndarray,
+    columns: Sequence[str] = ASSIGNMENT_COLUMNS,
+) -> pd.DataFrame:
+    """Builds the long (Datum, Arzt, Dienst) table from integer codes.
+
+    All three columns are categoricals: ``Datum`` is ordered and lists every
+    planned day, even days without assignments, ``Arzt`` keeps the roster
+    order and ``Dienst`` the order of ``columns`` (the plan columns, by
+    default :data:`ASSIGNMENT_COLUMNS`), into which ``duty_codes`` point.
+    """
+    duty_types = DUTY_TYPES if tuple(columns) == ASSIGNMENT_COLUMNS else pd.CategoricalDtype(list(columns))
+    table = pd.DataFrame(
+        {
+            "Datum": pd.Categorical.from_codes(
+                day_codes, categories=[day.isoformat() for day in days], ordered=True
+            ),
+            "Arzt": pd.Categorical.from_codes(doctor_codes, categories=list(names)),
+            "Dienst": pd.Categorical.from_codes(duty_codes, dtype=duty_types),
+        }
+    )
+    return table.sort_values(["Datum", "Dienst", "Arzt"], ignore_index=True)
+
+
+def plan_assignments(plan_df: pd.DataFrame, columns: Sequence[str] | None = None) -> pd.DataFrame:
+    """Long table of a wide plan, e.g. one that was replanned or loaded from CSV.
+
+    ``columns`` are the duty columns to read, by default those of
+    :data:`ASSIGNMENT_COLUMNS` the plan has. Cells may list several doctors
+    separated by commas, like the day shift.
+    """
+    if columns is None:
+        columns = [column for column in ASSIGNMENT_COLUMNS if column in plan_df.columns]
+    long_df = plan_df.melt(id_vars="Datum", value_vars=list(columns), var_name="Dienst", value_name="Arzt")
+    long_df["Arzt"] = long_df["Arzt"].fillna("").astype(str).str.split(",")
+    long_df = long_df.explode("Arzt")
+    long_df["Arzt"] = long_df["Arzt"].str.strip()
+    long_df = long_df[long_df["Arzt"].notna() & (long_df["Arzt"] != "")]
+    duty_types = DUTY_TYPES if tuple(columns) == ASSIGNMENT_COLUMNS else pd.CategoricalDtype(list(columns))
+    table = pd.DataFrame(
+        {
+            "Datum": pd.Categorical(long_df["Datum"], categories=list(plan_df["Datum"]), ordered=True),
+            "Arzt": long_df["Arzt"].astype("category"),
+            "Dienst": long_df["Dienst"].astype(duty_types),
+        }
+    )
+    return table.sort_values(["Datum", "Dienst", "Arzt"], ignore_index=True)
+
+
+def wide_plan(assignments: pd.DataFrame) -> pd.DataFrame:
+    """Derives the wide plan columns (one row per day) from the long table.
+
+    One column per duty in category order. Day shifts are joined
+    alphabetically with ", ", the other duties hold a single name or "" like
+    the planner has always written them.
+    """
+    dates = list(assignments["Datum"].cat.categories)
+    day_codes = assignments["Datum"].cat.codes.to_numpy()
+    duty_codes = assignments["Dienst"].cat.codes.to_numpy()
+    names = np.asarray(assignments["Arzt"].astype(str), dtype=object)
+    # Built as one dict: inserting columns one by one costs more than the
+    # cells themselves once there are many shift columns.
+    data = {
+        "Datum": dates,
+        "Wochentag": [WEEKDAYS[date.fromisoformat(day).weekday()] for day in dates],
+    }
+    for code, column in enumerate(assignments["Dienst"].cat.categories):
+        rows = np.flatnonzero(duty_codes == code)
+        cells = [[] for _ in dates]
+        for row in rows:
+            cells[day_codes[row]].append(names[row])
+        data[column] = [", ".join(sorted(cell)) for cell in cells]
+    return pd.DataFrame(data)
+
+
+def export_table(table: pd.DataFrame, fmt: str, path: str | Path | None = None) -> bytes | None:
+    """Writes ``table`` as CSV, Parquet or Arrow IPC file.
+
+    Categoricals stay dictionary-encoded in Parquet and Arrow. Without
+    ``path`` the encoded bytes are returned, e.g. for a download button.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unbekanntes Exportformat '{fmt}'.")
+    view = table.copy(deep=False)
+    view.attrs = {}
+    if fmt == "csv":
+        data = view.to_csv(index=False).encode("utf-8")
+    else:
+        # pyarrow is only imported here so that CSV-only callers (the CLI)
+        # do not pay for it at startup.
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        arrow_table = pa.Table.from_pandas(view, preserve_index=False)
+        sink = io.BytesIO()
+        if fmt == "parquet":
+            pq.write_table(arrow_table, sink)
+        else:
+            with pa.ipc.new_file(sink, arrow_table.schema) as writer:
+                writer.write_table(arrow_table)
+        data = sink.getvalue()
+    if path is None:
+        return data
+    Path(path).write_bytes(data)
+    return None
+
+
+def plan_payload(plan_df: pd.DataFrame, stats_df: pd.DataFrame, warnings: list[str]) -> dict:
+    """JSON-ready form of a planner result, as written by the CLI and the service."""
+    report = plan_df.attrs.get("wishes")
+    return {
+        "plan": plan_df.to_dict(orient="records"),
+        "statistik": stats_df.to_dict(orient="records"),
+        "warnungen": list(warnings),
+        "wunscherfuellung": None if report is None else round(report.weighted_rate, 4),
+    }
+
+
+def read_table(path: str | Path) -> pd.DataFrame:
+    suffix = Path(path).suffix.lower()
+    if suffix == ".csv":
+        return pd.read_csv(path, keep_default_na=False)
+    if suffix == ".parquet":
+        import pyarrow.parquet as pq
+
+        return pq.read_table(path).to_pandas()
+    if suffix in (".arrow", ".feather"):
+        import pyarrow as pa
+
+        with pa.memory_map(str(path)) as source:
+            return pa.ipc.open_file(source).read_all().to_pandas()
+    raise ValueError(f"Unbekanntes Dateiformat '{suffix}'.")
@@ -1,38 +1,28 @@
 from __future__ import annotations
 
 import calendar
+import heapq
+import random
+import time
 from collections import defaultdict
+from dataclasses import dataclass, field
 from datetime import date, timedelta
+from typing import Callable, Sequence
 
+import numpy as np
 import pandas as pd
 
-from models import DOCTOR_BY_NAME, DOCTORS
+from absences import AbsenceIndex, Absences, AbsenceStream, absences_by_day
+from models import Doctor, Roster, compile_roster
+from optimizer import Placement, SolverReport, improve, repair, solve
+from plan_table import ASSIGNMENT_COLUMNS, assignment_table, wide_plan  # noqa: F401 - re-exported
+from shifts import PHASES, SHIFT_TYPES, ShiftSlot, ShiftType, check_shift_types, days_after, plan_columns, shift_slots
+from wishes import WishInput, wish_frame, wish_report
 
 
-def parse_absences(raw: str) -> tuple[dict[date, set[str]], list[str]]:
-    absences: dict[date, set[str]] = defaultdict(set)
-    warnings: list[str] = []
-    lines = [line.strip() for line in raw.splitlines() if line.strip()]
-
-    for idx, line in enumerate(lines, start=1):
-        if ":" not in line:
-            warnings.append(f"Zeile {idx}: ':' fehlt.")
-            continue
-
-        date_part, names_part = line.split(":", 1)
-        try:
-            day = date.fromisoformat(date_part.strip())
-        except ValueError:
-            warnings.append(f"Zeile {idx}: Ungueltiges Datum '{date_part.strip()}'.")
-            continue
-
-        names = {n.strip() for n in names_part.split(",") if n.strip()}
-        unknown = sorted([name for name in names if name not in DOCTOR_BY_NAME])
-        if unknown:
-            warnings.append(f"Zeile {idx}: Unbekannte Namen: {', '.join(unknown)}.")
-
-        absences[day].update({name for name in names if name in DOCTOR_BY_NAME})
-    return absences, warnings
+def parse_absences(raw: str, doctors: list[Doctor] | None = None) -> tuple[dict[date, set[str]], list[str]]:
+    stream = AbsenceStream(raw.splitlines(), doctors)
+    return absences_by_day(stream), stream.warnings
 
 
 def month_dates(year: int, month: int) -> list[date]:
@@ -40,225 +30,866 @@ def month_dates(year: int, month: int) -> list[date]:
     return [date(year, month, d) for d in range(1, last_day + 1)]
 
 
-def _pick_fair(candidates: list[str], duty_count: dict[str, int], fte: dict[str, float]) -> str | None:
-    if not candidates:
-        return None
-    return min(candidates, key=lambda name: (duty_count[name] / fte[name], duty_count[name], name))
+class _FairQueue:
+    """Min-heap over doctor IDs with the same order as a ``min()`` scan.
+
+    ``key`` maps an ID to its fairness tuple, which must end with a unique
+    tie-breaker (the rank of the name) so that ties break exactly like
+    ``min()``. Counts change through :meth:`refresh`, which pushes a new
+    entry and leaves the old one to be discarded lazily. Doctors that are
+    not eligible for a slot are skipped and pushed back afterwards, so they
+    stay in the queue for later days.
+    """
+
+    def __init__(self, size: int, key: Callable[[int], tuple]) -> None:
+        self._key = key
+        self._current = [key(idx) for idx in range(size)]
+        self._heap = [(entry, idx) for idx, entry in enumerate(self._current)]
+        heapq.heapify(self._heap)
+
+    def refresh(self, idx: int) -> None:
+        entry = self._key(idx)
+        if entry == self._current[idx]:
+            return
+        self._current[idx] = entry
+        heapq.heappush(self._heap, (entry, idx))
+
+    def pick(self, eligible: np.ndarray) -> int | None:
+        current = self._current
+        heap = self._heap
+        skipped = []
+        chosen = None
+        while heap:
+            item = heapq.heappop(heap)
+            entry, idx = item
+            if current[idx] != entry:
+                continue
+            skipped.append(item)
+            if eligible[idx]:
+                chosen = idx
+                break
+        for item in skipped:
+            heapq.heappush(heap, item)
+        return chosen
+
+    def pick_preferred(self, eligible: np.ndarray, bonus: np.ndarray) -> int | None:
+        # ``bonus`` is subtracted from the first key element, so a wish of
+        # weight 1 is worth one duty (or weekend) per FTE. Only the few doctors with a
+        # wish are compared by hand; the rest come from the heap.
+        wished = eligible & (bonus != 0)
+        chosen = self.pick(eligible & ~wished)
+        best = None if chosen is None else self._current[chosen]
+        for idx in np.flatnonzero(wished):
+            entry = self._current[idx]
+            adjusted = (entry[0] - bonus[idx], *entry[1:])
+            if best is None or adjusted < best:
+                best, chosen = adjusted, int(idx)
+        return chosen
+
+
+class _Board:
+    """Doctor x day x plan column assignment tensor with availability matrices.
+
+    ``busy`` counts the shifts per doctor and day and doubles as the reverse
+    index from a doctor to the days on which they already work, ``duties``
+    holds the same shifts weighted by their shift type;
+    ``rest_start`` marks the first day of blocks that need rest days before
+    them. The day axis is padded so that rest windows before and after the
+    month can be sliced without bounds checks.
+    """
+
+    def __init__(
+        self,
+        days: list[date],
+        absences: Absences,
+        pad_before: int,
+        doctors: list[Doctor] | Roster | None = None,
+        shift_types: tuple[ShiftType, ...] = SHIFT_TYPES,
+    ) -> None:
+        self.shift_types = shift_types
+        self.columns = plan_columns(shift_types)
+        self.track = {shift_type.key: self.columns.index(shift_type.column) for shift_type in shift_types}
+        self.fill_tracks = sorted({self.track[t.key] for t in shift_types if t.staff_all})
+        self.fill_weekdays = {weekday for t in shift_types if t.staff_all for weekday in t.weekdays}
+        self.roster = compile_roster(doctors)
+        self.names = self.roster.names
+        self.index = self.roster.index
+        self.days = days
+        self.origin = days[0] - timedelta(days=pad_before)
+        n_days = len(days) + pad_before + days_after(shift_types)
+        shape = (len(self.names), n_days)
+        self.absent = np.zeros(shape, dtype=bool)
+        self.off = np.zeros(shape, dtype=np.int8)
+        self.busy = np.zeros(shape, dtype=np.int8)
+        self.duties = np.zeros(shape, dtype=np.int32)
+        self.rest_start = np.zeros(shape, dtype=bool)
+        self.shifts = np.zeros(shape + (len(self.columns),), dtype=np.int8)
+        self.wish: np.ndarray | None = None
+        if isinstance(absences, AbsenceIndex):
+            last_day = self.origin + timedelta(days=n_days - 1)
+            for interval in absences.intervals(self.origin, last_day):
+                if interval.name in self.index:
+                    first, last = self.col(max(interval.start, self.origin)), self.col(min(interval.end, last_day))
+                    self.absent[self.index[interval.name], first : last + 1] = True
+        else:
+            for day, names in absences.items():
+                col = (day - self.origin).days
+                if not 0 <= col < n_days:
+                    continue
+                for name in names:
+                    if name in self.index:
+                        self.absent[self.index[name], col] = True
+
+    def col(self, day: date) -> int:
+        return (day - self.origin).days
+
+    def add_wishes(self, frame: pd.DataFrame) -> None:
+        # Signed wish weights per doctor, day and plan column: wanted > 0,
+        # unwanted < 0. A wish applies to every column of its duty.
+        self.wish = np.zeros(self.shifts.shape, dtype=float)
+        wish_tracks: dict[str, set[int]] = defaultdict(set)
+        for shift_type in self.shift_types:
+            if shift_type.wish is not None:
+                wish_tracks[shift_type.wish].add(self.track[shift_type.key])
+        columns = frame[["Datum", "Arzt", "Dienst", "Gewuenscht", "Gewicht"]]
+        for day_text, name, duty, wanted, weight in columns.itertuples(index=False):
+            col = self.col(date.fromisoformat(day_text))
+            if name not in self.index or not 0 <= col < self.wish.shape[1]:
+                continue
+            for track in sorted(wish_tracks.get(duty, ())):
+                self.wish[self.index[name], col, track] += weight if wanted else -weight
+
+    def wish_bonus(self, track: int, days: tuple[date, ...], blocked: tuple[date, ...] = ()) -> np.ndarray:
+        # Wishes for the slot itself, minus wishes for the shifts staffed by
+        # everyone (the day shift) that the slot rules out.
+        assert self.wish is not None
+        bonus = self.wish[:, [self.col(day) for day in days], track].sum(axis=1)
+        if blocked:
+            for fill_track in self.fill_tracks:
+                day_wishes = self.wish[:, [self.col(day) for day in blocked], fill_track]
+                bonus -= np.clip(day_wishes, 0, None).sum(axis=1)
+        return bonus
+
+    def absent_in(self, start: date, end: date) -> np.ndarray:
+        return self.absent[:, self.col(start) : self.col(end) + 1].any(axis=1)
+
+    def off_in(self, start: date, end: date) -> np.ndarray:
+        return (self.off[:, self.col(start) : self.col(end) + 1] > 0).any(axis=1)
+
+    def unavailable(self, start: date, end: date) -> np.ndarray:
+        first, last = self.col(start), self.col(end) + 1
+        return self.absent[:, first:last].any(axis=1) | (self.off[:, first:last] > 0).any(axis=1)
+
+    def assigned(self, start: date, end: date) -> np.ndarray:
+        return (self.busy[:, self.col(start) : self.col(end) + 1] > 0).any(axis=1)
+
+    def names_in(self, mask: np.ndarray) -> list[str]:
+        return [self.names[idx] for idx in np.flatnonzero(mask)]
+
+    def assign(self, idx: int, day: date, shift: int, weight: int = 1) -> None:
+        col = self.col(day)
+        self.shifts[idx, col, shift] = 1
+        self.busy[idx, col] += 1
+        self.duties[idx, col] += weight
+
+    def mark_off(self, idx: int, day: date) -> None:
+        self.off[idx, self.col(day)] += 1
+
+    def add_commitments(self, commitments: Commitments) -> None:
+        # Duties elsewhere count as busy days, days off there as absences.
+        rows = [self.index[name] for name in commitments.names]
+        shift = (commitments.origin - self.origin).days
+        first, last = max(shift, 0), min(shift + commitments.busy.shape[1], self.busy.shape[1])
+        if not rows or first >= last:
+            return
+        source = slice(first - shift, last - shift)
+        self.busy[rows, first:last] += commitments.busy[:, source]
+        self.absent[rows, first:last] |= commitments.blocked[:, source]
+        self.rest_start[rows, first:last] |= commitments.rest_start[:, source]
+
+    def is_staffed(self, day: date, track: int) -> bool:
+        return bool(self.shifts[:, self.col(day), track].any())
+
+    def rest_conflicts(self, slot: ShiftSlot, rest_days: int) -> np.ndarray:
+        # Doctors the rest rules exclude from ``slot``: a duty in the rest
+        # window before it, a duty on one of its days off, or a later block
+        # whose rest window the slot would fall into.
+        first, last = self.col(slot.days[0]), self.col(slot.days[-1])
+        conflicts = np.zeros(len(self.names), dtype=bool)
+        if slot.rest_days:
+            conflicts |= (self.busy[:, first - len(slot.rest_days) : first] > 0).any(axis=1)
+        off_cols = [col for col in map(self.col, slot.off_days) if not first <= col <= last]
+        if off_cols:
+            conflicts |= (self.busy[:, off_cols] > 0).any(axis=1)
+        if rest_days > 0 and slot.shift_type.on_call:
+            conflicts |= self.rest_start[:, first + 1 : last + rest_days + 1].any(axis=1)
+        return conflicts
+
+
+@dataclass
+class Commitments:
+    """Duties some doctors of the roster hold outside the plan, e.g. in another department.
+
+    Rows follow ``names``, day columns start at ``origin``. ``busy`` days
+    and ``rest_start`` (first days of blocks with rest days before them)
+    take part in the rest rules like the plan's own duties, ``blocked``
+    days make a doctor unavailable. ``duties``, ``weekends`` and
+    ``monthly_weekends`` are added to the fairness counts and weekend caps.
+    """
+
+    names: tuple[str, ...]
+    origin: date
+    busy: np.ndarray
+    blocked: np.ndarray
+    rest_start: np.ndarray
+    duties: np.ndarray
+    weekends: np.ndarray
+    monthly_weekends: dict[tuple[int, int], np.ndarray]
+
+
+REJECTION_RULES = ("abwesend", "bereits_eingeteilt", "ruhetage", "wochenend_limit")
+
+
+@dataclass
+class PlanMetrics:
+    """Phase timings and candidate counters of one planning run.
+
+    Every pick starts from the doctors that are qualified for the slot; each
+    rejected doctor is counted once, under the first rule of
+    ``REJECTION_RULES`` that excludes them.
+    """
+
+    phases: dict[str, float] = field(default_factory=dict)
+    picks: int = 0
+    candidate_evaluations: int = 0
+    pool_total: int = 0
+    rejected: dict[str, int] = field(default_factory=lambda: dict.fromkeys(REJECTION_RULES, 0))
+
+    @property
+    def average_pool(self) -> float:
+        return self.pool_total / self.picks if self.picks else 0.0
+
+    def lap(self, name: str, since: float) -> float:
+        now = time.perf_counter()
+        self.phases[name] = self.phases.get(name, 0.0) + now - since
+        return now
+
+    def count_pick(self, qualified: np.ndarray, rules: list[tuple[str, np.ndarray]]) -> None:
+        remaining = qualified.copy()
+        self.picks += 1
+        self.candidate_evaluations += int(qualified.sum())
+        for rule, blocked in rules:
+            hit = remaining & blocked
+            self.rejected[rule] += int(hit.sum())
+            remaining &= ~hit
+        self.pool_total += int(remaining.sum())
+
+
+def _absence_limit_warnings(days: list[date], absences: Absences, max_parallel_absent: int) -> list[str]:
+    warnings: list[str] = []
+    for day in days:
+        absent_count = len(absences.get(day, set()))
+        if absent_count > max_parallel_absent:
+            warnings.append(
+                f"{day.isoformat()}: {absent_count} als abwesend eingetragen (Limit {max_parallel_absent})."
+            )
+    return warnings
+
+
+def _fill_shift(board: _Board, days: list[date], shift_type: ShiftType) -> np.ndarray:
+    # Shifts staffed by everyone only depend on the slots planned before, so
+    # all their days are staffed in one vectorized step. Returns the duties
+    # per doctor.
+    cols = np.array([board.col(day) for day in days if day.weekday() in shift_type.weekdays], dtype=int)
+    if not cols.size:
+        return np.zeros(len(board.names), dtype=np.int64)
+    track = board.track[shift_type.key]
+    blocked = board.absent[:, cols] | (board.off[:, cols] > 0) | (board.busy[:, cols] > 0)
+    mask = board.roster.capable[shift_type.capability][:, None] & ~blocked
+    if board.wish is not None:
+        # Doctors who asked for a free day are left out as long as someone
+        # else is still on the shift.
+        unwanted = mask & (board.wish[:, cols, track] < 0)
+        staffed = (mask & ~unwanted).any(axis=0)
+        mask &= ~(unwanted & staffed)
+    board.shifts[:, cols, track] = mask
+    board.busy[:, cols] += mask.astype(np.int8)
+    board.duties[:, cols] += mask * shift_type.weight
+    return mask.sum(axis=1) * shift_type.weight
+
+
+@dataclass
+class _PlanRun:
+    # Counts are indexed by doctor ID, the weekends per month of the Saturday.
+    board: _Board
+    duties: list[int]
+    weekends: list[int]
+    monthly_weekends: dict[tuple[int, int], np.ndarray]
+    warnings: list[str]
+    placements: list[Placement] = field(default_factory=list)
+    report: SolverReport | None = None
+
+
+def _run_planner(
+    days: list[date],
+    absences: Absences,
+    max_parallel_absent: int,
+    friday_night_rest_days: int,
+    doctors: list[Doctor] | Roster | None = None,
+    metrics: PlanMetrics | None = None,
+    wishes: pd.DataFrame | None = None,
+    seed: int | None = None,
+    shift_types: tuple[ShiftType, ...] = SHIFT_TYPES,
+    commitments: Commitments | None = None,
+    fill: bool = True,
+) -> _PlanRun:
+    # ``fill=False`` leaves the shifts staffed by everyone empty, see
+    # departments.py.
+    board = _Board(days, absences, max(friday_night_rest_days, 1), doctors, shift_types)
+    roster = board.roster
+    duties = [0] * len(roster)
+    weekends = [0] * len(roster)
+    monthly_weekends: dict[tuple[int, int], np.ndarray] = defaultdict(lambda: np.zeros(len(roster), dtype=np.int64))
+    if commitments is not None:
+        board.add_commitments(commitments)
+        rows = [roster.index[name] for name in commitments.names]
+        for idx, count, weekend_count in zip(rows, commitments.duties.tolist(), commitments.weekends.tolist()):
+            duties[idx] += count
+            weekends[idx] += weekend_count
+        for month_key, counts in commitments.monthly_weekends.items():
+            monthly_weekends[month_key][rows] += counts
+    fte = roster.fte.tolist()
+    if wishes is not None and not wishes.empty:
+        board.add_wishes(wishes)
+    warnings = _absence_limit_warnings(days, absences, max_parallel_absent)
+    placements: list[Placement] = []
+
+    # Ties break by name, or by a seeded shuffle of the roster.
+    rank = roster.name_rank.tolist()
+    if seed is not None:
+        order = list(range(len(roster)))
+        random.Random(seed).shuffle(order)
+        for position, idx in enumerate(order):
+            rank[idx] = position
+    fair_queue = _FairQueue(len(roster), lambda idx: (duties[idx] / fte[idx], duties[idx], rank[idx]))
+    weekend_queue = _FairQueue(
+        len(roster), lambda idx: (weekends[idx] / fte[idx], duties[idx] / fte[idx], rank[idx])
+    )
+
+    def count_duties(idx: int, amount: int) -> None:
+        duties[idx] += amount
+        fair_queue.refresh(idx)
+        weekend_queue.refresh(idx)
+
+    def plan_slot(slot: ShiftSlot) -> None:
+        shift_type = slot.shift_type
+        track = board.track[shift_type.key]
+        first, last = slot.days[0], slot.days[-1]
+        if board.is_staffed(first, track):
+            return
+        qualified = roster.capable[shift_type.capability]
+        rest = board.rest_conflicts(slot, friday_night_rest_days)
+        mask = qualified & ~board.unavailable(first, last) & ~board.assigned(first, last) & ~rest
+        capped = None
+        if shift_type.weekend:
+            # Fairness uses the running weekend total, the cap applies per
+            # calendar month of the Saturday.
+            capped = monthly_weekends[slot.weekend_month] >= roster.weekend_caps
+            mask &= ~capped
+        if metrics is not None:
+            off = board.off_in(first, last)
+            rules = [
+                ("abwesend", board.absent_in(first, last)),
+                ("bereits_eingeteilt", board.assigned(first, last)),
+                ("ruhetage", off | rest),
+            ]
+            if capped is not None:
+                rules.append(("wochenend_limit", capped))
+            metrics.count_pick(qualified, rules)
+
+        queue = weekend_queue if shift_type.weekend else fair_queue
+        if board.wish is None:
+            idx = queue.pick(mask)
+        else:
+            # Slot days and days off on which the day shift would run.
+            blocked = tuple(
+                day for day in sorted({*slot.days, *slot.off_days}) if day.weekday() in board.fill_weekdays
+            )
+            idx = queue.pick_preferred(mask, board.wish_bonus(track, slot.days, blocked))
+        if idx is None:
+            warnings.append(slot.warning)
+            return
+        for day in slot.days:
+            board.assign(idx, day, track, shift_type.weight)
+        for day in slot.off_days:
+            board.mark_off(idx, day)
+        if shift_type.rest_before:
+            board.rest_start[idx, board.col(first)] = True
+        if shift_type.weekend:
+            weekends[idx] += 1
+            monthly_weekends[slot.weekend_month][idx] += 1
+        count_duties(idx, len(slot.days) * shift_type.weight)
+        placements.append(Placement(shift_type.key, roster.names[idx], slot.days, slot.off_days, slot.weekend_month))
+
+    # One pass over every slot: phase by phase (weekends are the hardest to
+    # fill and go first), within a phase in date order. Shifts staffed by
+    # everyone close their phase.
+    by_phase: dict[str, list[ShiftSlot]] = defaultdict(list)
+    for slot in shift_slots(days, friday_night_rest_days, shift_types):
+        by_phase[slot.shift_type.phase].append(slot)
+    clock = time.perf_counter()
+    for phase in PHASES:
+        for slot in by_phase[phase]:
+            plan_slot(slot)
+        for shift_type in shift_types:
+            if fill and shift_type.staff_all and shift_type.phase == phase:
+                for idx in np.flatnonzero(counts := _fill_shift(board, days, shift_type)):
+                    count_duties(int(idx), int(counts[idx]))
+        if metrics is not None:
+            clock = metrics.lap(phase, clock)
+    return _PlanRun(board, duties, weekends, monthly_weekends, warnings, placements)
+
+
+def _run_from_placements(
+    days: list[date],
+    absences: Absences,
+    max_parallel_absent: int,
+    friday_night_rest_days: int,
+    placements: list[Placement],
+    unfilled: list[str],
+    doctors: list[Doctor] | Roster | None = None,
+    shift_types: tuple[ShiftType, ...] = SHIFT_TYPES,
+    commitments: Commitments | None = None,
+    wishes: pd.DataFrame | None = None,
+) -> _PlanRun:
+    board = _Board(days, absences, max(friday_night_rest_days, 1), doctors, shift_types)
+    if commitments is not None:
+        board.add_commitments(commitments)
+    if wishes is not None and not wishes.empty:
+        board.add_wishes(wishes)
+    by_key = {shift_type.key: shift_type for shift_type in shift_types}
+    roster = board.roster
+    duties = [0] * len(roster)
+    weekends = [0] * len(roster)
+    monthly_weekends: dict[tuple[int, int], np.ndarray] = defaultdict(lambda: np.zeros(len(roster), dtype=np.int64))
+    for placement in placements:
+        idx = roster.index[placement.name]
+        for day in placement.days:
+            board.assign(idx, day, board.track[placement.shift], by_key[placement.shift].weight)
+        for day in placement.off_days:
+            board.mark_off(idx, day)
+        duties[idx] += len(placement.days) * by_key[placement.shift].weight
+        if placement.weekend_month is not None:
+            weekends[idx] += 1
+            monthly_weekends[placement.weekend_month][idx] += 1
+    for shift_type in shift_types:
+        if shift_type.staff_all:
+            for idx, count in enumerate(_fill_shift(board, days, shift_type).tolist()):
+                duties[idx] += count
+    warnings = _absence_limit_warnings(days, absences, max_parallel_absent) + unfilled
+    return _PlanRun(board, duties, weekends, monthly_weekends, warnings, placements)
+
+
+def _run_optimizer(
+    days: list[date],
+    absences: Absences,
+    max_parallel_absent: int,
+    friday_night_rest_days: int,
+    time_limit: float,
+    doctors: list[Doctor] | Roster | None = None,
+    metrics: PlanMetrics | None = None,
+    wishes: pd.DataFrame | None = None,
+    shift_types: tuple[ShiftType, ...] = SHIFT_TYPES,
+) -> _PlanRun:
+    greedy = _run_planner(
+        days, absences, max_parallel_absent, friday_night_rest_days, doctors, metrics, wishes, shift_types=shift_types
+    )
+    clock = time.perf_counter()
+    placements, unfilled, report = solve(
+        days,
+        absences,
+        friday_night_rest_days,
+        time_limit,
+        incumbent=greedy.placements,
+        doctors=doctors,
+        shift_types=shift_types,
+    )
+    run = _run_from_placements(
+        days, absences, max_parallel_absent, friday_night_rest_days, placements, unfilled, doctors, shift_types
+    )
+    run.report = report
+    if metrics is not None:
+        metrics.lap("optimierung", clock)
+    return run
+
+
+def _placements_from_plan(plan_df: pd.DataFrame, shift_types: tuple[ShiftType, ...] = SHIFT_TYPES) -> list[Placement]:
+    # Reads the slot holders back from a wide plan: each block from the cell
+    # of its first day, e.g. the Friday for weekend nights and the Saturday
+    # for the Sa/So day and visit shifts.
+    days = [date.fromisoformat(day) for day in plan_df["Datum"].tolist()]
+    placements: list[Placement] = []
+    for shift_type in shift_types:
+        if shift_type.staff_all:
+            continue
+        for day, holder in zip(days, plan_df[shift_type.column].tolist()):
+            anchor = day - timedelta(days=shift_type.start)
+            if isinstance(holder, str) and holder and anchor.weekday() in shift_type.weekdays:
+                placements.append(Placement(shift_type.key, holder, shift_type.block(anchor), ()))
+    return placements
+
+
+def _assignments(board: _Board, days: list[date]) -> pd.DataFrame:
+    cols = np.array([board.col(day) for day in days], dtype=int)
+    doctor_codes, day_codes, column_codes = np.nonzero(board.shifts[:, cols, :])
+    return assignment_table(days, board.names, day_codes, doctor_codes, column_codes, board.columns)
+
+
+def _plan_frame(
+    board: _Board,
+    days: list[date],
+    absences: Absences,
+    assignments: pd.DataFrame | None = None,
+) -> pd.DataFrame:
+    # The wide plan is a view of the long assignment table.
+    plan_df = wide_plan(_assignments(board, days) if assignments is None else assignments)
+    plan_df["Abwesend"] = [", ".join(sorted(absences.get(day, set()))) for day in days]
+    off = board.off[:, [board.col(day) for day in days]] > 0
+    plan_df["Geplant_frei"] = [", ".join(sorted(board.names_in(off[:, idx]))) for idx in range(len(days))]
+    return plan_df
+
+
+def _stats_frame(duties: list[int], weekends: list[int], roster: Roster) -> pd.DataFrame:
+    # Counts are indexed by doctor ID; names come in only here.
+    stats_df = pd.DataFrame(
+        {
+            "Arzt": roster.names,
+            "FTE": roster.fte.tolist(),
+            "Dienste_gesamt": duties,
+            "Dienste_pro_FTE": [round(count / fte, 2) for count, fte in zip(duties, roster.fte.tolist())],
+            "Wochenenden": weekends,
+        }
+    )
+    return stats_df.sort_values(by="Dienste_pro_FTE").reset_index(drop=True)
 
 
-def _pick_fair_weekend(
-    candidates: list[str],
-    weekend_count: dict[str, int],
-    duty_count: dict[str, int],
-    fte: dict[str, float],
-) -> str | None:
-    if not candidates:
+def _wish_table(wishes: WishInput | None, wish_weight: float) -> pd.DataFrame | None:
+    # A weight of 0 keeps the pure greedy order; the report is still built.
+    if wishes is None or wish_weight <= 0:
         return None
-    return min(
-        candidates,
-        key=lambda name: (
-            weekend_count[name] / fte[name],
-            duty_count[name] / fte[name],
-            name,
-        ),
-    )
+    return wish_frame(wishes, wish_weight)
 
 
 def generate_plan(
     year: int,
     month: int,
-    absences: dict[date, set[str]],
+    absences: Absences,
     max_parallel_absent: int,
     friday_night_rest_days: int = 3,
+    engine: str = "greedy",
+    time_limit: float = 2.0,
+    doctors: list[Doctor] | Roster | None = None,
+    metrics: bool = False,
+    wishes: WishInput | None = None,
+    wish_weight: float = 1.0,
+    seed: int | None = None,
+    shift_types: Sequence[ShiftType] | None = None,
 ) -> tuple[pd.DataFrame, pd.DataFrame, list[str]]:
+    # ``seed`` randomizes the greedy tie-breaking, see multistart.py.
+    # ``shift_types`` replaces the default SHIFT_TYPES; the plan gets one
+    # column per declared column.
     days = month_dates(year, month)
-    fte = {d.name: d.fte for d in DOCTORS}
-    duty_count: dict[str, int] = defaultdict(int)
-    weekend_count: dict[str, int] = defaultdict(int)
-    off_days: dict[date, set[str]] = defaultdict(set)
-    assigned: dict[date, dict[str, list[str] | str]] = defaultdict(dict)
-    warnings: list[str] = []
-
-    for day in days:
-        absent_count = len(absences.get(day, set()))
-        if absent_count > max_parallel_absent:
-            warnings.append(
-                f"{day.isoformat()}: {absent_count} als abwesend eingetragen (Limit {max_parallel_absent})."
-            )
-
-    def is_unavailable(name: str, day: date) -> bool:
-        return name in absences.get(day, set()) or name in off_days.get(day, set())
-
-    def has_assignment(name: str, day: date) -> bool:
-        for key, value in assigned.get(day, {}).items():
-            if key == "day" and isinstance(value, list) and name in value:
-                return True
-            if key != "day" and value == name:
-                return True
-        return False
-
-    def worked_previous_night(name: str, day: date) -> bool:
-        return assigned.get(day - timedelta(days=1), {}).get("night") == name
-
-    fridays = [d for d in days if d.weekday() == 4]
-    for friday in fridays:
-        saturday = friday + timedelta(days=1)
-        sunday = friday + timedelta(days=2)
-        if saturday.month != month or sunday.month != month:
-            continue
-
-        full_pool = [doctor.name for doctor in DOCTORS if doctor.can_full_service]
-        visit_pool = [doctor.name for doctor in DOCTORS if doctor.can_visit]
-
-        night_candidates: list[str] = []
-        for name in full_pool:
-            if any(is_unavailable(name, d) for d in (friday, saturday, sunday)):
-                continue
-            if any(has_assignment(name, d) for d in (friday, saturday, sunday)):
-                continue
-            if any(has_assignment(name, friday - timedelta(days=delta)) for delta in range(1, friday_night_rest_days + 1)):
-                continue
-            max_weekends = DOCTOR_BY_NAME[name].max_weekends_per_month
-            if max_weekends is not None and weekend_count[name] >= max_weekends:
-                continue
-            night_candidates.append(name)
+    plan_metrics = PlanMetrics() if metrics else None
+    wish_table = _wish_table(wishes, wish_weight)
+    shift_types = check_shift_types(shift_types)
+    if engine == "greedy":
+        run = _run_planner(
+            days,
+            absences,
+            max_parallel_absent,
+            friday_night_rest_days,
+            doctors,
+            plan_metrics,
+            wish_table,
+            seed,
+            shift_types,
+        )
+    elif engine == "optimize":
+        run = _run_optimizer(
+            days,
+            absences,
+            max_parallel_absent,
+            friday_night_rest_days,
+            time_limit,
+            doctors,
+            plan_metrics,
+            wish_table,
+            shift_types,
+        )
+    else:
+        raise ValueError(f"Unbekanntes Planungsverfahren '{engine}'.")
+    clock = time.perf_counter()
+    plan_df = _plan_frame(run.board, days, absences)
+    if plan_metrics is not None:
+        clock = plan_metrics.lap("plan_df", clock)
+    stats_df = _stats_frame(run.duties, run.weekends, run.board.roster)
+    # The solver report (time, explored nodes, objective) travels with the plan.
+    if run.report is not None:
+        plan_df.attrs["solver"] = run.report
+    if wishes is not None:
+        plan_df.attrs["wishes"] = wish_report(plan_df, wishes)
+    if plan_metrics is not None:
+        plan_metrics.lap("stats_df", clock)
+        plan_df.attrs["metrics"] = plan_metrics
+    return plan_df, stats_df, run.warnings
+
+
+@dataclass
+class HorizonPlan:
+    plan_df: pd.DataFrame
+    stats_df: pd.DataFrame
+    warnings: list[str]
+    monthly_duties: dict[tuple[int, int], dict[str, int]] = field(repr=False)
+    monthly_weekends: dict[tuple[int, int], dict[str, int]] = field(repr=False)
+    assignments: pd.DataFrame = field(repr=False)
+    roster: Roster = field(default_factory=compile_roster, repr=False)
+
+    @property
+    def months(self) -> list[tuple[int, int]]:
+        return sorted(self.monthly_duties)
+
+    def month(self, year: int, month: int) -> tuple[pd.DataFrame, pd.DataFrame, list[str]]:
+        prefix = f"{year:04d}-{month:02d}"
+        plan_df = self.plan_df[self.plan_df["Datum"].str.startswith(prefix)].reset_index(drop=True)
+        duties = self.monthly_duties.get((year, month), {})
+        weekends = self.monthly_weekends.get((year, month), {})
+        stats_df = _stats_frame(
+            [duties.get(name, 0) for name in self.roster.names],
+            [weekends.get(name, 0) for name in self.roster.names],
+            self.roster,
+        )
+        warnings = [warning for warning in self.warnings if warning.startswith(prefix)]
+        return plan_df, stats_df, warnings
 
-        weekend_night_doc = _pick_fair_weekend(night_candidates, weekend_count, duty_count, fte)
-        if weekend_night_doc is None:
-            warnings.append(f"{friday.isoformat()}: Kein Kandidat fuer Fr/Sa/So Nachtdienst.")
-        else:
-            assigned[friday]["night"] = weekend_night_doc
-            assigned[saturday]["night"] = weekend_night_doc
-            assigned[sunday]["night"] = weekend_night_doc
-            duty_count[weekend_night_doc] += 3
-            weekend_count[weekend_night_doc] += 1
-            off_days[friday].add(weekend_night_doc)
-            off_days[saturday + timedelta(days=1)].add(weekend_night_doc)
-            off_days[sunday + timedelta(days=1)].add(weekend_night_doc)
-
-        weekend_day_candidates: list[str] = []
-        for name in full_pool:
-            if name == weekend_night_doc:
-                continue
-            if any(is_unavailable(name, d) for d in (saturday, sunday)):
-                continue
-            if any(has_assignment(name, d) for d in (saturday, sunday)):
-                continue
-            max_weekends = DOCTOR_BY_NAME[name].max_weekends_per_month
-            if max_weekends is not None and weekend_count[name] >= max_weekends:
-                continue
-            weekend_day_candidates.append(name)
 
-        weekend_day_doc = _pick_fair_weekend(weekend_day_candidates, weekend_count, duty_count, fte)
-        if weekend_day_doc is None:
-            warnings.append(f"{friday.isoformat()}: Kein Kandidat fuer Sa/So Tagdienst.")
-        else:
-            assigned[saturday]["weekend_day"] = weekend_day_doc
-            assigned[sunday]["weekend_day"] = weekend_day_doc
-            duty_count[weekend_day_doc] += 2
-            weekend_count[weekend_day_doc] += 1
-            off_days[friday + timedelta(days=5)].add(weekend_day_doc)
-
-        visit_candidates: list[str] = []
-        for name in visit_pool:
-            if name in (weekend_night_doc, weekend_day_doc):
-                continue
-            if any(is_unavailable(name, d) for d in (saturday, sunday)):
-                continue
-            if any(has_assignment(name, d) for d in (saturday, sunday)):
-                continue
-            visit_candidates.append(name)
+def generate_horizon(
+    start: date,
+    end: date,
+    absences: Absences,
+    max_parallel_absent: int,
+    friday_night_rest_days: int = 3,
+    doctors: list[Doctor] | Roster | None = None,
+    metrics: bool = False,
+    wishes: WishInput | None = None,
+    wish_weight: float = 1.0,
+    shift_types: Sequence[ShiftType] | None = None,
+) -> HorizonPlan:
+    if end < start:
+        raise ValueError("Enddatum darf nicht vor dem Startdatum liegen.")
+    days = [start + timedelta(days=offset) for offset in range((end - start).days + 1)]
+    plan_metrics = PlanMetrics() if metrics else None
+    run = _run_planner(
+        days,
+        absences,
+        max_parallel_absent,
+        friday_night_rest_days,
+        doctors,
+        plan_metrics,
+        _wish_table(wishes, wish_weight),
+        shift_types=check_shift_types(shift_types),
+    )
 
-        visit_doc = _pick_fair(visit_candidates, duty_count, fte)
-        if visit_doc is None:
-            warnings.append(f"{friday.isoformat()}: Kein Kandidat fuer Sa/So Visitendienst.")
-        else:
-            assigned[saturday]["visit"] = visit_doc
-            assigned[sunday]["visit"] = visit_doc
-            duty_count[visit_doc] += 2
+    warnings = list(run.warnings)
+    if days[0].weekday() in (5, 6):
+        warnings.append(f"{days[0].isoformat()}: Wochenende beginnt vor dem Planungszeitraum und wurde nicht geplant.")
+    if days[-1].weekday() in (4, 5):
+        warnings.append(f"{days[-1].isoformat()}: Wochenende endet nach dem Planungszeitraum und wurde nicht geplant.")
+
+    board = run.board
+    monthly_duties: dict[tuple[int, int], dict[str, int]] = {}
+    for month_key in sorted({(day.year, day.month) for day in days}):
+        cols = [board.col(day) for day in days if (day.year, day.month) == month_key]
+        totals = board.duties[:, cols].sum(axis=1)
+        monthly_duties[month_key] = dict(zip(board.names, totals.tolist()))
+
+    clock = time.perf_counter()
+    assignments = _assignments(board, days)
+    plan_df = _plan_frame(board, days, absences, assignments)
+    if plan_metrics is not None:
+        clock = plan_metrics.lap("plan_df", clock)
+    stats_df = _stats_frame(run.duties, run.weekends, board.roster)
+    if plan_metrics is not None:
+        plan_metrics.lap("stats_df", clock)
+        plan_df.attrs["metrics"] = plan_metrics
+    if wishes is not None:
+        plan_df.attrs["wishes"] = wish_report(plan_df, wishes)
+
+    return HorizonPlan(
+        plan_df=plan_df,
+        stats_df=stats_df,
+        warnings=warnings,
+        monthly_duties=monthly_duties,
+        monthly_weekends={key: dict(zip(board.names, value.tolist())) for key, value in run.monthly_weekends.items()},
+        assignments=assignments,
+        roster=board.roster,
+    )
 
-        friday_late_candidates: list[str] = []
-        for name in full_pool:
-            if name == weekend_night_doc:
-                continue
-            if is_unavailable(name, friday) or has_assignment(name, friday):
-                continue
-            friday_late_candidates.append(name)
 
-        friday_late_doc = _pick_fair(friday_late_candidates, duty_count, fte)
-        if friday_late_doc is None:
-            warnings.append(f"{friday.isoformat()}: Kein Kandidat fuer Freitag bis 19 Uhr.")
+def improve_plan(
+    year: int,
+    month: int,
+    plan_df: pd.DataFrame,
+    absences: Absences,
+    max_parallel_absent: int,
+    friday_night_rest_days: int = 3,
+    time_limit: float = 1.0,
+    max_moves: int = 200_000,
+    seed: int = 0,
+    doctors: list[Doctor] | Roster | None = None,
+    shift_types: Sequence[ShiftType] | None = None,
+    wishes: WishInput | None = None,
+    wish_weight: float = 1.0,
+) -> tuple[pd.DataFrame, pd.DataFrame, list[str]]:
+    days = month_dates(year, month)
+    shift_types = check_shift_types(shift_types)
+    wish_table = _wish_table(wishes, wish_weight)
+    placements, unfilled, report = improve(
+        days,
+        absences,
+        friday_night_rest_days,
+        _placements_from_plan(plan_df, shift_types),
+        time_limit=time_limit,
+        max_moves=max_moves,
+        seed=seed,
+        doctors=doctors,
+        shift_types=shift_types,
+        wishes=wish_table,
+    )
+    run = _run_from_placements(
+        days,
+        absences,
+        max_parallel_absent,
+        friday_night_rest_days,
+        placements,
+        unfilled,
+        doctors,
+        shift_types,
+        wishes=wish_table,
+    )
+    improved_df = _plan_frame(run.board, days, absences)
+    improved_df.attrs["local_search"] = report
+    if wishes is not None:
+        improved_df.attrs["wishes"] = wish_report(improved_df, wishes)
+    return improved_df, _stats_frame(run.duties, run.weekends, run.board.roster), run.warnings
+
+
+@dataclass(frozen=True)
+class ReplanReport:
+    solve_seconds: float
+    affected_slots: int
+    reassigned_slots: int
+    ejections: int
+    changed_cells: int
+    full_seconds: float | None = None
+    full_changed_cells: int | None = None
+
+
+def _changed_cells(before: pd.DataFrame, after: pd.DataFrame, columns: Sequence[str]) -> int:
+    columns = list(columns)
+    if before["Datum"].tolist() != after["Datum"].tolist():
+        after = after.set_index("Datum").reindex(before["Datum"]).reset_index()
+    left = before[columns].to_numpy(dtype=object)
+    right = after[columns].to_numpy(dtype=object)
+    left[pd.isna(left)] = ""
+    right[pd.isna(right)] = ""
+    return int((left != right).sum())
+
+
+def absence_delta(
+    before: dict[date, set[str]],
+    after: dict[date, set[str]],
+) -> tuple[dict[date, set[str]], dict[date, set[str]]]:
+    added: dict[date, set[str]] = {}
+    removed: dict[date, set[str]] = {}
+    for day in set(before) | set(after):
+        old, new = set(before.get(day, set())), set(after.get(day, set()))
+        if new - old:
+            added[day] = new - old
+        if old - new:
+            removed[day] = old - new
+    return added, removed
+
+
+def _apply_absence_delta(
+    absences: dict[date, set[str]],
+    added: dict[date, set[str]],
+    removed: dict[date, set[str]],
+) -> dict[date, set[str]]:
+    updated = {day: set(names) for day, names in absences.items()}
+    for day, names in added.items():
+        updated.setdefault(day, set()).update(names)
+    for day, names in removed.items():
+        remaining = updated.get(day, set()) - names
+        if remaining:
+            updated[day] = remaining
         else:
-            assigned[friday]["friday_late"] = friday_late_doc
-            duty_count[friday_late_doc] += 1
+            updated.pop(day, None)
+    return updated
 
-    for day in days:
-        if day.weekday() >= 5 or day.weekday() == 4:
-            continue
-        if "night" in assigned[day]:
-            continue
-        candidates: list[str] = []
-        for doctor in DOCTORS:
-            if not doctor.can_full_service:
-                continue
-            name = doctor.name
-            if is_unavailable(name, day) or has_assignment(name, day):
-                continue
-            candidates.append(name)
-        night_doc = _pick_fair(candidates, duty_count, fte)
-        if night_doc is None:
-            warnings.append(f"{day.isoformat()}: Kein Kandidat fuer Nachtdienst.")
-            continue
-        assigned[day]["night"] = night_doc
-        duty_count[night_doc] += 1
-        off_days[day].add(night_doc)
-        off_days[day + timedelta(days=1)].add(night_doc)
 
-    for day in days:
-        if day.weekday() >= 5:
-            continue
-        candidates: list[str] = []
-        for doctor in DOCTORS:
-            if not doctor.can_day:
-                continue
-            name = doctor.name
-            if is_unavailable(name, day) or has_assignment(name, day) or worked_previous_night(name, day):
-                continue
-            candidates.append(name)
-        assigned[day]["day"] = sorted(candidates)
-        for name in candidates:
-            duty_count[name] += 1
-
-    weekday_map = ["Mo", "Di", "Mi", "Do", "Fr", "Sa", "So"]
-    rows: list[dict[str, str]] = []
-    for day in days:
-        day_names = assigned.get(day, {}).get("day", [])
-        if isinstance(day_names, str):
-            day_names = [day_names]
-        rows.append(
-            {
-                "Datum": day.isoformat(),
-                "Wochentag": weekday_map[day.weekday()],
-                "Tagdienst": ", ".join(day_names),
-                "Freitag_bis_19": str(assigned.get(day, {}).get("friday_late", "")),
-                "Nachtdienst": str(assigned.get(day, {}).get("night", "")),
-                "Wochenend_Tagdienst": str(assigned.get(day, {}).get("weekend_day", "")),
-                "Visitendienst": str(assigned.get(day, {}).get("visit", "")),
-                "Abwesend": ", ".join(sorted(absences.get(day, set()))),
-                "Geplant_frei": ", ".join(sorted(off_days.get(day, set()))),
-            }
+def replan(
+    year: int,
+    month: int,
+    plan_df: pd.DataFrame,
+    absences: dict[date, set[str]],
+    max_parallel_absent: int,
+    friday_night_rest_days: int = 3,
+    added: dict[date, set[str]] | None = None,
+    removed: dict[date, set[str]] | None = None,
+    compare_full: bool = True,
+    doctors: list[Doctor] | Roster | None = None,
+    shift_types: Sequence[ShiftType] | None = None,
+) -> tuple[pd.DataFrame, pd.DataFrame, list[str]]:
+    # ``absences`` are the ones plan_df was made with; ``added``/``removed``
+    # is the change. Only slots on changed days are reconsidered.
+    added = added or {}
+    removed = removed or {}
+    started = time.perf_counter()
+    days = month_dates(year, month)
+    shift_types = check_shift_types(shift_types)
+    updated = _apply_absence_delta(absences, added, removed)
+    placements, unfilled, repair_report = repair(
+        days,
+        updated,
+        friday_night_rest_days,
+        _placements_from_plan(plan_df, shift_types),
+        changed_days=set(added) | set(removed),
+        doctors=doctors,
+        shift_types=shift_types,
+    )
+    run = _run_from_placements(
+        days, updated, max_parallel_absent, friday_night_rest_days, placements, unfilled, doctors, shift_types
+    )
+    new_plan_df = _plan_frame(run.board, days, updated)
+    stats_df = _stats_frame(run.duties, run.weekends, run.board.roster)
+    solve_seconds = time.perf_counter() - started
+
+    full_seconds = full_changed = None
+    if compare_full:
+        started = time.perf_counter()
+        full_plan_df, _, _ = generate_plan(
+            year, month, updated, max_parallel_absent, friday_night_rest_days, doctors=doctors, shift_types=shift_types
         )
-    plan_df = pd.DataFrame(rows)
-
-    stat_rows = [
-        {
-            "Arzt": doctor.name,
-            "FTE": doctor.fte,
-            "Dienste_gesamt": duty_count[doctor.name],
-            "Dienste_pro_FTE": round(duty_count[doctor.name] / doctor.fte, 2),
-            "Wochenenden": weekend_count[doctor.name],
-        }
-        for doctor in DOCTORS
-    ]
-    stats_df = pd.DataFrame(stat_rows).sort_values(by="Dienste_pro_FTE").reset_index(drop=True)
-    return plan_df, stats_df, warnings
+        full_seconds = round(time.perf_counter() - started, 4)
+        full_changed = _changed_cells(plan_df, full_plan_df, run.board.columns)
+
+    new_plan_df.attrs["replan"] = ReplanReport(
+        solve_seconds=round(solve_seconds, 4),
+        affected_slots=repair_report.affected_slots,
+        reassigned_slots=repair_report.reassigned_slots,
+        ejections=repair_report.ejections,
+        changed_cells=_changed_cells(plan_df, new_plan_df, run.board.columns),
+        full_seconds=full_seconds,
+        full_changed_cells=full_changed,
+    )
+    return new_plan_df, stats_df, run.warnings
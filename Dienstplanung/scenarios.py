@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import itertools
+import math
+import os
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import date
+
+import pandas as pd
+
+from models import Doctor, Roster, compile_roster
+from planner import generate_plan
+
+
+@dataclass(frozen=True)
+class Scenario:
+    label: str
+    max_parallel_absent: int
+    friday_night_rest_days: int
+    absences: dict[date, set[str]]
+
+
+def merge_absences(*parts: dict[date, set[str]]) -> dict[date, set[str]]:
+    merged: dict[date, set[str]] = defaultdict(set)
+    for part in parts:
+        for day, names in part.items():
+            merged[day].update(names)
+    return dict(merged)
+
+
+def approval_variants(
+    fixed: dict[date, set[str]],
+    requests: dict[str, dict[date, set[str]]],
+    exhaustive: bool = False,
+) -> dict[str, dict[date, set[str]]]:
+    # Without exhaustive, every request is declined once on its own; with it,
+    # all 2**n combinations of approvals are produced.
+    labels = sorted(requests)
+    variants = {"Alle genehmigt": merge_absences(fixed, *(requests[label] for label in labels))}
+    if exhaustive:
+        for size in range(len(labels) - 1, -1, -1):
+            for approved in itertools.combinations(labels, size):
+                declined = [label for label in labels if label not in approved]
+                key = "Abgelehnt: " + ", ".join(declined)
+                variants[key] = merge_absences(fixed, *(requests[label] for label in approved))
+    else:
+        for declined in labels:
+            approved = [requests[label] for label in labels if label != declined]
+            variants[f"Abgelehnt: {declined}"] = merge_absences(fixed, *approved)
+    return variants
+
+
+def scenario_grid(
+    max_parallel_absent: list[int],
+    friday_night_rest_days: list[int],
+    absence_variants: dict[str, dict[date, set[str]]],
+) -> list[Scenario]:
+    return [
+        Scenario(
+            label=f"{variant} | frei {limit} | Ruhe {rest}",
+            max_parallel_absent=limit,
+            friday_night_rest_days=rest,
+            absences=absences,
+        )
+        for variant, absences in absence_variants.items()
+        for limit in max_parallel_absent
+        for rest in friday_night_rest_days
+    ]
+
+
+def plan_scores(
+    plan_df: pd.DataFrame,
+    stats_df: pd.DataFrame,
+    warnings: list[str],
+    roster: Roster,
+) -> dict[str, object]:
+    """Figures to rank plans by; lower is better except the wish rate.
+
+    ``Wunscherfuellung`` (weighted) is only there if the plan carries a wish
+    report. Weekends count the doctors on the full-service pool only.
+    """
+    full_service = roster.names_of(roster.pools["full"])
+    weekends = stats_df.loc[stats_df["Arzt"].isin(full_service), "Wochenenden"]
+    per_fte = stats_df["Dienste_pro_FTE"]
+    scores: dict[str, object] = {
+        "Warnungen": len(warnings),
+        "Unbesetzt": sum("Kein Kandidat" in warning for warning in warnings),
+        "Spannweite_Dienste_pro_FTE": round(float(per_fte.max() - per_fte.min()), 2),
+        "Wochenenden_max": int(weekends.max()) if not weekends.empty else 0,
+        "Wochenenden_Spannweite": int(weekends.max() - weekends.min()) if not weekends.empty else 0,
+    }
+    report = plan_df.attrs.get("wishes")
+    if report is not None:
+        scores["Wunscherfuellung"] = round(report.weighted_rate, 4)
+    return scores
+
+
+def _evaluate(job: tuple[int, int, Scenario, list[Doctor] | Roster | None]) -> dict[str, object]:
+    year, month, scenario, doctors = job
+    plan_df, stats_df, warnings = generate_plan(
+        year,
+        month,
+        scenario.absences,
+        scenario.max_parallel_absent,
+        scenario.friday_night_rest_days,
+        doctors=doctors,
+    )
+    return {
+        "Szenario": scenario.label,
+        "Max_gleichzeitig_frei": scenario.max_parallel_absent,
+        "Ruhetage_vor_Freitag": scenario.friday_night_rest_days,
+        **plan_scores(plan_df, stats_df, warnings, compile_roster(doctors)),
+    }
+
+
+def run_scenarios(
+    year: int,
+    month: int,
+    scenarios: list[Scenario],
+    max_workers: int | None = None,
+    doctors: list[Doctor] | Roster | None = None,
+) -> pd.DataFrame:
+    # ``doctors`` defaults to models.DOCTORS like generate_plan.
+    jobs = [(year, month, scenario, doctors) for scenario in scenarios]
+    workers = min(max_workers or os.cpu_count() or 1, max(len(jobs), 1))
+    if workers <= 1:
+        rows = [_evaluate(job) for job in jobs]
+    else:
+        # Single plans take milliseconds, so jobs are shipped in chunks to keep
+        # the pickling round trips from dominating.
+        chunksize = max(1, math.ceil(len(jobs) / (workers * 4)))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            rows = list(pool.map(_evaluate, jobs, chunksize=chunksize))
+
+    result = pd.DataFrame(rows)
+    if result.empty:
+        return result
+    result = result.sort_values(
+        by=["Unbesetzt", "Warnungen", "Spannweite_Dienste_pro_FTE", "Wochenenden_Spannweite", "Szenario"],
+        kind="stable",
+    ).reset_index(drop=True)
+    result.insert(0, "Rang", range(1, len(result) + 1))
+    return result
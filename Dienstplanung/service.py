@@ -0,0 +1,438 @@
+"""Local HTTP planning service.
+
+Run from the Dienstplanung directory::
+
+    python service.py --port 8765 --workers 2 --queue-size 32
+
+Endpoints:
+
+* ``POST /jobs`` takes a JSON planning request (see :func:`parse_request`)
+  and answers 202 with the job id. A request equal to one that is still
+  queued or running gets that job's id back instead of a new job. When the
+  queue is full the answer is 429 with ``Retry-After``.
+* ``GET /jobs/{id}`` reports the status, ``GET /jobs/{id}/result`` returns
+  plan, statistics and warnings in the JSON form of the CLI.
+* ``GET /metrics`` reports counters, queue depth, throughput and latency
+  percentiles, ``GET /health`` answers as soon as the service is up.
+
+Plans are computed in a process pool with ``--workers`` processes; at most
+``--queue-size`` jobs wait for a free worker.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import itertools
+import math
+import time
+import uuid
+from collections import OrderedDict, deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Any, Callable
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from absences import AbsenceIndex, AbsenceStream
+from dienstplanung_cli import ENGINES, plan_period
+from models import DOCTORS, Doctor, doctors_from_records
+from plan_cache import plan_key
+from wishes import WISH_TYPES
+
+LATENCY_WINDOW = 1000
+THROUGHPUT_WINDOW = 60.0
+
+
+@dataclass(frozen=True)
+class PlanRequest:
+    period: str
+    absences: AbsenceIndex = field(repr=False)
+    max_parallel_absent: int = 3
+    engine: str = "greedy"
+    doctors: list[Doctor] | None = field(default=None, repr=False)
+    wishes: list[dict[str, Any]] | None = field(default=None, repr=False)
+    wish_weight: float = 1.0
+    warnings: tuple[str, ...] = ()
+
+    @property
+    def key(self) -> str:
+        return plan_key(
+            self.absences,
+            doctors=self.doctors,
+            period=self.period,
+            max_parallel_absent=self.max_parallel_absent,
+            engine=self.engine,
+            wishes=sorted(
+                (str(wish.get("Datum")), str(wish.get("Arzt")), str(wish.get("Wunsch")), str(wish.get("Gewicht", "")))
+                for wish in self.wishes or ()
+            ),
+            wish_weight=self.wish_weight,
+        )
+
+
+def _check_wishes(wishes: list[dict[str, Any]], doctors: list[Doctor] | None) -> None:
+    names = {doctor.name for doctor in doctors or DOCTORS}
+    for position, wish in enumerate(wishes, start=1):
+        try:
+            date.fromisoformat(str(wish.get("Datum")))
+        except ValueError:
+            raise ValueError(f"Wunsch {position}: Ungueltiges Datum '{wish.get('Datum')}'.") from None
+        if wish.get("Arzt") not in names:
+            raise ValueError(f"Wunsch {position}: Unbekannter Arzt '{wish.get('Arzt')}'.")
+        if wish.get("Wunsch") not in WISH_TYPES:
+            raise ValueError(f"Wunsch {position}: Unbekannter Wunsch '{wish.get('Wunsch')}'.")
+        if "Gewicht" in wish:
+            try:
+                float(wish["Gewicht"])
+            except (TypeError, ValueError):
+                raise ValueError(f"Wunsch {position}: 'Gewicht' muss eine Zahl sein.") from None
+
+
+def parse_request(body: Any) -> PlanRequest:
+    """Validates a planning request.
+
+    ``{"month": "2026-03"}`` or ``{"year": 2026}`` selects the period. The
+    optional fields are ``absences`` (text or list of lines in the absence
+    file format), ``doctors`` (list of ``Doctor`` fields), ``wishes`` (list
+    of ``{"Datum", "Arzt", "Wunsch"}`` with an optional ``Gewicht``; the
+    doctor must be on the roster and the wish one of
+    :data:`wishes.WISH_TYPES`), ``max_parallel_absent``, ``engine`` and
+    ``wish_weight``.
+    """
+    if not isinstance(body, dict):
+        raise ValueError("Anfrage muss ein JSON-Objekt sein.")
+    if ("month" in body) == ("year" in body):
+        raise ValueError("Genau eines von 'month' oder 'year' angeben.")
+    try:
+        if "year" in body:
+            year, month = int(body["year"]), 1
+            period = f"{year:04d}"
+        else:
+            year, month = (int(part) for part in str(body["month"]).split("-"))
+            period = f"{year:04d}-{month:02d}"
+        date(year, month, 1)
+    except ValueError:
+        raise ValueError("Ungueltiger Zeitraum, erwartet 'month': 'JJJJ-MM' oder 'year': JJJJ.") from None
+    engine = str(body.get("engine", "greedy"))
+    if engine not in ENGINES:
+        raise ValueError(f"Unbekanntes Planungsverfahren '{engine}'.")
+    if "year" in body and engine != "greedy":
+        raise ValueError("Ein ganzes Jahr wird nur mit 'greedy' geplant.")
+    try:
+        max_parallel_absent = int(body.get("max_parallel_absent", 3))
+        wish_weight = float(body.get("wish_weight", 1.0))
+    except (TypeError, ValueError):
+        raise ValueError("'max_parallel_absent' und 'wish_weight' muessen Zahlen sein.") from None
+    doctors = None
+    if body.get("doctors") is not None:
+        if not (isinstance(body["doctors"], list) and all(isinstance(row, dict) for row in body["doctors"])):
+            raise ValueError("'doctors' muss eine Liste von Objekten sein.")
+        doctors = doctors_from_records(body["doctors"])
+    lines = body.get("absences") or []
+    stream = AbsenceStream(lines.splitlines() if isinstance(lines, str) else [str(line) for line in lines], doctors)
+    absences = AbsenceIndex.from_intervals(stream)
+    wishes = body.get("wishes")
+    if wishes is not None:
+        if not (isinstance(wishes, list) and all(isinstance(wish, dict) for wish in wishes)):
+            raise ValueError("'wishes' muss eine Liste von Objekten sein.")
+        _check_wishes(wishes, doctors)
+    return PlanRequest(
+        period=period,
+        absences=absences,
+        max_parallel_absent=max_parallel_absent,
+        engine=engine,
+        doctors=doctors,
+        wishes=wishes,
+        wish_weight=wish_weight,
+        warnings=tuple(stream.warnings),
+    )
+
+
+def run_request(request: PlanRequest) -> dict[str, Any]:
+    """Computes one job; runs inside a pool process."""
+    from plan_table import plan_payload
+
+    plan_df, stats_df, warnings, _ = plan_period(
+        request.period,
+        request.absences,
+        request.max_parallel_absent,
+        request.engine,
+        request.doctors,
+        request.wishes,
+        request.wish_weight,
+    )
+    return {"zeitraum": request.period, **plan_payload(plan_df, stats_df, [*request.warnings, *warnings])}
+
+
+def _warm_up() -> None:
+    import planner  # noqa: F401
+
+
+@dataclass
+class Job:
+    id: str
+    key: str
+    request: PlanRequest = field(repr=False)
+    status: str = "wartend"
+    submitted: float = field(default_factory=time.perf_counter)
+    started: float | None = None
+    finished: float | None = None
+    result: dict[str, Any] | None = field(default=None, repr=False)
+    error: str | None = None
+
+    def describe(self) -> dict[str, Any]:
+        now = time.perf_counter()
+        return {
+            "id": self.id,
+            "status": self.status,
+            "zeitraum": self.request.period,
+            "wartezeit_s": round((self.started or now) - self.submitted, 4),
+            "laufzeit_s": round((self.finished or now) - self.started, 4) if self.started is not None else None,
+            "fehler": self.error,
+        }
+
+
+class QueueFull(Exception):
+    pass
+
+
+def _percentiles(samples: deque[float]) -> dict[str, float | None]:
+    ordered = sorted(samples)
+    if not ordered:
+        return {"p50_ms": None, "p95_ms": None, "max_ms": None}
+
+    def rank(q: float) -> float:
+        return round(ordered[max(0, math.ceil(q * len(ordered)) - 1)] * 1000, 2)
+
+    return {"p50_ms": rank(0.50), "p95_ms": rank(0.95), "max_ms": round(ordered[-1] * 1000, 2)}
+
+
+class JobQueue:
+    """Bounded job queue in front of an executor.
+
+    ``workers`` tasks take jobs from an ``asyncio.Queue`` of ``queue_size``
+    slots and hand them to the executor, so at most ``workers`` plans run at
+    once and at most ``queue_size`` wait. Identical requests share a job
+    while it is in flight. The last ``retain`` finished jobs stay
+    retrievable.
+    """
+
+    def __init__(
+        self,
+        workers: int = 2,
+        queue_size: int = 32,
+        retain: int = 1000,
+        executor: Executor | None = None,
+        runner: Callable[[PlanRequest], dict[str, Any]] = run_request,
+    ) -> None:
+        if workers < 1 or queue_size < 1:
+            raise ValueError("Mindestens ein Worker und ein Warteplatz sind noetig.")
+        self.workers = workers
+        self.queue_size = queue_size
+        self.retain = retain
+        self.runner = runner
+        self._executor = executor
+        self._owns_executor = executor is None
+        self._queue: asyncio.Queue[Job] | None = None
+        self._tasks: list[asyncio.Task] = []
+        self._jobs: OrderedDict[str, Job] = OrderedDict()
+        self._in_flight: dict[str, Job] = {}
+        self._ids = itertools.count(1)
+        self._started_at = time.perf_counter()
+        self._completions: deque[float] = deque()
+        self._latency = {name: deque(maxlen=LATENCY_WINDOW) for name in ("warten", "planen", "gesamt")}
+        self.counters = {
+            "angenommen": 0,
+            "dedupliziert": 0,
+            "abgelehnt": 0,
+            "fertig": 0,
+            "fehlgeschlagen": 0,
+        }
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    async def start(self) -> None:
+        if self.running:
+            return
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            # Start the pool processes and import the planner now instead of
+            # on the first requests.
+            loop = asyncio.get_running_loop()
+            await asyncio.gather(*(loop.run_in_executor(self._executor, _warm_up) for _ in range(self.workers)))
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._started_at = time.perf_counter()
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._owns_executor and self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def submit(self, request: PlanRequest) -> tuple[Job, bool]:
+        """Queues ``request`` and returns the job and whether it was shared."""
+        if self._queue is None:
+            raise RuntimeError("Warteschlange ist nicht gestartet.")
+        key = request.key
+        job = self._in_flight.get(key)
+        if job is not None:
+            self.counters["dedupliziert"] += 1
+            return job, True
+        job = Job(id=f"{next(self._ids)}-{uuid.uuid4().hex[:8]}", key=key, request=request)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            self.counters["abgelehnt"] += 1
+            raise QueueFull from None
+        self.counters["angenommen"] += 1
+        self._in_flight[key] = job
+        self._jobs[job.id] = job
+        self._evict()
+        return job, False
+
+    def get(self, job_id: str) -> Job | None:
+        return self._jobs.get(job_id)
+
+    def _evict(self) -> None:
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished is not None]
+        for job_id in finished[: max(0, len(finished) - self.retain)]:
+            del self._jobs[job_id]
+
+    async def _work(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            job = await self._queue.get()
+            job.status = "laeuft"
+            job.started = time.perf_counter()
+            try:
+                job.result = await loop.run_in_executor(self._executor, self.runner, job.request)
+                job.status = "fertig"
+            except Exception as exc:  # noqa: BLE001 - reported to the client
+                job.status = "fehlgeschlagen"
+                job.error = str(exc) or type(exc).__name__
+            finally:
+                job.finished = time.perf_counter()
+                self._in_flight.pop(job.key, None)
+                self._queue.task_done()
+            self.counters[job.status] += 1
+            self._completions.append(job.finished)
+            self._latency["warten"].append(job.started - job.submitted)
+            self._latency["planen"].append(job.finished - job.started)
+            self._latency["gesamt"].append(job.finished - job.submitted)
+            self._evict()
+
+    def metrics(self) -> dict[str, Any]:
+        now = time.perf_counter()
+        while self._completions and self._completions[0] < now - THROUGHPUT_WINDOW:
+            self._completions.popleft()
+        uptime = now - self._started_at
+        window = min(THROUGHPUT_WINDOW, uptime)
+        done = self.counters["fertig"] + self.counters["fehlgeschlagen"]
+        return {
+            **self.counters,
+            "wartend": self._queue.qsize() if self._queue is not None else 0,
+            "laufend": sum(job.status == "laeuft" for job in self._in_flight.values()),
+            "worker": self.workers,
+            "warteplaetze": self.queue_size,
+            "laufzeit_s": round(uptime, 1),
+            "durchsatz_pro_s": round(len(self._completions) / window, 3) if window > 0 else 0.0,
+            "durchsatz_gesamt_pro_s": round(done / uptime, 3) if uptime > 0 else 0.0,
+            "latenz": {name: _percentiles(samples) for name, samples in self._latency.items()},
+        }
+
+
+def _error(status: int, message: str, **headers: str) -> JSONResponse:
+    return JSONResponse({"fehler": message}, status_code=status, headers=headers or None)
+
+
+def create_app(queue: JobQueue | None = None, **options: Any) -> Starlette:
+    """Builds the ASGI app; ``options`` are passed to :class:`JobQueue`."""
+    jobs = queue if queue is not None else JobQueue(**options)
+
+    async def submit(request: Request) -> JSONResponse:
+        try:
+            plan_request = parse_request(await request.json())
+        except ValueError as exc:
+            return _error(400, str(exc))
+        try:
+            job, shared = jobs.submit(plan_request)
+        except QueueFull:
+            return _error(429, "Warteschlange ist voll.", **{"Retry-After": "1"})
+        return JSONResponse(
+            {**job.describe(), "dedupliziert": shared},
+            status_code=202,
+            headers={"Location": f"/jobs/{job.id}"},
+        )
+
+    async def status(request: Request) -> JSONResponse:
+        job = jobs.get(request.path_params["job_id"])
+        if job is None:
+            return _error(404, "Auftrag nicht gefunden.")
+        return JSONResponse(job.describe())
+
+    async def result(request: Request) -> JSONResponse:
+        job = jobs.get(request.path_params["job_id"])
+        if job is None:
+            return _error(404, "Auftrag nicht gefunden.")
+        if job.status == "fehlgeschlagen":
+            return _error(422, job.error or "Planung fehlgeschlagen.")
+        if job.status != "fertig":
+            return JSONResponse(job.describe(), status_code=409)
+        return JSONResponse(job.result)
+
+    async def metrics(request: Request) -> JSONResponse:
+        return JSONResponse(jobs.metrics())
+
+    async def health(request: Request) -> JSONResponse:
+        return JSONResponse({"status": "ok" if jobs.running else "startet"})
+
+    @asynccontextmanager
+    async def lifespan(app: Starlette):
+        await jobs.start()
+        try:
+            yield
+        finally:
+            await jobs.stop()
+
+    app = Starlette(
+        routes=[
+            Route("/jobs", submit, methods=["POST"]),
+            Route("/jobs/{job_id}", status),
+            Route("/jobs/{job_id}/result", result),
+            Route("/metrics", metrics),
+            Route("/health", health),
+        ],
+        lifespan=lifespan,
+    )
+    app.state.jobs = jobs
+    return app
+
+
+def main(argv: list[str] | None = None) -> int:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Lokaler HTTP-Dienst fuer die Dienstplanung.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=2, help="Anzahl der Planungsprozesse.")
+    parser.add_argument("--queue-size", type=int, default=32, help="Wartende Auftraege, danach 429.")
+    args = parser.parse_args(argv)
+    app = create_app(workers=args.workers, queue_size=args.queue_size)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,221 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Sequence
+
+from models import CAPABILITIES
+from plan_table import ASSIGNMENT_COLUMNS
+
+# Steps of the planning pass in their order; the names double as the
+# phases of PlanMetrics.
+PHASES = ("wochenenden", "nachtdienste", "tagdienste")
+
+
+@dataclass(frozen=True)
+class ShiftType:
+    """One kind of duty, declared as data.
+
+    A block starts on every planned day whose weekday is in ``weekdays`` (the
+    anchor) and covers ``length`` consecutive days from ``start`` days after
+    it. Blocks are only planned if the first ``span`` days from the anchor lie
+    in the period (default: up to the end of the block). The holder needs
+    ``capability``, gets the days at the ``off_days`` offsets from the anchor
+    off and each day counts ``weight`` duties. ``weekend`` blocks are shared
+    out by the weekend count and count against ``max_weekends_per_month`` in
+    the month of their Saturday; ``rest_before`` blocks need
+    ``friday_night_rest_days`` days without ``on_call`` duties before them.
+    ``staff_all`` shifts take every available qualified doctor instead of
+    one, like the regular day shift. ``wish`` is the duty name wishes for
+    the shift use.
+    """
+
+    key: str
+    column: str
+    label: str
+    weekdays: tuple[int, ...]
+    start: int = 0
+    length: int = 1
+    span: int | None = None
+    capability: str = "full"
+    weight: int = 1
+    off_days: tuple[int, ...] = ()
+    weekend: bool = False
+    rest_before: bool = False
+    on_call: bool = True
+    staff_all: bool = False
+    wish: str | None = None
+    phase: str = "wochenenden"
+
+    def __post_init__(self) -> None:
+        if self.capability not in CAPABILITIES:
+            raise ValueError(f"Schichtart '{self.key}': unbekannte Qualifikation '{self.capability}'.")
+        if self.phase not in PHASES:
+            raise ValueError(f"Schichtart '{self.key}': unbekannte Phase '{self.phase}'.")
+        if not self.weekdays or any(not 0 <= weekday <= 6 for weekday in self.weekdays):
+            raise ValueError(f"Schichtart '{self.key}': Wochentage muessen zwischen 0 und 6 liegen.")
+        if self.start < 0 or self.length < 1 or self.weight < 1 or any(offset < 0 for offset in self.off_days):
+            raise ValueError(f"Schichtart '{self.key}': Beginn, Tage und Freitage duerfen nicht negativ sein.")
+        if self.staff_all and (self.start, self.length, self.off_days, self.weekend) != (0, 1, (), False):
+            raise ValueError(f"Schichtart '{self.key}': Dienste fuer alle gelten fuer einzelne Tage ohne Freitage.")
+
+    @property
+    def reach(self) -> int:
+        # Days from the anchor that must lie in the period.
+        return self.span if self.span is not None else self.start + self.length
+
+    def block(self, anchor: date) -> tuple[date, ...]:
+        return tuple(anchor + timedelta(days=offset) for offset in range(self.start, self.start + self.length))
+
+
+SHIFT_TYPES: tuple[ShiftType, ...] = (
+    ShiftType(
+        "weekend_night",
+        "Nachtdienst",
+        "Fr/Sa/So Nachtdienst",
+        weekdays=(4,),
+        length=3,
+        off_days=(0, 2, 3),
+        weekend=True,
+        rest_before=True,
+        wish="Nachtdienst",
+    ),
+    ShiftType(
+        "weekend_day",
+        "Wochenend_Tagdienst",
+        "Sa/So Tagdienst",
+        weekdays=(4,),
+        start=1,
+        length=2,
+        off_days=(5,),
+        weekend=True,
+        wish="Tagdienst",
+    ),
+    ShiftType(
+        "visit",
+        "Visitendienst",
+        "Sa/So Visitendienst",
+        weekdays=(4,),
+        start=1,
+        length=2,
+        capability="visit",
+        wish="Visitendienst",
+    ),
+    ShiftType("friday_late", "Freitag_bis_19", "Freitag bis 19 Uhr", weekdays=(4,), span=3),
+    ShiftType(
+        "night",
+        "Nachtdienst",
+        "Nachtdienst",
+        weekdays=(0, 1, 2, 3),
+        off_days=(0, 1),
+        wish="Nachtdienst",
+        phase="nachtdienste",
+    ),
+    ShiftType(
+        "day",
+        "Tagdienst",
+        "Tagdienst",
+        weekdays=(0, 1, 2, 3, 4),
+        capability="day",
+        on_call=False,
+        staff_all=True,
+        wish="Tagdienst",
+        phase="tagdienste",
+    ),
+)
+
+
+@dataclass(frozen=True)
+class ShiftSlot:
+    """One block of a one-doctor shift type in a period."""
+
+    shift_type: ShiftType
+    anchor: date
+    days: tuple[date, ...]
+    off_days: tuple[date, ...]
+    weekend_month: tuple[int, int] | None
+    rest_days: tuple[date, ...]
+
+    @property
+    def shift(self) -> str:
+        return self.shift_type.key
+
+    @property
+    def capability(self) -> str:
+        return self.shift_type.capability
+
+    @property
+    def warning(self) -> str:
+        return f"{self.anchor.isoformat()}: Kein Kandidat fuer {self.shift_type.label}."
+
+
+def check_shift_types(shift_types: Sequence[ShiftType] | None) -> tuple[ShiftType, ...]:
+    # ``None`` stands for the default SHIFT_TYPES.
+    if shift_types is None:
+        return SHIFT_TYPES
+    shift_types = tuple(shift_types)
+    keys = [shift_type.key for shift_type in shift_types]
+    for key in keys:
+        if keys.count(key) > 1:
+            raise ValueError(f"Schichtart '{key}' ist mehrfach definiert.")
+    return shift_types
+
+
+def plan_columns(shift_types: Sequence[ShiftType] = SHIFT_TYPES) -> tuple[str, ...]:
+    """Wide plan columns of ``shift_types``.
+
+    Columns of :data:`ASSIGNMENT_COLUMNS` keep their usual order, further
+    columns follow in declaration order.
+    """
+    declared = list(dict.fromkeys(shift_type.column for shift_type in shift_types))
+    return tuple([column for column in ASSIGNMENT_COLUMNS if column in declared]) + tuple(
+        column for column in declared if column not in ASSIGNMENT_COLUMNS
+    )
+
+
+def days_after(shift_types: Sequence[ShiftType]) -> int:
+    # Padding after the period that blocks and days off can reach into.
+    return max([7] + [max(t.start + t.length, *t.off_days, 0) + 1 for t in shift_types])
+
+
+def shift_slots(
+    days: list[date],
+    friday_night_rest_days: int,
+    shift_types: Sequence[ShiftType] = SHIFT_TYPES,
+) -> list[ShiftSlot]:
+    """Blocks of every one-doctor shift type in chronological order.
+
+    Slots are ordered by anchor and, on the same anchor, by declaration
+    order, so rest windows and planned days off only ever refer to slots
+    that come earlier.
+    """
+    planned = set(days)
+    by_weekday: list[list[ShiftType]] = [[] for _ in range(7)]
+    for shift_type in shift_types:
+        if not shift_type.staff_all:
+            for weekday in shift_type.weekdays:
+                by_weekday[weekday].append(shift_type)
+    slots: list[ShiftSlot] = []
+    for anchor in days:
+        for shift_type in by_weekday[anchor.weekday()]:
+            if any(anchor + timedelta(days=offset) not in planned for offset in range(1, shift_type.reach)):
+                continue
+            block = shift_type.block(anchor)
+            weekend_month = None
+            if shift_type.weekend:
+                saturday = block[0] + timedelta(days=(5 - block[0].weekday()) % 7)
+                weekend_month = (saturday.year, saturday.month)
+            rest = ()
+            if shift_type.rest_before:
+                rest = tuple(block[0] - timedelta(days=delta) for delta in range(1, friday_night_rest_days + 1))
+            slots.append(
+                ShiftSlot(
+                    shift_type,
+                    anchor,
+                    block,
+                    tuple(anchor + timedelta(days=offset) for offset in shift_type.off_days),
+                    weekend_month,
+                    rest,
+                )
+            )
+    return slots
@@ -0,0 +1,403 @@
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import date, datetime
+from pathlib import Path
+from typing import Iterable, Iterator
+
+import pandas as pd
+
+from absences import AbsenceIndex
+from models import DOCTORS, Doctor
+from plan_table import ASSIGNMENT_COLUMNS
+
+ABSENCE_KINDS = ("urlaub", "sperrtag")
+PLAN_COLUMNS = (
+    "Datum",
+    "Wochentag",
+    "Tagdienst",
+    "Freitag_bis_19",
+    "Nachtdienst",
+    "Wochenend_Tagdienst",
+    "Visitendienst",
+    "Abwesend",
+    "Geplant_frei",
+)
+# Columns of a wide plan that are not duties. Duty columns of declared
+# shift types that plan_days has no field for are kept in plan_cells.
+DAY_COLUMNS = ("Datum", "Wochentag", "Abwesend", "Geplant_frei")
+STATS_COLUMNS = ("Arzt", "FTE", "Dienste_gesamt", "Dienste_pro_FTE", "Wochenenden")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS doctors (
+    name TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    can_day INTEGER NOT NULL,
+    can_visit INTEGER NOT NULL,
+    can_full_service INTEGER NOT NULL,
+    fte REAL NOT NULL,
+    max_weekends_per_month INTEGER
+);
+CREATE TABLE IF NOT EXISTS absences (
+    id INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL CHECK (kind IN ('urlaub', 'sperrtag')),
+    doctor TEXT NOT NULL,
+    start TEXT NOT NULL,
+    end TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS absences_by_kind ON absences (kind, doctor, start);
+CREATE INDEX IF NOT EXISTS absences_by_range ON absences (start, end);
+CREATE TABLE IF NOT EXISTS wishes (
+    id INTEGER PRIMARY KEY,
+    day TEXT NOT NULL,
+    doctor TEXT NOT NULL,
+    wish TEXT NOT NULL,
+    weight REAL NOT NULL DEFAULT 1.0
+);
+CREATE INDEX IF NOT EXISTS wishes_by_day ON wishes (day);
+CREATE TABLE IF NOT EXISTS plans (
+    id INTEGER PRIMARY KEY,
+    period TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    created_at TEXT NOT NULL,
+    params TEXT NOT NULL,
+    warnings TEXT NOT NULL,
+    UNIQUE (period, version)
+);
+CREATE TABLE IF NOT EXISTS plan_days (
+    plan_id INTEGER NOT NULL REFERENCES plans (id) ON DELETE CASCADE,
+    day TEXT NOT NULL,
+    weekday TEXT NOT NULL,
+    day_shift TEXT NOT NULL,
+    friday_late TEXT NOT NULL,
+    night TEXT NOT NULL,
+    weekend_day TEXT NOT NULL,
+    visit TEXT NOT NULL,
+    absent TEXT NOT NULL,
+    planned_off TEXT NOT NULL,
+    PRIMARY KEY (plan_id, day)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS plan_columns (
+    plan_id INTEGER NOT NULL REFERENCES plans (id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    duty TEXT NOT NULL,
+    PRIMARY KEY (plan_id, position)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS plan_cells (
+    plan_id INTEGER NOT NULL REFERENCES plans (id) ON DELETE CASCADE,
+    day TEXT NOT NULL,
+    duty TEXT NOT NULL,
+    doctors TEXT NOT NULL,
+    PRIMARY KEY (plan_id, day, duty)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS plan_stats (
+    plan_id INTEGER NOT NULL REFERENCES plans (id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    doctor TEXT NOT NULL,
+    fte REAL NOT NULL,
+    duties INTEGER NOT NULL,
+    duties_per_fte REAL NOT NULL,
+    weekends INTEGER NOT NULL,
+    PRIMARY KEY (plan_id, position)
+) WITHOUT ROWID;
+"""
+
+
+@dataclass(frozen=True)
+class PlanVersion:
+    period: str
+    version: int
+    created_at: str
+    params: dict
+
+
+def default_path() -> Path:
+    return Path(os.environ.get("DIENSTPLANUNG_DB") or Path(__file__).with_name("dienstplanung.db"))
+
+
+class PlanStore:
+    """SQLite store for the roster, absences, wishes and saved plans.
+
+    The database runs in WAL mode, so readers never wait for a writer and
+    several planners can use the same file. Every thread gets its own
+    connection; writes are short ``BEGIN IMMEDIATE`` transactions and wait
+    up to ``timeout`` seconds for another writer. Plans are versioned per
+    period ("2026-03" for a month, "2026" for a year) and never overwritten;
+    they keep their duty columns, also those of declared shift types.
+    An empty store is seeded with :data:`models.DOCTORS`.
+    """
+
+    def __init__(self, path: str | os.PathLike | None = None, timeout: float = 5.0) -> None:
+        self.path = Path(path) if path is not None else default_path()
+        self.timeout = timeout
+        self._local = threading.local()
+        self._connection().executescript(SCHEMA)
+        with self._write() as connection:
+            if connection.execute("SELECT COUNT(*) FROM doctors").fetchone()[0] == 0:
+                self._insert_doctors(connection, DOCTORS)
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute("PRAGMA foreign_keys=ON")
+            self._local.connection = connection
+        return connection
+
+    @contextmanager
+    def _write(self) -> Iterator[sqlite3.Connection]:
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield connection
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+
+    def close(self) -> None:
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+    # Roster
+
+    @staticmethod
+    def _insert_doctors(connection: sqlite3.Connection, doctors: list[Doctor]) -> None:
+        connection.executemany(
+            "INSERT INTO doctors VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [
+                (
+                    doctor.name,
+                    position,
+                    doctor.can_day,
+                    doctor.can_visit,
+                    doctor.can_full_service,
+                    doctor.fte,
+                    doctor.max_weekends_per_month,
+                )
+                for position, doctor in enumerate(doctors)
+            ],
+        )
+
+    def doctors(self) -> list[Doctor]:
+        rows = self._connection().execute(
+            "SELECT name, can_day, can_visit, can_full_service, fte, max_weekends_per_month "
+            "FROM doctors ORDER BY position"
+        )
+        return [
+            Doctor(name, bool(can_day), bool(can_visit), bool(can_full), fte, max_weekends)
+            for name, can_day, can_visit, can_full, fte, max_weekends in rows
+        ]
+
+    def save_doctors(self, doctors: list[Doctor]) -> None:
+        with self._write() as connection:
+            connection.execute("DELETE FROM doctors")
+            self._insert_doctors(connection, doctors)
+
+    # Absences
+
+    def absence_index(self, kind: str, start: date | None = None, end: date | None = None) -> AbsenceIndex:
+        query = "SELECT doctor, start, end FROM absences WHERE kind = ?"
+        params: list[object] = [_check_kind(kind)]
+        if start is not None:
+            query += " AND end >= ?"
+            params.append(start.isoformat())
+        if end is not None:
+            query += " AND start <= ?"
+            params.append(end.isoformat())
+        index = AbsenceIndex()
+        for doctor, first, last in self._connection().execute(query, params):
+            index.add(doctor, date.fromisoformat(first), date.fromisoformat(last))
+        return index
+
+    def add_absence(self, kind: str, doctor: str, start: date, end: date) -> None:
+        # The doctor's intervals are merged with the new one and rewritten, so
+        # the table holds the same non-overlapping intervals as AbsenceIndex.
+        if end < start:
+            raise ValueError("Enddatum darf nicht vor dem Startdatum liegen.")
+        with self._write() as connection:
+            index = AbsenceIndex()
+            for first, last in connection.execute(
+                "SELECT start, end FROM absences WHERE kind = ? AND doctor = ?", (_check_kind(kind), doctor)
+            ):
+                index.add(doctor, date.fromisoformat(first), date.fromisoformat(last))
+            index.add(doctor, start, end)
+            connection.execute("DELETE FROM absences WHERE kind = ? AND doctor = ?", (kind, doctor))
+            connection.executemany(
+                "INSERT INTO absences (kind, doctor, start, end) VALUES (?, ?, ?, ?)",
+                [(kind, doctor, interval.start.isoformat(), interval.end.isoformat()) for interval in index.intervals()],
+            )
+
+    def clear_absences(self, kind: str, start: date, end: date, doctors: Iterable[str] | None = None) -> None:
+        # Cuts [start, end] out of the absences of ``doctors`` (default: all
+        # doctors); parts outside the range stay.
+        if end < start:
+            raise ValueError("Enddatum darf nicht vor dem Startdatum liegen.")
+        selected = set(doctors) if doctors is not None else None
+        with self._write() as connection:
+            index = AbsenceIndex()
+            ids = []
+            for row_id, doctor, first, last in connection.execute(
+                "SELECT id, doctor, start, end FROM absences WHERE kind = ? AND end >= ? AND start <= ?",
+                (_check_kind(kind), start.isoformat(), end.isoformat()),
+            ).fetchall():
+                if selected is None or doctor in selected:
+                    ids.append((row_id,))
+                    index.add(doctor, date.fromisoformat(first), date.fromisoformat(last))
+            for doctor in {interval.name for interval in index.intervals()}:
+                index.remove(doctor, start, end)
+            connection.executemany("DELETE FROM absences WHERE id = ?", ids)
+            connection.executemany(
+                "INSERT INTO absences (kind, doctor, start, end) VALUES (?, ?, ?, ?)",
+                [(kind, i.name, i.start.isoformat(), i.end.isoformat()) for i in index.intervals()],
+            )
+
+    # Wishes
+
+    def wishes(self, start: date | None = None, end: date | None = None) -> list[dict[str, object]]:
+        query = "SELECT day, doctor, wish, weight FROM wishes WHERE day >= ? AND day <= ? ORDER BY id"
+        first = start.isoformat() if start is not None else ""
+        last = end.isoformat() if end is not None else "9999-12-31"
+        return [
+            {"Datum": day, "Arzt": doctor, "Wunsch": wish, "Gewicht": weight}
+            for day, doctor, wish, weight in self._connection().execute(query, (first, last))
+        ]
+
+    def add_wish(self, day: date, doctor: str, wish: str, weight: float = 1.0) -> None:
+        with self._write() as connection:
+            connection.execute(
+                "INSERT INTO wishes (day, doctor, wish, weight) VALUES (?, ?, ?, ?)",
+                (day.isoformat(), doctor, wish, weight),
+            )
+
+    def clear_wishes(self, start: date, end: date, doctors: Iterable[str] | None = None) -> None:
+        # Deletes the wishes from ``start`` to ``end`` of ``doctors`` (default:
+        # all doctors).
+        query = "DELETE FROM wishes WHERE day >= ? AND day <= ?"
+        params: list[object] = [start.isoformat(), end.isoformat()]
+        if doctors is not None:
+            doctors = list(doctors)
+            query += f" AND doctor IN ({', '.join('?' * len(doctors))})"
+            params.extend(doctors)
+        with self._write() as connection:
+            connection.execute(query, params)
+
+    # Plans
+
+    def save_plan(
+        self,
+        period: str,
+        plan_df: pd.DataFrame,
+        stats_df: pd.DataFrame,
+        warnings: list[str],
+        **params: object,
+    ) -> int:
+        with self._write() as connection:
+            version = connection.execute(
+                "SELECT COALESCE(MAX(version), 0) + 1 FROM plans WHERE period = ?", (period,)
+            ).fetchone()[0]
+            plan_id = connection.execute(
+                "INSERT INTO plans (period, version, created_at, params, warnings) VALUES (?, ?, ?, ?, ?)",
+                (
+                    period,
+                    version,
+                    datetime.now().isoformat(timespec="seconds"),
+                    json.dumps(params, sort_keys=True, default=str),
+                    json.dumps(warnings),
+                ),
+            ).lastrowid
+            duties = [column for column in plan_df.columns if column not in DAY_COLUMNS]
+            cells = plan_df.reindex(columns=list(dict.fromkeys([*PLAN_COLUMNS, *duties]))).fillna("").astype(str)
+            connection.executemany(
+                "INSERT INTO plan_days VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(plan_id, *row) for row in cells[list(PLAN_COLUMNS)].itertuples(index=False)],
+            )
+            connection.executemany(
+                "INSERT INTO plan_columns VALUES (?, ?, ?)",
+                [(plan_id, position, duty) for position, duty in enumerate(duties)],
+            )
+            extra = [duty for duty in duties if duty not in PLAN_COLUMNS]
+            connection.executemany(
+                "INSERT INTO plan_cells VALUES (?, ?, ?, ?)",
+                [
+                    (plan_id, day, duty, holders)
+                    for duty in extra
+                    for day, holders in zip(cells["Datum"], cells[duty])
+                    if holders
+                ],
+            )
+            stats = stats_df[list(STATS_COLUMNS)]
+            connection.executemany(
+                "INSERT INTO plan_stats VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (plan_id, position, name, float(fte), int(duties), float(per_fte), int(weekends))
+                    for position, (name, fte, duties, per_fte, weekends) in enumerate(stats.itertuples(index=False))
+                ],
+            )
+        return version
+
+    def plan_versions(self, period: str) -> list[PlanVersion]:
+        rows = self._connection().execute(
+            "SELECT period, version, created_at, params FROM plans WHERE period = ? ORDER BY version", (period,)
+        )
+        return [PlanVersion(p, v, created, json.loads(params)) for p, v, created, params in rows]
+
+    def load_plan(
+        self, period: str, version: int | None = None
+    ) -> tuple[pd.DataFrame, pd.DataFrame, list[str]] | None:
+        # Without ``version`` the newest plan of the period is loaded.
+        connection = self._connection()
+        if version is None:
+            row = connection.execute(
+                "SELECT id, warnings FROM plans WHERE period = ? ORDER BY version DESC LIMIT 1", (period,)
+            ).fetchone()
+        else:
+            row = connection.execute(
+                "SELECT id, warnings FROM plans WHERE period = ? AND version = ?", (period, version)
+            ).fetchone()
+        if row is None:
+            return None
+        plan_id, warnings = row
+        days = connection.execute(
+            "SELECT day, weekday, day_shift, friday_late, night, weekend_day, visit, absent, planned_off "
+            "FROM plan_days WHERE plan_id = ? ORDER BY day",
+            (plan_id,),
+        ).fetchall()
+        stats = connection.execute(
+            "SELECT doctor, fte, duties, duties_per_fte, weekends FROM plan_stats WHERE plan_id = ? ORDER BY position",
+            (plan_id,),
+        ).fetchall()
+        plan_df = pd.DataFrame(days, columns=list(PLAN_COLUMNS))
+        # Plans saved before plan_columns existed have the default columns.
+        duties = [
+            duty
+            for (duty,) in connection.execute(
+                "SELECT duty FROM plan_columns WHERE plan_id = ? ORDER BY position", (plan_id,)
+            )
+        ] or list(ASSIGNMENT_COLUMNS)
+        cells: dict[str, dict[str, str]] = {}
+        for day, duty, holders in connection.execute(
+            "SELECT day, duty, doctors FROM plan_cells WHERE plan_id = ?", (plan_id,)
+        ):
+            cells.setdefault(duty, {})[day] = holders
+        for duty in duties:
+            if duty not in PLAN_COLUMNS:
+                plan_df[duty] = [cells.get(duty, {}).get(day, "") for day in plan_df["Datum"]]
+        plan_df = plan_df[["Datum", "Wochentag", *duties, "Abwesend", "Geplant_frei"]]
+        stats_df = pd.DataFrame(stats, columns=list(STATS_COLUMNS))
+        return plan_df, stats_df, json.loads(warnings)
+
+
+def _check_kind(kind: str) -> str:
+    if kind not in ABSENCE_KINDS:
+        raise ValueError(f"Unbekannte Abwesenheitsart '{kind}'.")
+    return kind
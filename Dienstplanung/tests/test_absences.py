@@ -0,0 +1,111 @@
+import tempfile
+import unittest
+from datetime import date
+from pathlib import Path
+
+from absences import AbsenceIndex, AbsenceInterval, AbsenceStream, absences_by_day
+from planner import generate_plan, parse_absences
+
+
+class TestAbsenceStream(unittest.TestCase):
+    def test_ranges_and_adjacent_days_are_merged(self):
+        lines = [
+            "2026-03-01..2026-03-04: Koch, Frey",
+            "2026-03-05: Koch",
+            "2026-03-03: Frey",
+            "2026-03-10..2026-03-11: Koch",
+        ]
+        stream = AbsenceStream(lines)
+        intervals = sorted(stream, key=lambda interval: (interval.name, interval.start))
+        self.assertEqual(
+            intervals,
+            [
+                AbsenceInterval("Frey", date(2026, 3, 1), date(2026, 3, 4)),
+                AbsenceInterval("Koch", date(2026, 3, 1), date(2026, 3, 5)),
+                AbsenceInterval("Koch", date(2026, 3, 10), date(2026, 3, 11)),
+            ],
+        )
+        self.assertEqual((stream.stats.lines, stream.stats.intervals), (4, 3))
+        self.assertEqual(len(absences_by_day(intervals)), 7)
+
+    def test_warnings_keep_the_line_format(self):
+        stream = AbsenceStream(["2026-03-01: Koch", "", "ohne Doppelpunkt", "2026-03-09..2026-03-08: Koch", "x..y: Frey"])
+        list(stream)
+        self.assertEqual(
+            stream.warnings,
+            [
+                "Zeile 2: ':' fehlt.",
+                "Zeile 3: Ungueltiger Zeitraum '2026-03-09..2026-03-08'.",
+                "Zeile 4: Ungueltiges Datum 'x..y'.",
+            ],
+        )
+
+    def test_reads_from_file_path(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "export.txt"
+            path.write_text("2026-03-02..2026-03-03: Koch, Unbekannt\n", encoding="utf-8")
+            stream = AbsenceStream(path)
+            self.assertEqual(list(stream), [AbsenceInterval("Koch", date(2026, 3, 2), date(2026, 3, 3))])
+            self.assertEqual(stream.warnings, ["Zeile 1: Unbekannte Namen: Unbekannt."])
+
+    def test_parse_absences_accepts_ranges(self):
+        absences, warnings = parse_absences("2026-03-02..2026-03-03: Koch\n2026-03-03: Frey")
+        self.assertEqual(absences, {date(2026, 3, 2): {"Koch"}, date(2026, 3, 3): {"Koch", "Frey"}})
+        self.assertEqual(warnings, [])
+
+
+class TestAbsenceIndex(unittest.TestCase):
+    def test_overlapping_and_touching_ranges_are_merged(self):
+        index = AbsenceIndex()
+        index.add("Koch", date(2026, 3, 10), date(2026, 3, 12))
+        index.add("Koch", date(2026, 3, 1), date(2026, 3, 3))
+        index.add("Koch", date(2026, 3, 20), date(2026, 3, 22))
+        index.add("Koch", date(2026, 3, 4), date(2026, 3, 11))
+        index.add("Frey", date(2026, 3, 5), date(2026, 3, 5))
+        self.assertEqual(
+            list(index.intervals()),
+            [
+                AbsenceInterval("Frey", date(2026, 3, 5), date(2026, 3, 5)),
+                AbsenceInterval("Koch", date(2026, 3, 1), date(2026, 3, 12)),
+                AbsenceInterval("Koch", date(2026, 3, 20), date(2026, 3, 22)),
+            ],
+        )
+        self.assertTrue(index.covers("Koch", date(2026, 3, 12)))
+        self.assertFalse(index.covers("Koch", date(2026, 3, 13)))
+        self.assertEqual(index.get(date(2026, 3, 5)), {"Koch", "Frey"})
+        self.assertIsNone(index.get(date(2026, 3, 15)))
+        self.assertEqual(set(index.window(date(2026, 3, 12), date(2026, 3, 20))), {date(2026, 3, 12), date(2026, 3, 20)})
+        with self.assertRaises(ValueError):
+            index.add("Koch", date(2026, 3, 2), date(2026, 3, 1))
+
+    def test_ranges_are_cut_out(self):
+        index = AbsenceIndex()
+        index.add("Koch", date(2026, 3, 1), date(2026, 3, 12))
+        index.add("Koch", date(2026, 3, 20), date(2026, 3, 22))
+        version = index.version
+        index.remove("Koch", date(2026, 3, 5), date(2026, 3, 20))
+        self.assertEqual(
+            list(index.intervals()),
+            [
+                AbsenceInterval("Koch", date(2026, 3, 1), date(2026, 3, 4)),
+                AbsenceInterval("Koch", date(2026, 3, 21), date(2026, 3, 22)),
+            ],
+        )
+        self.assertGreater(index.version, version)
+        index.remove("Koch", date(2026, 3, 1), date(2026, 3, 31))
+        index.remove("Frey", date(2026, 3, 1), date(2026, 3, 31))
+        self.assertEqual(len(index), 0)
+
+    def test_planner_takes_the_index_directly(self):
+        lines = ["2026-03-02..2026-03-06: Koch", "2026-03-13..2026-03-15: Fecher, Umland", "2026-03-20: Frey"]
+        index = AbsenceIndex.from_intervals(AbsenceStream(lines))
+        by_day = absences_by_day(index.intervals())
+        from_index = generate_plan(2026, 3, index, max_parallel_absent=3)
+        from_days = generate_plan(2026, 3, by_day, max_parallel_absent=3)
+        self.assertTrue(from_index[0].equals(from_days[0]))
+        self.assertTrue(from_index[1].equals(from_days[1]))
+        self.assertEqual(from_index[2], from_days[2])
+
+
+if __name__ == "__main__":
+    unittest.main()
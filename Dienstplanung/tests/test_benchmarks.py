@@ -0,0 +1,29 @@
+import unittest
+
+from benchmarks.suite import Case, compare, run_case, synthetic_roster
+
+
+class TestBenchmarkSuite(unittest.TestCase):
+    def test_case_covers_whole_months(self):
+        days = Case(doctors=12, months=14, pattern="sparse").days
+        self.assertEqual((days[0].isoformat(), days[-1].isoformat()), ("2026-01-01", "2027-02-28"))
+
+    def test_run_case_reports_every_phase(self):
+        row = run_case(Case(doctors=30, months=1, pattern="worst"), repeats=1)
+        self.assertEqual(
+            set(row["phases"]), {"parse_absences", "wochenenden", "nachtdienste", "tagdienste", "plan_df", "stats_df"}
+        )
+        self.assertGreater(row["absence_lines"], 0)
+        self.assertEqual(len(synthetic_roster(30)), 30)
+
+    def test_compare_flags_slowdowns_above_threshold(self):
+        baseline = [{"case": "a", "phases": {"planen": 0.010}, "total": 0.010}]
+        slower = [{"case": "a", "phases": {"planen": 0.020}, "total": 0.020}]
+        self.assertEqual(len(compare(slower, baseline, threshold=0.25)), 2)
+        self.assertEqual(compare(slower, baseline, threshold=1.5), [])
+        noisy = [{"case": "a", "phases": {"planen": 0.0105}, "total": 0.0105}]
+        self.assertEqual(compare(noisy, baseline, threshold=0.0), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
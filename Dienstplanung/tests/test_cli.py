@@ -0,0 +1,114 @@
+import json
+import tempfile
+import unittest
+from contextlib import redirect_stderr, redirect_stdout
+from io import StringIO
+from pathlib import Path
+
+import pandas as pd
+
+from absences import AbsenceIndex, AbsenceStream
+from dienstplanung_cli import main, read_roster
+from planner import generate_plan
+from plan_table import read_table
+
+
+def _run(*argv: str) -> int:
+    with redirect_stdout(StringIO()), redirect_stderr(StringIO()):
+        return main(list(argv))
+
+
+class TestCli(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.root = Path(self.tmp.name)
+
+    def _department(self, name: str, absences: str = "") -> Path:
+        directory = self.root / name
+        directory.mkdir()
+        (directory / "roster.csv").write_text(
+            "name,can_day,can_visit,can_full_service,fte,max_weekends_per_month\n"
+            "A,1,1,1,1,\nB,1,1,1,1,\nC,ja,ja,ja,0.5,1\nD,1,1,1,1,\nE,1,1,nein,1,\nF,1,1,1,1,\n",
+            encoding="utf-8",
+        )
+        (directory / "absences.txt").write_text(absences, encoding="utf-8")
+        return directory
+
+    def test_single_month_matches_generate_plan(self):
+        absences_path = self.root / "abwesend.txt"
+        absences_path.write_text("2026-03-02..2026-03-06: Koch\n2026-03-10: Frey\n", encoding="utf-8")
+        out = self.root / "out"
+        self.assertEqual(_run("--absences", str(absences_path), "--month", "2026-03", "--out", str(out)), 0)
+
+        absences = AbsenceIndex.from_intervals(AbsenceStream(absences_path))
+        expected, _, _ = generate_plan(2026, 3, absences, 3)
+        written = read_table(out / "abteilung" / "dienstplan_2026_03.csv")
+        pd.testing.assert_frame_equal(written, expected, check_dtype=False)
+
+    def test_departments_write_every_format(self):
+        first = self._department("kardio", "2026-03-02..2026-03-04: A\n")
+        second = self._department("neuro")
+        out = self.root / "out"
+        code = _run(
+            "--department",
+            str(first),
+            "--department",
+            str(second),
+            "--month",
+            "2026-03",
+            "--month",
+            "2026-04",
+            "--format",
+            "csv",
+            "--format",
+            "parquet",
+            "--format",
+            "json",
+            "--out",
+            str(out),
+        )
+        self.assertEqual(code, 0)
+        for department in ("kardio", "neuro"):
+            for period in ("2026_03", "2026_04"):
+                for suffix in ("csv", "parquet", "json"):
+                    self.assertTrue((out / department / f"dienstplan_{period}.{suffix}").exists())
+        payload = json.loads((out / "kardio" / "dienstplan_2026_03.json").read_text(encoding="utf-8"))
+        self.assertEqual(payload["zeitraum"], "2026-03")
+        self.assertEqual(len(payload["plan"]), 31)
+        self.assertEqual({row["Arzt"] for row in payload["statistik"]}, set("ABCDEF"))
+        self.assertNotIn("A", payload["plan"][2]["Tagdienst"])
+        long_table = read_table(out / "neuro" / "dienstplan_2026_04.parquet")
+        self.assertEqual(list(long_table.columns), ["Datum", "Arzt", "Dienst"])
+
+    def test_year_is_planned_as_one_horizon(self):
+        out = self.root / "out"
+        self.assertEqual(_run("--year", "2026", "--out", str(out)), 0)
+        self.assertEqual(len(read_table(out / "abteilung" / "dienstplan_2026.csv")), 365)
+
+    def test_broken_department_fails_without_stopping_the_others(self):
+        good = self._department("gut")
+        bad = self._department("kaputt")
+        (bad / "roster.csv").write_text("name,can_day\nX,vielleicht\n", encoding="utf-8")
+        out = self.root / "out"
+        code = _run("--department", str(bad), "--department", str(good), "--month", "2026-03", "--out", str(out))
+        self.assertEqual(code, 1)
+        self.assertTrue((out / "gut" / "dienstplan_2026_03.csv").exists())
+        self.assertFalse((out / "kaputt").exists())
+
+    def test_invalid_arguments_exit_with_usage_error(self):
+        with self.assertRaises(SystemExit) as raised:
+            _run("--month", "2026-13")
+        self.assertEqual(raised.exception.code, 2)
+        with self.assertRaises(SystemExit):
+            _run("--year", "2026", "--engine", "optimize")
+
+    def test_roster_json(self):
+        path = self.root / "roster.json"
+        path.write_text(json.dumps([{"name": "A", "can_full_service": True, "fte": 0.5}]), encoding="utf-8")
+        doctor = read_roster(path)[0]
+        self.assertEqual((doctor.name, doctor.can_day, doctor.can_full_service, doctor.fte), ("A", True, True, 0.5))
+
+
+if __name__ == "__main__":
+    unittest.main()
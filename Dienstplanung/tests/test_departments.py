@@ -0,0 +1,87 @@
+import unittest
+from dataclasses import replace
+from datetime import date, timedelta
+
+from benchmarks.department_scaling import double_bookings, synthetic_departments
+from departments import Department, department_rounds, plan_departments
+from models import DOCTORS
+from plan_table import plan_assignments
+from planner import generate_plan
+from verifier import verify_plan
+
+ABSENCES = {date(2026, 3, day): {"Koch", "Frey"} for day in range(9, 14)}
+
+
+class TestDepartments(unittest.TestCase):
+    def setUp(self):
+        self.departments = synthetic_departments(6, 90, rotating=0.3)
+        self.result = plan_departments(2026, 3, self.departments, {})
+
+    def test_without_shared_doctors_each_department_gets_the_plain_plan(self):
+        other = replace(synthetic_departments(1, 15)[0], name="B")
+        result = plan_departments(2026, 3, [Department("A", tuple(DOCTORS)), other], ABSENCES)
+        self.assertEqual(result.rounds, [["A", "B"]])
+        plan_df, stats_df, warnings = generate_plan(2026, 3, ABSENCES, 3)
+        self.assertTrue(result.departments["A"].plan_df.equals(plan_df))
+        self.assertTrue(result.departments["A"].stats_df.equals(stats_df))
+        self.assertEqual(result.departments["A"].warnings, warnings)
+        # Absences of other departments neither show up nor count.
+        self.assertEqual(set(result.departments["B"].plan_df["Abwesend"]), {""})
+
+    def test_shared_doctors_are_never_booked_twice(self):
+        self.assertGreater(len(self.result.shared), 10)
+        self.assertGreater(len(self.result.rounds), 1)
+        self.assertTrue(double_bookings(self.result, self.departments).empty)
+        for department in self.departments:
+            plan = self.result.departments[department.name]
+            self.assertTrue(verify_plan(plan.plan_df, {}, 3, list(department.doctors)).empty)
+
+    def test_rules_hold_across_departments(self):
+        duties = {}
+        for name, plan in self.result.departments.items():
+            for row in plan_assignments(plan.plan_df).itertuples(index=False):
+                duties.setdefault(row.Arzt, []).append((date.fromisoformat(row.Datum), row.Dienst, name))
+        for doctor, held in duties.items():
+            if doctor not in self.result.shared:
+                continue
+            home = self.result.shared[doctor][0]
+            self.assertTrue(all(department == home for _, duty, department in held if duty == "Tagdienst"))
+            busy = {day for day, _, _ in held}
+            for day, duty, _ in held:
+                if duty == "Nachtdienst" and day.weekday() < 4:
+                    self.assertNotIn(day + timedelta(days=1), busy, doctor)
+
+    def test_person_stats_and_weekend_limit_span_departments(self):
+        stats_df = self.result.stats_df.set_index("Arzt")
+        for doctor, listed in self.result.shared.items():
+            per_department = [
+                self.result.departments[name].stats_df.set_index("Arzt").loc[doctor] for name in listed
+            ]
+            total = sum(row["Dienste_gesamt"] for row in per_department)
+            self.assertEqual(stats_df.loc[doctor, "Dienste_gesamt"], total)
+            self.assertEqual(stats_df.loc[doctor, "Abteilungen"], ", ".join(listed))
+        limits = {doctor.name: doctor.max_weekends_per_month for d in self.departments for doctor in d.doctors}
+        for doctor, weekends in stats_df["Wochenenden"].items():
+            if limits[doctor] is not None:
+                self.assertLessEqual(weekends, limits[doctor])
+
+    def test_result_does_not_depend_on_workers(self):
+        parallel = plan_departments(2026, 3, self.departments, {}, max_workers=2)
+        self.assertEqual(parallel.rounds, self.result.rounds)
+        self.assertTrue(parallel.stats_df.equals(self.result.stats_df))
+        for name, plan in self.result.departments.items():
+            self.assertTrue(parallel.departments[name].plan_df.equals(plan.plan_df))
+
+    def test_rounds_and_invalid_input(self):
+        a, b, c = (Department(name, (doctor,)) for name, doctor in zip("ABC", DOCTORS))
+        self.assertEqual(department_rounds([a, replace(b, doctors=a.doctors), c]), [[0, 2], [1]])
+        with self.assertRaises(ValueError):
+            plan_departments(2026, 3, [a, a], {})
+        with self.assertRaises(ValueError):
+            plan_departments(2026, 3, [a, replace(b, doctors=(replace(DOCTORS[0], fte=0.5),))], {})
+        with self.assertRaises(ValueError):
+            plan_departments(2026, 3, [], {})
+
+
+if __name__ == "__main__":
+    unittest.main()
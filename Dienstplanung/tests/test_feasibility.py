@@ -0,0 +1,69 @@
+import unittest
+from datetime import date
+
+from feasibility import check_feasibility
+from models import DOCTORS, Doctor
+from planner import generate_plan
+
+FULL_SERVICE = [doctor.name for doctor in DOCTORS if doctor.can_full_service]
+
+
+def _absent(names, days):
+    return {date(2026, 3, day): set(names) for day in days}
+
+
+class TestFeasibility(unittest.TestCase):
+    def test_default_month_is_feasible(self):
+        report = check_feasibility(2026, 3, {})
+        self.assertTrue(report.feasible)
+        self.assertEqual(report.slots, 18 + 4 * 4)
+        self.assertEqual(report.messages(), [])
+
+    def test_slot_without_candidates_is_unfillable(self):
+        report = check_feasibility(2026, 3, _absent(FULL_SERVICE, (10,)))
+        self.assertEqual(report.unfillable, ["2026-03-10 Nachtdienst"])
+        self.assertFalse(report.feasible)
+
+    def test_weekend_with_one_doctor_left(self):
+        absences = _absent(FULL_SERVICE[:-1], (5, 6, 7, 8))
+        report = check_feasibility(2026, 3, absences)
+        saturday = next(shortage for shortage in report.shortages if shortage.scope == "2026-03-07")
+        self.assertEqual(saturday.doctors, ("Fecher",))
+        self.assertEqual(saturday.missing, 1)
+        self.assertEqual(saturday.slots, ("2026-03-06 Fr/Sa/So Nachtdienst", "2026-03-07 Sa/So Tagdienst"))
+        self.assertIn("2026-03-06 Fr/Sa/So Nachtdienst", report.bottlenecks["Fecher"])
+        # The planner runs into the same wall.
+        _, _, warnings = generate_plan(2026, 3, absences, len(DOCTORS))
+        self.assertIn("2026-03-06: Kein Kandidat fuer Sa/So Tagdienst.", warnings)
+
+    def test_two_doctors_cover_a_weekend_and_are_bottlenecks(self):
+        report = check_feasibility(2026, 3, _absent(FULL_SERVICE[:-2], (6, 7, 8)))
+        self.assertTrue(report.feasible)
+        self.assertEqual(set(report.bottlenecks), {"Horner", "Fecher"})
+
+    def test_weekend_cap_is_a_flow_constraint(self):
+        # Horner and Fecher are the only ones left; Fecher may work a single
+        # weekend, so three of the four weekends lack a second doctor.
+        report = check_feasibility(2026, 3, _absent(FULL_SERVICE[:-2], range(1, 32)))
+        monthly = next(shortage for shortage in report.shortages if shortage.scope == "Wochenenden 03/2026")
+        self.assertEqual(monthly.missing, 3)
+        self.assertEqual(monthly.doctors, ("Horner", "Fecher"))
+        _, _, warnings = generate_plan(2026, 3, _absent(FULL_SERVICE[:-2], range(1, 32)), len(DOCTORS))
+        self.assertEqual(sum("Sa/So Tagdienst" in warning for warning in warnings), 3)
+
+    def test_rest_window_before_weekend_night(self):
+        roster = [
+            Doctor("A", can_day=True, can_visit=True, can_full_service=True),
+            Doctor("B", can_day=True, can_visit=True, can_full_service=True),
+            Doctor("C", can_day=True, can_visit=True, can_full_service=False),
+        ]
+        # Only A can take the Wednesday night and the weekend night; the
+        # Wednesday lies in the three rest days before Friday.
+        absences = {date(2026, 3, 4): {"B"}, **{date(2026, 3, day): {"B"} for day in (6, 7, 8)}}
+        self.assertFalse(check_feasibility(2026, 3, absences, friday_night_rest_days=3, doctors=roster).feasible)
+        relaxed = check_feasibility(2026, 3, absences, friday_night_rest_days=1, doctors=roster)
+        self.assertNotIn("2026-03-04", [shortage.scope for shortage in relaxed.shortages])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+from datetime import date
+
+import pandas as pd
+
+from models import compile_roster
+from multistart import multi_start, start_seeds
+from planner import generate_plan
+from scenarios import plan_scores
+
+ABSENCES = {date(2026, 3, day): {"Koch", "Frey"} for day in range(9, 14)}
+
+
+class TestMultiStart(unittest.TestCase):
+    def test_unseeded_start_is_the_greedy_plan(self):
+        greedy, _, _ = generate_plan(2026, 3, ABSENCES, 3)
+        result = multi_start(2026, 3, ABSENCES, 3, starts=1)
+        self.assertIsNone(result.seed)
+        pd.testing.assert_frame_equal(result.plan_df, greedy)
+
+    def test_seed_changes_tie_breaking_reproducibly(self):
+        first, _, _ = generate_plan(2026, 3, ABSENCES, 3, seed=7)
+        again, _, _ = generate_plan(2026, 3, ABSENCES, 3, seed=7)
+        plans = [generate_plan(2026, 3, ABSENCES, 3, seed=seed)[0] for seed in range(5)]
+        self.assertTrue(first.equals(again))
+        self.assertGreater(len({plan.to_csv() for plan in plans}), 1)
+
+    def test_best_start_does_not_depend_on_workers(self):
+        serial = multi_start(2026, 3, ABSENCES, 3, starts=12, seed=3, max_workers=1)
+        parallel = multi_start(2026, 3, ABSENCES, 3, starts=12, seed=3, max_workers=2)
+        self.assertEqual(serial.seed, parallel.seed)
+        self.assertTrue(serial.scores.equals(parallel.scores))
+        self.assertTrue(serial.plan_df.equals(parallel.plan_df))
+        self.assertEqual(list(serial.scores["Rang"]), list(range(1, 13)))
+        self.assertEqual(sorted(serial.scores["Start"]), list(range(12)))
+        self.assertEqual(len(start_seeds(12, 3)), 12)
+
+    def test_best_start_is_not_worse_than_greedy(self):
+        result = multi_start(2026, 3, ABSENCES, 3, starts=16)
+        best = result.scores.iloc[0]
+        greedy = result.scores[result.scores["Start"] == 0].iloc[0]
+        self.assertLessEqual(
+            (best["Unbesetzt"], best["Warnungen"], best["Spannweite_Dienste_pro_FTE"]),
+            (greedy["Unbesetzt"], greedy["Warnungen"], greedy["Spannweite_Dienste_pro_FTE"]),
+        )
+
+    def test_wish_fulfilment_is_scored(self):
+        wishes = [{"Datum": "2026-03-07", "Arzt": "Horner", "Wunsch": "Nachtdienst gewuenscht"}]
+        result = multi_start(2026, 3, ABSENCES, 3, starts=4, wishes=wishes)
+        self.assertIn("Wunscherfuellung", result.scores)
+        self.assertEqual(result.plan_df.attrs["wishes"].total, 1)
+
+    def test_starts_are_scored_like_scenarios(self):
+        result = multi_start(2026, 3, ABSENCES, 3, starts=1)
+        expected = plan_scores(result.plan_df, result.stats_df, result.warnings, compile_roster(None))
+        row = result.scores.iloc[0]
+        self.assertEqual({column: row[column] for column in expected}, expected)
+        self.assertEqual(row["Wunscherfuellung"], 1.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import random
+import unittest
+from datetime import date
+
+from models import DOCTORS
+from planner import generate_plan, improve_plan, month_dates
+from wishes import WISH_TYPES, wish_report
+
+# Everyone but Fecher is away on Monday 2026-03-09. The greedy planner gives
+# Fecher the first weekend night (alphabetical tie break) and then has nobody
+# left for that Monday night.
+MONDAY_GAP = {date(2026, 3, 9): {d.name for d in DOCTORS if d.can_full_service and d.name != "Fecher"}}
+
+
+class TestOptimizeEngine(unittest.TestCase):
+    def test_fills_slot_that_greedy_leaves_open(self):
+        _, _, greedy_warnings = generate_plan(2026, 3, MONDAY_GAP, max_parallel_absent=12)
+        self.assertIn("2026-03-09: Kein Kandidat fuer Nachtdienst.", greedy_warnings)
+
+        plan_df, _, warnings = generate_plan(2026, 3, MONDAY_GAP, max_parallel_absent=12, engine="optimize", time_limit=0.3)
+        self.assertEqual(warnings, [])
+        self.assertEqual(plan_df.loc[plan_df["Datum"] == "2026-03-09", "Nachtdienst"].iloc[0], "Fecher")
+
+    def test_reports_time_and_nodes(self):
+        plan_df, stats_df, _ = generate_plan(2026, 5, {}, max_parallel_absent=3, engine="optimize", time_limit=0.2)
+        report = plan_df.attrs["solver"]
+        self.assertEqual(report.engine, "optimize")
+        self.assertGreater(report.nodes, 0)
+        self.assertLess(report.solve_seconds, 1.0)
+        self.assertLessEqual(report.objective, report.initial_objective)
+        self.assertEqual(report.unfilled, 0)
+        fecher = stats_df.loc[stats_df["Arzt"] == "Fecher", "Wochenenden"].iloc[0]
+        self.assertLessEqual(fecher, 1)
+
+    def test_capabilities_are_respected(self):
+        plan_df, _, _ = generate_plan(2026, 5, {}, max_parallel_absent=3, engine="optimize", time_limit=0.2)
+        full_service = {d.name for d in DOCTORS if d.can_full_service}
+        for column in ("Nachtdienst", "Wochenend_Tagdienst", "Freitag_bis_19"):
+            assigned = set(plan_df[column]) - {""}
+            self.assertTrue(assigned <= full_service, msg=column)
+
+    def test_unknown_engine_is_rejected(self):
+        with self.assertRaises(ValueError):
+            generate_plan(2026, 5, {}, max_parallel_absent=3, engine="magic")
+
+
+class TestImprovePlan(unittest.TestCase):
+    def test_local_search_refills_open_slot(self):
+        plan_df, _, _ = generate_plan(2026, 3, MONDAY_GAP, max_parallel_absent=12)
+        improved_df, _, warnings = improve_plan(2026, 3, plan_df, MONDAY_GAP, max_parallel_absent=12, max_moves=20_000)
+        self.assertEqual(warnings, [])
+        self.assertEqual(improved_df.loc[improved_df["Datum"] == "2026-03-09", "Nachtdienst"].iloc[0], "Fecher")
+
+    def test_is_deterministic_under_seed(self):
+        plan_df, _, _ = generate_plan(2026, 5, {}, max_parallel_absent=3)
+        first, _, _ = improve_plan(2026, 5, plan_df, {}, max_parallel_absent=3, max_moves=20_000, seed=7)
+        second, _, _ = improve_plan(2026, 5, plan_df, {}, max_parallel_absent=3, max_moves=20_000, seed=7)
+        self.assertTrue(first.equals(second))
+        report = first.attrs["local_search"]
+        self.assertEqual(report.moves, 20_000)
+        self.assertLessEqual(report.objective, report.initial_objective)
+
+    def test_wishes_are_kept_and_reported(self):
+        rng = random.Random(1)
+        wishes = [
+            {"Datum": rng.choice(month_dates(2026, 3)).isoformat(), "Arzt": rng.choice(DOCTORS).name, "Wunsch": wish}
+            for wish in rng.choices(list(WISH_TYPES), k=25)
+        ]
+        plan_df, _, _ = generate_plan(2026, 3, {}, max_parallel_absent=3, wishes=wishes, wish_weight=3)
+        improved_df, _, _ = improve_plan(
+            2026, 3, plan_df, {}, max_parallel_absent=3, max_moves=20_000, wishes=wishes, wish_weight=3
+        )
+        unaware_df, _, _ = improve_plan(2026, 3, plan_df, {}, max_parallel_absent=3, max_moves=20_000)
+        report = improved_df.attrs["wishes"]
+        self.assertEqual(report, wish_report(improved_df, wishes))
+        self.assertGreater(report.fulfilled, wish_report(unaware_df, wishes).fulfilled)
+        self.assertGreaterEqual(report.fulfilled, plan_df.attrs["wishes"].fulfilled)
+
+    def test_time_limit_cuts_search_short(self):
+        plan_df, _, _ = generate_plan(2026, 5, {}, max_parallel_absent=3)
+        improved_df, _, _ = improve_plan(2026, 5, plan_df, {}, max_parallel_absent=3, time_limit=0.0, max_moves=10**9)
+        self.assertLess(improved_df.attrs["local_search"].moves, 10**9)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+import tempfile
+import unittest
+from dataclasses import replace
+from datetime import date
+from pathlib import Path
+
+from models import DOCTORS
+from plan_cache import PlanCache, plan_key, roster_fingerprint
+from planner import generate_plan
+
+
+class TestPlanKey(unittest.TestCase):
+    def test_key_ignores_absence_order(self):
+        first = {date(2026, 3, 2): {"Koch", "Frey"}, date(2026, 3, 3): {"Koch"}}
+        second = {date(2026, 3, 3): {"Koch"}, date(2026, 3, 2): {"Frey", "Koch"}, date(2026, 3, 4): set()}
+        self.assertEqual(plan_key(first, year=2026, month=3), plan_key(second, year=2026, month=3))
+
+    def test_key_depends_on_inputs_and_roster(self):
+        base = plan_key({}, year=2026, month=3, max_parallel_absent=3)
+        self.assertNotEqual(base, plan_key({}, year=2026, month=3, max_parallel_absent=2))
+        self.assertNotEqual(base, plan_key({date(2026, 3, 2): {"Koch"}}, year=2026, month=3, max_parallel_absent=3))
+        changed = [replace(DOCTORS[0], fte=DOCTORS[0].fte / 2), *DOCTORS[1:]]
+        self.assertNotEqual(roster_fingerprint(), roster_fingerprint(changed))
+        self.assertNotEqual(base, plan_key({}, doctors=changed, year=2026, month=3, max_parallel_absent=3))
+
+
+class TestPlanCache(unittest.TestCase):
+    def test_memory_tier_is_lru(self):
+        cache = PlanCache(max_entries=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        self.assertEqual(cache.get("a"), 1)
+        cache.put("c", 3)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), 1)
+        self.assertEqual((cache.stats.hits, cache.stats.misses, cache.stats.evictions), (2, 1, 1))
+
+    def test_disk_tier_survives_restart_and_is_bounded(self):
+        result = generate_plan(2026, 3, {}, max_parallel_absent=3)
+        with tempfile.TemporaryDirectory() as directory:
+            key = plan_key({}, year=2026, month=3, max_parallel_absent=3)
+            PlanCache(directory=directory).put(key, result)
+
+            cache = PlanCache(directory=directory)
+            plan_df, stats_df, warnings = cache.get_or_compute(key, lambda: self.fail("not cached"))
+            self.assertTrue(plan_df.equals(result[0]))
+            self.assertTrue(stats_df.equals(result[1]))
+            self.assertEqual(warnings, result[2])
+            self.assertEqual(cache.stats.disk_hits, 1)
+
+            size = (Path(directory) / f"{key}.pkl").stat().st_size
+            small = PlanCache(directory=directory, max_disk_bytes=size)
+            small.put("other", result)
+            self.assertEqual(len(list(Path(directory).glob("*.pkl"))), 1)
+            self.assertEqual(small.stats.disk_evictions, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,43 @@
+import tempfile
+import unittest
+from datetime import date
+from pathlib import Path
+
+from plan_table import ASSIGNMENT_COLUMNS, export_table, plan_assignments, read_table, wide_plan
+from planner import generate_horizon, generate_plan
+
+
+class TestPlanTable(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.horizon = generate_horizon(date(2026, 1, 1), date(2026, 3, 31), {}, max_parallel_absent=3)
+
+    def test_wide_plan_is_derived_from_assignments(self):
+        assignments = self.horizon.assignments
+        for column in ("Datum", "Arzt", "Dienst"):
+            self.assertEqual(str(assignments[column].dtype), "category")
+        columns = ["Datum", "Wochentag", *ASSIGNMENT_COLUMNS]
+        self.assertTrue(wide_plan(assignments).equals(self.horizon.plan_df[columns]))
+
+    def test_plan_assignments_round_trip(self):
+        plan_df, _, _ = generate_plan(2026, 3, {}, max_parallel_absent=3)
+        columns = ["Datum", "Wochentag", *ASSIGNMENT_COLUMNS]
+        self.assertTrue(wide_plan(plan_assignments(plan_df)).equals(plan_df[columns]))
+
+    def test_columnar_exports_keep_categoricals(self):
+        assignments = self.horizon.assignments
+        with tempfile.TemporaryDirectory() as directory:
+            for fmt, suffix in (("parquet", ".parquet"), ("arrow", ".arrow"), ("csv", ".csv")):
+                path = Path(directory) / f"plan{suffix}"
+                export_table(assignments, fmt, path)
+                loaded = read_table(path)
+                self.assertEqual(loaded.astype(str).values.tolist(), assignments.astype(str).values.tolist())
+                if fmt != "csv":
+                    self.assertEqual(str(loaded["Dienst"].dtype), "category")
+                    self.assertEqual(list(loaded["Dienst"].cat.categories), list(ASSIGNMENT_COLUMNS))
+        with self.assertRaises(ValueError):
+            export_table(assignments, "xlsx")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,144 @@
+import unittest
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+
+from benchmarks.fair_pick import pick_fair
+from models import DOCTORS
+from planner import (
+    ASSIGNMENT_COLUMNS,
+    _FairQueue,
+    absence_delta,
+    generate_horizon,
+    generate_plan,
+    replan,
+)
+
+GOLDEN = Path(__file__).resolve().parent / "golden"
+
+MARCH_ABSENCES = {
+    date(2026, 3, 2): {"Koch", "Frey"},
+    date(2026, 3, 3): {"Koch"},
+    date(2026, 3, 13): {"Fecher", "Umland", "Horner"},
+    date(2026, 3, 14): {"Fecher"},
+    date(2026, 3, 20): {"Gumbiller", "Zumbusch", "Mettin", "Frey"},
+}
+
+
+class TestGeneratePlan(unittest.TestCase):
+    def test_matches_golden_plan(self):
+        plan_df, stats_df, warnings = generate_plan(2026, 3, MARCH_ABSENCES, max_parallel_absent=3)
+        self.assertEqual(plan_df.to_csv(index=False), (GOLDEN / "plan_2026_03.csv").read_text(encoding="utf-8"))
+        self.assertEqual(stats_df.to_csv(index=False), (GOLDEN / "stats_2026_03.csv").read_text(encoding="utf-8"))
+        self.assertEqual(warnings, ["2026-03-20: 4 als abwesend eingetragen (Limit 3)."])
+
+    def test_absent_doctors_are_not_planned(self):
+        plan_df, _, _ = generate_plan(2026, 3, MARCH_ABSENCES, max_parallel_absent=3)
+        for _, row in plan_df.iterrows():
+            absent = MARCH_ABSENCES.get(date.fromisoformat(row["Datum"]), set())
+            planned = {n.strip() for n in row["Tagdienst"].split(",") if n.strip()}
+            planned |= {row[c] for c in ("Freitag_bis_19", "Nachtdienst", "Wochenend_Tagdienst", "Visitendienst")}
+            self.assertFalse(absent & planned, msg=row["Datum"])
+
+    def test_metrics_are_attached_on_request(self):
+        plan_df, _, _ = generate_plan(2026, 3, MARCH_ABSENCES, max_parallel_absent=3, metrics=True)
+        metrics = plan_df.attrs["metrics"]
+        self.assertEqual(
+            set(metrics.phases), {"wochenenden", "nachtdienste", "tagdienste", "plan_df", "stats_df"}
+        )
+        self.assertEqual(
+            metrics.candidate_evaluations, metrics.pool_total + sum(metrics.rejected.values())
+        )
+        self.assertGreater(metrics.rejected["abwesend"], 0)
+        self.assertNotIn("metrics", generate_plan(2026, 3, MARCH_ABSENCES, max_parallel_absent=3)[0].attrs)
+
+    def test_weekend_cap_is_respected(self):
+        _, stats_df, _ = generate_plan(2026, 5, {}, max_parallel_absent=3)
+        caps = {d.name: d.max_weekends_per_month for d in DOCTORS if d.max_weekends_per_month is not None}
+        for name, cap in caps.items():
+            self.assertLessEqual(int(stats_df.loc[stats_df["Arzt"] == name, "Wochenenden"].iloc[0]), cap)
+
+
+class TestFairQueue(unittest.TestCase):
+    def test_picks_match_linear_scan(self):
+        names = [f"Arzt{idx:02d}" for idx in range(40)]
+        fte = {name: (0.5, 0.75, 1.0)[idx % 3] for idx, name in enumerate(names)}
+        duty_count = {name: 0 for name in names}
+        queue = _FairQueue(
+            len(names), lambda idx: (duty_count[names[idx]] / fte[names[idx]], duty_count[names[idx]], idx)
+        )
+        generator = np.random.default_rng(7)
+        for _ in range(500):
+            mask = generator.random(len(names)) < 0.3
+            expected = pick_fair([names[idx] for idx in np.flatnonzero(mask)], duty_count, fte)
+            picked = queue.pick(mask)
+            self.assertEqual(None if picked is None else names[picked], expected)
+            if expected is not None:
+                duty_count[expected] += int(generator.integers(1, 4))
+                queue.refresh(picked)
+
+
+class TestGenerateHorizon(unittest.TestCase):
+    def test_weekend_across_month_seam_is_planned(self):
+        horizon = generate_horizon(date(2026, 1, 1), date(2026, 2, 28), {}, max_parallel_absent=3)
+        seam = horizon.plan_df.set_index("Datum").loc[["2026-01-30", "2026-01-31", "2026-02-01"]]
+        self.assertEqual(len(set(seam["Nachtdienst"])), 1)
+        self.assertTrue(seam["Nachtdienst"].iloc[0])
+
+    def test_month_views_add_up_to_totals(self):
+        horizon = generate_horizon(date(2026, 1, 1), date(2026, 12, 31), {}, max_parallel_absent=3)
+        self.assertEqual(len(horizon.months), 12)
+        totals = horizon.stats_df.set_index("Arzt")
+        monthly_sum = {name: 0 for name in totals.index}
+        for year, month in horizon.months:
+            plan_df, stats_df, _ = horizon.month(year, month)
+            self.assertTrue(plan_df["Datum"].str.startswith(f"{year}-{month:02d}").all())
+            for _, row in stats_df.iterrows():
+                monthly_sum[row["Arzt"]] += row["Dienste_gesamt"]
+                cap = next(d.max_weekends_per_month for d in DOCTORS if d.name == row["Arzt"])
+                if cap is not None:
+                    self.assertLessEqual(row["Wochenenden"], cap)
+        for name, total in monthly_sum.items():
+            self.assertEqual(total, totals.loc[name, "Dienste_gesamt"])
+
+    def test_rejects_inverted_range(self):
+        with self.assertRaises(ValueError):
+            generate_horizon(date(2026, 2, 1), date(2026, 1, 1), {}, max_parallel_absent=3)
+
+
+class TestReplan(unittest.TestCase):
+    def test_only_the_absent_holder_is_replaced(self):
+        plan_df, _, _ = generate_plan(2026, 3, {}, max_parallel_absent=3)
+        row = plan_df[plan_df["Datum"] == "2026-03-14"].iloc[0]
+        holder = row["Visitendienst"]
+        new_df, _, warnings = replan(2026, 3, plan_df, {}, 3, added={date(2026, 3, 14): {holder}})
+
+        new_row = new_df[new_df["Datum"] == "2026-03-14"].iloc[0]
+        self.assertNotEqual(new_row["Visitendienst"], holder)
+        self.assertTrue(new_row["Visitendienst"])
+        self.assertEqual(warnings, [])
+        untouched = ~plan_df["Datum"].isin(["2026-03-14", "2026-03-15"])
+        for column in ("Nachtdienst", "Wochenend_Tagdienst", "Visitendienst", "Freitag_bis_19"):
+            self.assertTrue(plan_df.loc[untouched, column].equals(new_df.loc[untouched, column]), msg=column)
+
+        report = new_df.attrs["replan"]
+        self.assertEqual(report.reassigned_slots, 1)
+        self.assertLessEqual(report.changed_cells, report.full_changed_cells + len(ASSIGNMENT_COLUMNS))
+
+    def test_empty_delta_keeps_plan(self):
+        plan_df, _, _ = generate_plan(2026, 3, MARCH_ABSENCES, max_parallel_absent=3)
+        new_df, _, _ = replan(2026, 3, plan_df, MARCH_ABSENCES, 3, compare_full=False)
+        self.assertEqual(new_df.attrs["replan"].changed_cells, 0)
+        self.assertIsNone(new_df.attrs["replan"].full_changed_cells)
+
+    def test_absence_delta(self):
+        before = {date(2026, 3, 2): {"Koch", "Frey"}, date(2026, 3, 3): {"Koch"}}
+        after = {date(2026, 3, 2): {"Koch"}, date(2026, 3, 4): {"Umland"}}
+        added, removed = absence_delta(before, after)
+        self.assertEqual(added, {date(2026, 3, 4): {"Umland"}})
+        self.assertEqual(removed, {date(2026, 3, 2): {"Frey"}, date(2026, 3, 3): {"Koch"}})
+
+
+if __name__ == "__main__":
+    unittest.main()
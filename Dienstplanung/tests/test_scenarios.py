@@ -0,0 +1,45 @@
+import unittest
+from datetime import date
+
+from models import DOCTORS
+from planner import generate_plan
+from scenarios import approval_variants, run_scenarios, scenario_grid
+
+REQUESTS = {
+    "Urlaub Koch": {date(2026, 3, 9): {"Koch"}, date(2026, 3, 10): {"Koch"}},
+    "Urlaub Frey": {date(2026, 3, 10): {"Frey"}},
+}
+
+
+class TestScenarios(unittest.TestCase):
+    def test_approval_variants(self):
+        variants = approval_variants({date(2026, 3, 2): {"Horner"}}, REQUESTS)
+        self.assertEqual(set(variants), {"Alle genehmigt", "Abgelehnt: Urlaub Frey", "Abgelehnt: Urlaub Koch"})
+        self.assertEqual(variants["Abgelehnt: Urlaub Koch"][date(2026, 3, 10)], {"Frey"})
+        self.assertEqual(variants["Alle genehmigt"][date(2026, 3, 2)], {"Horner"})
+        self.assertEqual(len(approval_variants({}, REQUESTS, exhaustive=True)), 4)
+
+    def test_ranked_table_is_identical_in_process_pool(self):
+        scenarios = scenario_grid([1, 3], [3], approval_variants({}, REQUESTS))
+        serial = run_scenarios(2026, 3, scenarios, max_workers=1)
+        parallel = run_scenarios(2026, 3, scenarios, max_workers=2)
+        self.assertEqual(len(serial), 6)
+        self.assertEqual(list(serial["Rang"]), list(range(1, 7)))
+        self.assertTrue(serial.equals(parallel))
+        ordered = serial[["Unbesetzt", "Warnungen"]].apply(tuple, axis=1).tolist()
+        self.assertEqual(ordered, sorted(ordered))
+
+    def test_scenarios_use_the_given_roster(self):
+        roster = [doctor for doctor in DOCTORS if doctor.name not in ("Horner", "Umland", "Zumbusch")]
+        scenarios = scenario_grid([3], [3], {"Ohne Urlaub": {}})
+        row = run_scenarios(2026, 3, scenarios, max_workers=1, doctors=roster).iloc[0]
+        _, stats_df, warnings = generate_plan(2026, 3, {}, 3, doctors=roster)
+        self.assertEqual(row["Warnungen"], len(warnings))
+        per_fte = stats_df["Dienste_pro_FTE"]
+        self.assertEqual(row["Spannweite_Dienste_pro_FTE"], round(float(per_fte.max() - per_fte.min()), 2))
+        default = run_scenarios(2026, 3, scenarios, max_workers=1).iloc[0]
+        self.assertNotEqual(row["Spannweite_Dienste_pro_FTE"], default["Spannweite_Dienste_pro_FTE"])
+
+
+if __name__ == "__main__":
+    unittest.main()
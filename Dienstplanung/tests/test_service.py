@@ -0,0 +1,148 @@
+import asyncio
+import json
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from service import JobQueue, QueueFull, create_app, parse_request, run_request
+
+
+async def _call(app, method: str, path: str, body: object = None) -> tuple[int, dict]:
+    payload = json.dumps(body).encode("utf-8") if body is not None else b""
+    scope = {
+        "type": "http",
+        "method": method,
+        "path": path,
+        "raw_path": path.encode("ascii"),
+        "query_string": b"",
+        "headers": [(b"content-type", b"application/json")],
+    }
+    messages = [{"type": "http.request", "body": payload, "more_body": False}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0) if messages else {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message)
+
+    await app(scope, receive, send)
+    body_bytes = b"".join(message.get("body", b"") for message in sent if message["type"] == "http.response.body")
+    return sent[0]["status"], json.loads(body_bytes or b"null")
+
+
+class TestParseRequest(unittest.TestCase):
+    def test_same_inputs_share_a_key(self):
+        first = parse_request({"month": "2026-03", "absences": "2026-03-02..2026-03-04: Koch"})
+        second = parse_request({"month": "2026-3", "absences": ["2026-03-02: Koch", "2026-03-03..2026-03-04: Koch"]})
+        other = parse_request({"month": "2026-03", "absences": "2026-03-02: Koch"})
+        self.assertEqual(first.key, second.key)
+        self.assertNotEqual(first.key, other.key)
+
+    def test_invalid_requests(self):
+        wish = {"Datum": "2026-03-02", "Arzt": "Koch", "Wunsch": "Tagdienst gewuenscht"}
+        for body in (
+            [],
+            {},
+            {"month": "2026-13"},
+            {"month": "2026-03", "year": 2026},
+            {"month": "2026-03", "engine": "magic"},
+            {"year": 2026, "engine": "optimize"},
+            {"month": "2026-03", "doctors": "A"},
+            {"month": "2026-03", "wishes": [{**wish, "Datum": "kaputt"}]},
+            {"month": "2026-03", "wishes": [{**wish, "Arzt": "X"}]},
+            {"month": "2026-03", "wishes": [{**wish, "Wunsch": "?"}]},
+            {"month": "2026-03", "wishes": [{**wish, "Gewicht": "viel"}]},
+        ):
+            with self.subTest(body=body), self.assertRaises(ValueError):
+                parse_request(body)
+        self.assertEqual(parse_request({"month": "2026-03", "wishes": [wish]}).wishes, [wish])
+
+    def test_run_request_returns_cli_payload(self):
+        result = run_request(parse_request({"month": "2026-03", "absences": "2026-03-10: Koch, Unbekannt"}))
+        self.assertEqual(len(result["plan"]), 31)
+        self.assertTrue(any("Unbekannte Namen" in warning for warning in result["warnungen"]))
+
+
+class TestService(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.release = threading.Event()
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.addCleanup(self.executor.shutdown, wait=True)
+        self.addCleanup(self.release.set)
+
+        def runner(request):
+            self.release.wait(5)
+            if request.period == "2026-12":
+                raise ValueError("Kein Kandidat")
+            return run_request(request)
+
+        self.queue = JobQueue(workers=1, queue_size=2, executor=self.executor, runner=runner)
+        await self.queue.start()
+        self.addAsyncCleanup(self.queue.stop)
+        self.app = create_app(self.queue)
+
+    async def _wait(self, job_id: str) -> dict:
+        for _ in range(500):
+            status, body = await _call(self.app, "GET", f"/jobs/{job_id}")
+            if body["status"] in ("fertig", "fehlgeschlagen"):
+                return body
+            await asyncio.sleep(0.01)
+        self.fail("Auftrag wurde nicht fertig.")
+
+    async def test_submit_poll_and_fetch_result(self):
+        status, job = await _call(self.app, "POST", "/jobs", {"month": "2026-03"})
+        self.assertEqual((status, job["status"], job["dedupliziert"]), (202, "wartend", False))
+        status, _ = await _call(self.app, "GET", f"/jobs/{job['id']}/result")
+        self.assertEqual(status, 409)
+        self.release.set()
+        self.assertEqual((await self._wait(job["id"]))["status"], "fertig")
+        status, result = await _call(self.app, "GET", f"/jobs/{job['id']}/result")
+        self.assertEqual((status, result["zeitraum"], len(result["plan"])), (200, "2026-03", 31))
+        status, metrics = await _call(self.app, "GET", "/metrics")
+        self.assertEqual((metrics["angenommen"], metrics["fertig"]), (1, 1))
+        self.assertIsNotNone(metrics["latenz"]["gesamt"]["p95_ms"])
+        self.assertEqual((await _call(self.app, "GET", "/jobs/unbekannt"))[0], 404)
+
+    async def test_identical_in_flight_requests_share_a_job(self):
+        _, first = await _call(self.app, "POST", "/jobs", {"month": "2026-03", "absences": "2026-03-02: Koch"})
+        _, second = await _call(self.app, "POST", "/jobs", {"month": "2026-03", "absences": ["2026-03-02: Koch"]})
+        self.assertEqual(first["id"], second["id"])
+        self.assertTrue(second["dedupliziert"])
+        self.release.set()
+        await self._wait(first["id"])
+        _, third = await _call(self.app, "POST", "/jobs", {"month": "2026-03", "absences": "2026-03-02: Koch"})
+        self.assertNotEqual(third["id"], first["id"])
+
+    async def test_full_queue_answers_429(self):
+        codes = []
+        for month in range(1, 6):
+            status, _ = await _call(self.app, "POST", "/jobs", {"month": f"2026-{month:02d}"})
+            codes.append(status)
+            await asyncio.sleep(0.01)
+        # One job runs, two wait, the rest is turned away.
+        self.assertEqual(codes, [202, 202, 202, 429, 429])
+        self.assertEqual(self.queue.metrics()["abgelehnt"], 2)
+        with self.assertRaises(QueueFull):
+            self.queue.submit(parse_request({"month": "2026-09"}))
+
+    async def test_bad_request_and_failed_job(self):
+        status, body = await _call(self.app, "POST", "/jobs", {"month": "kaputt"})
+        self.assertEqual(status, 400)
+        self.assertIn("Zeitraum", body["fehler"])
+        doctors = [{"name": "A", "fte": 0}]
+        status, body = await _call(self.app, "POST", "/jobs", {"month": "2026-03", "doctors": doctors})
+        self.assertEqual(status, 400)
+        wishes = [{"Datum": "kaputt", "Arzt": "X", "Wunsch": "?"}]
+        status, body = await _call(self.app, "POST", "/jobs", {"month": "2026-03", "wishes": wishes})
+        self.assertEqual((status, body["fehler"]), (400, "Wunsch 1: Ungueltiges Datum 'kaputt'."))
+        _, job = await _call(self.app, "POST", "/jobs", {"month": "2026-12"})
+        self.release.set()
+        self.assertEqual((await self._wait(job["id"]))["fehler"], "Kein Kandidat")
+        status, body = await _call(self.app, "GET", f"/jobs/{job['id']}/result")
+        self.assertEqual((status, body["fehler"]), (422, "Kein Kandidat"))
+        self.assertEqual(self.queue.metrics()["fehlgeschlagen"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,129 @@
+import unittest
+from dataclasses import replace
+from datetime import date
+
+from benchmarks.shift_scaling import ward_types
+from benchmarks.suite import synthetic_roster
+from feasibility import check_feasibility
+from plan_table import plan_assignments, wide_plan
+from planner import generate_horizon, generate_plan, improve_plan, month_dates, replan
+from shifts import SHIFT_TYPES, ShiftType, check_shift_types, plan_columns, shift_slots
+from verifier import verify_plan
+
+ICU_NIGHT = ShiftType(
+    "icu_night",
+    "Nachtdienst_ITS",
+    "ITS-Nachtdienst",
+    weekdays=(0, 1, 2, 3),
+    off_days=(0, 1),
+    wish="Nachtdienst",
+    phase="nachtdienste",
+)
+WITH_ICU = SHIFT_TYPES + (ICU_NIGHT,)
+
+
+def _row(plan_df, day: str) -> int:
+    return int(plan_df.index[plan_df["Datum"] == day][0])
+
+
+class TestShiftTypes(unittest.TestCase):
+    def test_default_slots(self):
+        slots = shift_slots(month_dates(2026, 3), 3)
+        self.assertEqual(len(slots), 18 + 4 * 4)
+        friday = [slot for slot in slots if slot.anchor == date(2026, 3, 6)]
+        self.assertEqual([slot.shift for slot in friday], ["weekend_night", "weekend_day", "visit", "friday_late"])
+        self.assertEqual(friday[0].off_days, (date(2026, 3, 6), date(2026, 3, 8), date(2026, 3, 9)))
+        self.assertEqual(friday[0].rest_days, (date(2026, 3, 5), date(2026, 3, 4), date(2026, 3, 3)))
+        self.assertEqual(friday[1].weekend_month, (2026, 3))
+        self.assertEqual(friday[3].warning, "2026-03-06: Kein Kandidat fuer Freitag bis 19 Uhr.")
+        # A month that ends on a Friday has no slots for that weekend.
+        self.assertFalse([slot for slot in shift_slots(month_dates(2026, 7), 3) if slot.anchor == date(2026, 7, 31)])
+
+    def test_invalid_definitions(self):
+        with self.assertRaises(ValueError):
+            ShiftType("x", "X", "X", weekdays=(7,))
+        with self.assertRaises(ValueError):
+            ShiftType("x", "X", "X", weekdays=(0,), capability="icu")
+        with self.assertRaises(ValueError):
+            check_shift_types(SHIFT_TYPES + (replace(ICU_NIGHT, key="night"),))
+        self.assertIs(check_shift_types(None), SHIFT_TYPES)
+
+    def test_columns_keep_the_usual_order(self):
+        self.assertEqual(plan_columns(tuple(reversed(WITH_ICU)))[-1], "Nachtdienst_ITS")
+        self.assertEqual(plan_columns(), plan_columns(tuple(reversed(SHIFT_TYPES))))
+
+
+class TestCustomShiftTypes(unittest.TestCase):
+    def setUp(self):
+        self.roster = synthetic_roster(30)
+        self.plan_df, self.stats_df, self.warnings = generate_plan(
+            2026, 3, {}, 3, doctors=self.roster, shift_types=WITH_ICU
+        )
+
+    def test_extra_ward_is_planned_and_checked(self):
+        self.assertEqual(list(self.plan_df.columns[2:8]), list(plan_columns(WITH_ICU)))
+        icu = self.plan_df[self.plan_df["Wochentag"].isin(["Mo", "Di", "Mi", "Do"])]
+        self.assertTrue((icu["Nachtdienst_ITS"] != "").all())
+        self.assertTrue((self.plan_df.loc[self.plan_df["Wochentag"] == "Fr", "Nachtdienst_ITS"] == "").all())
+        self.assertTrue((icu["Nachtdienst_ITS"] != icu["Nachtdienst"]).all())
+        self.assertTrue(verify_plan(self.plan_df, {}, 3, self.roster, WITH_ICU).empty)
+        self.assertEqual(self.warnings, [])
+        assignments = plan_assignments(self.plan_df, plan_columns(WITH_ICU))
+        self.assertEqual(self.stats_df["Dienste_gesamt"].sum(), len(assignments))
+        plain_df, _, _ = generate_plan(2026, 3, {}, 3, doctors=self.roster)
+        self.assertEqual(list(plain_df.columns), [c for c in self.plan_df.columns if c != "Nachtdienst_ITS"])
+
+    def test_verifier_uses_the_shift_rules(self):
+        plan_df = self.plan_df.copy()
+        holder = plan_df.loc[_row(plan_df, "2026-03-09"), "Nachtdienst_ITS"]
+        plan_df.loc[_row(plan_df, "2026-03-10"), "Visitendienst"] = holder
+        violations = verify_plan(plan_df, {}, 3, self.roster, WITH_ICU)
+        self.assertEqual(
+            list(violations["Meldung"]),
+            [f"2026-03-10 ({holder}): Visitendienst am freien Tag nach ITS-Nachtdienst vom 2026-03-09."],
+        )
+
+    def test_weight_counts_duties(self):
+        heavy = SHIFT_TYPES + (replace(ICU_NIGHT, weight=2),)
+        plan_df, stats_df, _ = generate_plan(2026, 3, {}, 3, doctors=self.roster, shift_types=heavy)
+        assignments = plan_assignments(plan_df, plan_columns(heavy))
+        self.assertEqual(stats_df["Dienste_gesamt"].sum(), len(assignments) + 18)
+        horizon = generate_horizon(date(2026, 3, 1), date(2026, 4, 30), {}, 3, doctors=self.roster, shift_types=heavy)
+        for name, total in zip(horizon.stats_df["Arzt"], horizon.stats_df["Dienste_gesamt"]):
+            self.assertEqual(sum(duties[name] for duties in horizon.monthly_duties.values()), total)
+
+    def test_optimizer_repair_and_long_table(self):
+        optimized, _, _ = generate_plan(
+            2026, 3, {}, 3, engine="optimize", time_limit=0.1, doctors=self.roster, shift_types=WITH_ICU
+        )
+        self.assertTrue(verify_plan(optimized, {}, 3, self.roster, WITH_ICU).empty)
+        improved, _, _ = improve_plan(
+            2026, 3, self.plan_df, {}, 3, max_moves=2000, doctors=self.roster, shift_types=WITH_ICU
+        )
+        self.assertIn("Nachtdienst_ITS", improved.columns)
+        holder = self.plan_df.loc[_row(self.plan_df, "2026-03-11"), "Nachtdienst_ITS"]
+        added = {date(2026, 3, 11): {holder}}
+        replanned, _, _ = replan(
+            2026, 3, self.plan_df, {}, 3, added=added, doctors=self.roster, shift_types=WITH_ICU
+        )
+        self.assertNotEqual(replanned.loc[_row(replanned, "2026-03-11"), "Nachtdienst_ITS"], holder)
+        self.assertTrue(verify_plan(replanned, added, 3, self.roster, WITH_ICU).empty)
+        self.assertGreater(replanned.attrs["replan"].changed_cells, 0)
+
+        columns = list(plan_columns(WITH_ICU))
+        long_df = plan_assignments(self.plan_df, columns)
+        self.assertTrue(wide_plan(long_df).equals(self.plan_df[["Datum", "Wochentag"] + columns]))
+        report = check_feasibility(2026, 3, {}, doctors=self.roster, shift_types=WITH_ICU)
+        self.assertEqual(report.slots, 18 * 2 + 4 * 4)
+
+    def test_twenty_shift_types(self):
+        shift_types = ward_types(14)
+        roster = synthetic_roster(160)
+        plan_df, _, warnings = generate_plan(2026, 3, {}, 3, doctors=roster, shift_types=shift_types)
+        self.assertEqual(len(plan_columns(shift_types)), 19)
+        self.assertEqual(warnings, [])
+        self.assertTrue(verify_plan(plan_df, {}, 3, roster, shift_types).empty)
+
+
+if __name__ == "__main__":
+    unittest.main()
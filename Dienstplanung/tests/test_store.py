@@ -0,0 +1,125 @@
+import tempfile
+import threading
+import time
+import unittest
+from dataclasses import replace
+from datetime import date
+from pathlib import Path
+
+from models import DOCTORS
+from planner import generate_plan
+from shifts import SHIFT_TYPES, ShiftType
+from store import PlanStore
+
+
+class TestPlanStore(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = Path(self.directory.name) / "plan.db"
+        self.store = PlanStore(self.path)
+
+    def tearDown(self):
+        self.store.close()
+        self.directory.cleanup()
+
+    def test_roster_is_seeded_and_replaceable(self):
+        self.assertEqual(self.store.doctors(), DOCTORS)
+        changed = [replace(DOCTORS[0], fte=0.5), *DOCTORS[1:]]
+        self.store.save_doctors(changed)
+        self.assertEqual(PlanStore(self.path).doctors(), changed)
+
+    def test_absences_are_merged_per_doctor(self):
+        self.store.add_absence("urlaub", "Koch", date(2026, 3, 2), date(2026, 3, 5))
+        self.store.add_absence("urlaub", "Koch", date(2026, 3, 6), date(2026, 3, 9))
+        self.store.add_absence("sperrtag", "Koch", date(2026, 3, 20), date(2026, 3, 20))
+        urlaub = list(self.store.absence_index("urlaub").intervals())
+        self.assertEqual([(i.start, i.end) for i in urlaub], [(date(2026, 3, 2), date(2026, 3, 9))])
+        self.assertEqual(len(self.store.absence_index("sperrtag", date(2026, 3, 1), date(2026, 3, 19))), 0)
+        with self.assertRaises(ValueError):
+            self.store.add_absence("krank", "Koch", date(2026, 3, 2), date(2026, 3, 2))
+
+    def test_clearing_is_limited_to_the_range_and_doctors(self):
+        self.store.add_absence("urlaub", "Koch", date(2026, 3, 2), date(2026, 3, 20))
+        self.store.add_absence("urlaub", "Frey", date(2026, 3, 2), date(2026, 3, 5))
+        self.store.add_absence("sperrtag", "Koch", date(2026, 3, 9), date(2026, 3, 9))
+        self.store.clear_absences("urlaub", date(2026, 3, 9), date(2026, 3, 15), ["Koch"])
+        urlaub = [(i.name, i.start, i.end) for i in self.store.absence_index("urlaub").intervals()]
+        self.assertEqual(
+            urlaub,
+            [
+                ("Frey", date(2026, 3, 2), date(2026, 3, 5)),
+                ("Koch", date(2026, 3, 2), date(2026, 3, 8)),
+                ("Koch", date(2026, 3, 16), date(2026, 3, 20)),
+            ],
+        )
+        self.store.clear_absences("urlaub", date(2026, 3, 1), date(2026, 3, 31))
+        self.assertEqual(len(self.store.absence_index("urlaub")), 0)
+        self.assertEqual(len(self.store.absence_index("sperrtag")), 1)
+
+        for day in (date(2026, 3, 2), date(2026, 4, 2)):
+            self.store.add_wish(day, "Koch", "Tagdienst gewuenscht")
+            self.store.add_wish(day, "Frey", "Tagdienst gewuenscht")
+        self.store.clear_wishes(date(2026, 3, 1), date(2026, 3, 31), ["Frey"])
+        self.store.clear_wishes(date(2026, 4, 1), date(2026, 4, 30))
+        self.assertEqual([(w["Datum"], w["Arzt"]) for w in self.store.wishes()], [("2026-03-02", "Koch")])
+
+    def test_plans_are_versioned_and_load_quickly(self):
+        plan_df, stats_df, warnings = generate_plan(2026, 3, {}, max_parallel_absent=3)
+        self.assertEqual(self.store.save_plan("2026-03", plan_df, stats_df, warnings, engine="greedy"), 1)
+        self.assertEqual(self.store.save_plan("2026-03", plan_df, stats_df, warnings), 2)
+        self.assertEqual([v.version for v in self.store.plan_versions("2026-03")], [1, 2])
+        self.assertEqual(self.store.plan_versions("2026-03")[0].params, {"engine": "greedy"})
+        self.assertIsNone(self.store.load_plan("2026-04"))
+
+        started = time.perf_counter()
+        loaded_plan, loaded_stats, loaded_warnings = self.store.load_plan("2026-03")
+        self.assertLess(time.perf_counter() - started, 0.05)
+        self.assertTrue(loaded_plan.equals(plan_df))
+        self.assertTrue(loaded_stats.equals(stats_df))
+        self.assertEqual(loaded_warnings, warnings)
+
+    def test_plans_keep_the_columns_of_their_shift_types(self):
+        icu_night = ShiftType("icu_night", "Nachtdienst_ITS", "ITS-Nachtdienst", weekdays=(0, 1, 2, 3), off_days=(0, 1))
+        without_visit = tuple(shift_type for shift_type in SHIFT_TYPES if shift_type.key != "visit")
+        for period, shift_types in (("2026-03", SHIFT_TYPES + (icu_night,)), ("2026-04", without_visit)):
+            plan_df, stats_df, warnings = generate_plan(2026, 3, {}, 3, shift_types=shift_types)
+            self.store.save_plan(period, plan_df, stats_df, warnings)
+            loaded_plan, _, _ = self.store.load_plan(period)
+            self.assertTrue(loaded_plan.equals(plan_df), msg=period)
+
+        # Plans saved before the duty columns were stored load with the default ones.
+        plan_df, stats_df, warnings = generate_plan(2026, 3, {}, 3)
+        self.store.save_plan("2026-05", plan_df, stats_df, warnings)
+        with self.store._write() as connection:
+            connection.execute("DELETE FROM plan_columns")
+        self.assertTrue(self.store.load_plan("2026-05")[0].equals(plan_df))
+
+    def test_concurrent_writers_get_distinct_versions(self):
+        plan_df, stats_df, warnings = generate_plan(2026, 3, {}, max_parallel_absent=3)
+        versions = []
+        errors = []
+
+        def work(worker):
+            store = PlanStore(self.path)
+            try:
+                for _ in range(5):
+                    versions.append(store.save_plan("2026-03", plan_df, stats_df, warnings))
+                    store.add_wish(date(2026, 3, 2), DOCTORS[worker].name, "Tagdienst gewuenscht")
+                    store.load_plan("2026-03")
+            except Exception as error:  # noqa: BLE001
+                errors.append(error)
+            finally:
+                store.close()
+
+        threads = [threading.Thread(target=work, args=(worker,)) for worker in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(sorted(versions), list(range(1, 21)))
+        self.assertEqual(len(self.store.wishes()), 20)
+
+
+if __name__ == "__main__":
+    unittest.main()
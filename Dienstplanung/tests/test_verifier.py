@@ -0,0 +1,93 @@
+import unittest
+from datetime import date
+
+from benchmarks.fuzz_planner import case_seed, check_case, fuzz, random_case
+from models import DOCTORS
+from planner import generate_plan
+from verifier import VIOLATION_COLUMNS, verify_plan
+
+MARCH_ABSENCES = {
+    date(2026, 3, 2): {"Koch", "Frey"},
+    date(2026, 3, 13): {"Fecher", "Umland", "Horner"},
+}
+
+
+def _row(plan_df, day: str) -> int:
+    return int(plan_df.index[plan_df["Datum"] == day][0])
+
+
+class TestVerifyPlan(unittest.TestCase):
+    def setUp(self):
+        self.plan_df, _, _ = generate_plan(2026, 3, MARCH_ABSENCES, max_parallel_absent=3)
+
+    def rules(self, plan_df, absences=MARCH_ABSENCES, rest=3):
+        violations = verify_plan(plan_df, absences, rest)
+        self.assertEqual(list(violations.columns), VIOLATION_COLUMNS)
+        return [(row.Datum, row.Arzt, row.Regel) for row in violations.itertuples()]
+
+    def test_planned_months_have_no_violations(self):
+        self.assertEqual(self.rules(self.plan_df), [])
+        for engine in ("greedy", "optimize"):
+            plan_df, _, _ = generate_plan(2026, 5, {}, 3, engine=engine, time_limit=0.2)
+            self.assertEqual(self.rules(plan_df, {}), [], msg=engine)
+
+    def test_absence_capability_and_unknown_doctor(self):
+        plan_df = self.plan_df.copy()
+        plan_df.loc[_row(plan_df, "2026-03-02"), "Nachtdienst"] = "Frey"
+        plan_df.loc[_row(plan_df, "2026-03-10"), "Nachtdienst"] = "Bauregger"
+        plan_df.loc[_row(plan_df, "2026-03-11"), "Visitendienst"] = "Niemand"
+        violations = self.rules(plan_df)
+        self.assertIn(("2026-03-02", "Frey", "abwesend"), violations)
+        self.assertIn(("2026-03-10", "Bauregger", "qualifikation"), violations)
+        self.assertIn(("2026-03-11", "Niemand", "unbekannt"), violations)
+
+    def test_day_off_after_night(self):
+        plan_df = self.plan_df.copy()
+        night = plan_df.loc[_row(plan_df, "2026-03-09"), "Nachtdienst"]
+        row = _row(plan_df, "2026-03-10")
+        plan_df.loc[row, "Tagdienst"] += f", {night}"
+        violation = verify_plan(plan_df, MARCH_ABSENCES)
+        self.assertEqual(list(violation["Regel"]), ["frei_nach_dienst"])
+        self.assertEqual(
+            violation.loc[0, "Meldung"],
+            f"2026-03-10 ({night}): Tagdienst am freien Tag nach Nachtdienst vom 2026-03-09.",
+        )
+
+    def test_weekend_rules(self):
+        plan_df = self.plan_df.copy()
+        friday = _row(plan_df, "2026-03-06")
+        night = plan_df.loc[friday, "Nachtdienst"]
+        # The same doctor on the Wednesday night before and split off the Sunday.
+        plan_df.loc[_row(plan_df, "2026-03-04"), "Nachtdienst"] = night
+        plan_df.loc[friday + 2, "Nachtdienst"] = plan_df.loc[friday, "Freitag_bis_19"]
+        violations = self.rules(plan_df)
+        self.assertIn(("2026-03-04", night, "ruhetage_vor_wochenende"), violations)
+        self.assertIn(("2026-03-06", night, "dienstblock"), violations)
+        self.assertNotIn("ruhetage_vor_wochenende", {rule for _, _, rule in self.rules(plan_df, rest=1)})
+
+    def test_weekend_cap(self):
+        plan_df = self.plan_df.copy()
+        capped = next(doctor.name for doctor in DOCTORS if doctor.max_weekends_per_month == 1)
+        saturdays = [row for row in plan_df.index if plan_df.loc[row, "Wochentag"] == "Sa"]
+        for saturday in saturdays[:2]:
+            plan_df.loc[[saturday, saturday + 1], "Wochenend_Tagdienst"] = capped
+        violations = [v for v in self.rules(plan_df) if v[2] == "wochenend_limit"]
+        self.assertEqual(violations, [(plan_df.loc[saturdays[1], "Datum"], capped, "wochenend_limit")])
+
+    def test_empty_plan(self):
+        self.assertTrue(verify_plan(self.plan_df.iloc[:0], {}).empty)
+
+
+class TestFuzzHarness(unittest.TestCase):
+    def test_random_cases_pass(self):
+        checked, failing, messages = fuzz(seed=0, cases=40)
+        self.assertEqual(checked, 40)
+        self.assertIsNone(failing, msg=messages)
+
+    def test_cases_replay_from_their_seed(self):
+        self.assertEqual(random_case(case_seed(3, 17)), random_case(case_seed(3, 17)))
+        self.assertEqual(check_case(random_case(case_seed(3, 17)), engine="optimize", time_limit=0.05), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
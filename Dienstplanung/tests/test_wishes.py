@@ -0,0 +1,108 @@
+import time
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from models import DOCTORS
+from planner import _FairQueue, generate_plan
+from plan_table import plan_assignments
+from wishes import WISH_TYPES, wish_conflicts, wish_report
+
+
+class TestWishConflicts(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.plan_df, _, _ = generate_plan(2026, 3, {}, max_parallel_absent=3)
+
+    def _row(self, day):
+        return self.plan_df[self.plan_df["Datum"] == day].iloc[0]
+
+    def test_assignments_long_covers_every_cell(self):
+        long_df = plan_assignments(self.plan_df)
+        row = self._row("2026-03-02")
+        day_names = {n.strip() for n in row["Tagdienst"].split(",") if n.strip()}
+        got = set(long_df.loc[(long_df["Datum"] == "2026-03-02") & (long_df["Dienst"] == "Tagdienst"), "Arzt"])
+        self.assertEqual(got, day_names)
+        self.assertFalse((long_df["Arzt"] == "").any())
+
+    def test_categories_and_messages(self):
+        saturday = self._row("2026-03-14")
+        monday = self._row("2026-03-02")
+        other = next(d.name for d in DOCTORS if d.name != monday["Nachtdienst"])
+        wishes = [
+            {"Datum": "2026-03-14", "Arzt": saturday["Wochenend_Tagdienst"], "Wunsch": "Tagdienst nicht gewuenscht"},
+            {"Datum": "2026-03-02", "Arzt": other, "Wunsch": "Nachtdienst gewuenscht"},
+            {"Datum": "2026-03-02", "Arzt": monday["Nachtdienst"], "Wunsch": "Nachtdienst gewuenscht"},
+            {"Datum": "2026-05-01", "Arzt": other, "Wunsch": "Nachtdienst gewuenscht"},
+            {"Datum": "2026-03-02", "Arzt": other, "Wunsch": "Unbekannt"},
+        ]
+        conflicts = wish_conflicts(self.plan_df, wishes)
+        self.assertEqual(list(conflicts["Konflikt"]), ["verletzt", "nicht_erfuellt"])
+        self.assertEqual(
+            conflicts["Meldung"].tolist(),
+            [
+                f"2026-03-14 ({saturday['Wochenend_Tagdienst']}): Wunsch verletzt (Tagdienst zugeteilt).",
+                f"2026-03-02 ({other}): Wunsch nicht erfuellt (kein Nachtdienst).",
+            ],
+        )
+
+    def test_large_wish_table(self):
+        generator = np.random.default_rng(3)
+        size = 100_000
+        wishes = pd.DataFrame(
+            {
+                "Datum": generator.choice(self.plan_df["Datum"].to_numpy(), size),
+                "Arzt": generator.choice([d.name for d in DOCTORS], size),
+                "Wunsch": generator.choice(list(WISH_TYPES), size),
+            }
+        )
+        started = time.perf_counter()
+        conflicts = wish_conflicts(self.plan_df, wishes)
+        self.assertLess(time.perf_counter() - started, 5.0)
+        self.assertGreater(len(conflicts), 0)
+        self.assertLess(len(conflicts), size)
+
+
+class TestWishesInPlanner(unittest.TestCase):
+    def test_preferred_pick_matches_brute_force(self):
+        names = [f"Arzt{idx:02d}" for idx in range(30)]
+        duty_count = {name: idx % 7 for idx, name in enumerate(names)}
+        queue = _FairQueue(len(names), lambda idx: (duty_count[names[idx]] / 1.0, duty_count[names[idx]], idx))
+        generator = np.random.default_rng(5)
+        for _ in range(300):
+            eligible = generator.random(len(names)) < 0.5
+            bonus = np.where(generator.random(len(names)) < 0.2, generator.choice([-2.0, 1.0, 3.0], len(names)), 0.0)
+            keys = [(duty_count[n] - bonus[i], duty_count[n], i) for i, n in enumerate(names) if eligible[i]]
+            expected = min(keys)[-1] if keys else None
+            self.assertEqual(queue.pick_preferred(eligible, bonus), expected)
+
+    def test_wishes_raise_fulfilment_and_weight_zero_is_greedy(self):
+        generator = np.random.default_rng(11)
+        days = [f"2026-03-{day:02d}" for day in range(1, 32)]
+        names = [d.name for d in DOCTORS]
+        wishes = [
+            {
+                "Datum": str(generator.choice(days)),
+                "Arzt": str(generator.choice(names)),
+                "Wunsch": str(generator.choice(list(WISH_TYPES))),
+            }
+            for _ in range(40)
+        ]
+        greedy, _, _ = generate_plan(2026, 3, {}, max_parallel_absent=3)
+        unweighted, _, _ = generate_plan(2026, 3, {}, max_parallel_absent=3, wishes=wishes, wish_weight=0)
+        weighted, _, _ = generate_plan(2026, 3, {}, max_parallel_absent=3, wishes=wishes)
+        self.assertTrue(unweighted.equals(greedy))
+        self.assertEqual(unweighted.attrs["wishes"], wish_report(greedy, wishes))
+        self.assertGreater(weighted.attrs["wishes"].rate, unweighted.attrs["wishes"].rate)
+
+    def test_unwanted_day_shift_is_dropped(self):
+        wishes = [{"Datum": "2026-03-03", "Arzt": "Langen", "Wunsch": "Tagdienst nicht gewuenscht"}]
+        plan_df, _, _ = generate_plan(2026, 3, {}, max_parallel_absent=3, wishes=wishes)
+        row = plan_df[plan_df["Datum"] == "2026-03-03"].iloc[0]
+        self.assertNotIn("Langen", row["Tagdienst"])
+        self.assertEqual(plan_df.attrs["wishes"].rate, 1.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
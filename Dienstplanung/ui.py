@@ -1,17 +1,45 @@
 from __future__ import annotations
 
 import calendar
+import os
+import time
 from collections import defaultdict
 from datetime import date, timedelta
 
 import pandas as pd
 import streamlit as st
 
-from models import DOCTORS
-from planner import generate_plan
+from absences import AbsenceIndex, Absences
+from feasibility import check_feasibility
+from models import Roster, compile_roster
+from plan_cache import PlanCache, plan_key
+from plan_table import export_table, plan_assignments
+from planner import PlanMetrics, absence_delta, generate_horizon, generate_plan, improve_plan, replan
+from scenarios import approval_variants, run_scenarios, scenario_grid
+from store import PlanStore
+from wishes import wish_conflicts, wish_report
 
 
-def _doctor_overview() -> pd.DataFrame:
+@st.cache_resource
+def _plan_cache() -> PlanCache:
+    return PlanCache(directory=os.environ.get("DIENSTPLANUNG_CACHE_DIR") or None)
+
+
+@st.cache_resource
+def _store() -> PlanStore:
+    # One store per server process; PlanStore opens a connection per thread.
+    return PlanStore()
+
+
+def _roster() -> Roster:
+    # Compiled once per distinct roster and shared by planner, statistics
+    # and the overview across reruns.
+    return compile_roster(_store().doctors())
+
+
+@st.cache_data
+def _doctor_overview(fingerprint: str, _compiled: Roster) -> pd.DataFrame:
+    # ``fingerprint`` is the roster fingerprint and serves as the cache key.
     return pd.DataFrame(
         [
             {
@@ -20,20 +48,26 @@ def _doctor_overview() -> pd.DataFrame:
                 "Visitendienst": d.can_visit,
                 "Nacht/Wochenende": d.can_full_service,
                 "FTE": d.fte,
-                "Max Wochenenden/Monat": d.max_weekends_per_month if d.max_weekends_per_month is not None else "-",
+                # Kept as text so the column has one type and Arrow can
+                # serialize it without Streamlit's fallback conversion.
+                "Max Wochenenden/Monat": str(d.max_weekends_per_month) if d.max_weekends_per_month is not None else "-",
             }
-            for d in DOCTORS
+            for d in _compiled
         ]
     )
 
 
+# Session state key -> absence kind in the store.
+ABSENCE_KEYS = {"urlaub_index": "urlaub", "sperr_index": "sperrtag"}
+
+
 def _init_state() -> None:
-    if "urlaub_entries" not in st.session_state:
-        st.session_state.urlaub_entries = {}
-    if "sperr_entries" not in st.session_state:
-        st.session_state.sperr_entries = {}
+    # A new session starts from what is saved in the store.
+    for key, kind in ABSENCE_KEYS.items():
+        if key not in st.session_state:
+            st.session_state[key] = _store().absence_index(kind)
     if "wunsch_entries" not in st.session_state:
-        st.session_state.wunsch_entries = []
+        st.session_state.wunsch_entries = _store().wishes()
 
 
 def _add_date_range_entries(
@@ -49,88 +83,135 @@ def _add_date_range_entries(
         st.error("Bitte mindestens einen Arzt auswaehlen.")
         return
 
-    target: dict[str, list[str]] = st.session_state[target_key]
-    day = start_day
-    while day <= end_day:
-        day_key = day.isoformat()
-        existing = set(target.get(day_key, []))
-        existing.update(doctors)
-        target[day_key] = sorted(existing)
-        day += timedelta(days=1)
-    st.session_state[target_key] = target
+    shortages = _new_shortages(start_day, end_day, doctors)
+    if shortages and target_key == "urlaub_index":
+        st.error("Urlaub nicht gespeichert, sonst sind Dienste nicht mehr besetzbar:\n\n" + "\n\n".join(shortages))
+        return
+    target: AbsenceIndex = st.session_state[target_key]
+    for doctor in doctors:
+        _store().add_absence(ABSENCE_KEYS[target_key], doctor, start_day, end_day)
+        target.add(doctor, start_day, end_day)
     st.success("Eintrag gespeichert.")
-
-
-def _entries_to_df(entries: dict[str, list[str]], title: str) -> pd.DataFrame:
-    rows = []
-    for day_key in sorted(entries.keys()):
-        rows.append(
+    if shortages:
+        st.warning("Nicht mehr besetzbar:\n\n" + "\n\n".join(shortages))
+
+
+def _new_shortages(start_day: date, end_day: date, doctors: list[str]) -> list[str]:
+    # The feasibility check takes milliseconds, so a request is compared
+    # against the current absences before it is saved. Problems that
+    # already exist without it do not count against it.
+    current, _ = _structured_unavailable()
+    requested = AbsenceIndex()
+    for doctor in doctors:
+        requested.add(doctor, start_day, end_day)
+    proposed = AbsenceIndex.union(current, requested)
+    roster = _roster()
+    requested_days = (start_day + timedelta(days=offset) for offset in range((end_day - start_day).days + 1))
+    months = sorted({(day.year, day.month) for day in requested_days})
+    shortages = []
+    for year, month in months:
+        before = set(check_feasibility(year, month, current, doctors=roster).messages())
+        after = check_feasibility(year, month, proposed, doctors=roster).messages()
+        shortages.extend(message for message in after if message not in before)
+    return shortages
+
+
+def _clear_entries(target_key: str, title: str, start_day: date, end_day: date, doctors: list[str]) -> None:
+    # Deletes only the shown range for the selected doctors (all without a
+    # selection), and only after a confirmation: the store is shared.
+    if end_day < start_day:
+        st.error("Enddatum darf nicht vor dem Startdatum liegen.")
+        return
+    who = ", ".join(doctors) if doctors else "alle Aerzte"
+    st.write(f"{title} vom {start_day.isoformat()} bis {end_day.isoformat()} fuer {who} loeschen?")
+    if not st.button("Loeschen bestaetigen", key=f"{target_key}_clear"):
+        return
+    _store().clear_absences(ABSENCE_KEYS[target_key], start_day, end_day, doctors or None)
+    index: AbsenceIndex = st.session_state[target_key]
+    for name in doctors or sorted({interval.name for interval in index.intervals(start_day, end_day)}):
+        index.remove(name, start_day, end_day)
+    st.success("Eintraege geloescht.")
+
+
+def _clear_wishes(year: int, month: int) -> None:
+    first = date(year, month, 1)
+    last = date(year, month, calendar.monthrange(year, month)[1])
+    st.write(f"Alle Wuensche vom {first.isoformat()} bis {last.isoformat()} loeschen?")
+    if not st.button("Loeschen bestaetigen", key="wunsch_clear"):
+        return
+    _store().clear_wishes(first, last)
+    st.session_state.wunsch_entries = [
+        wish for wish in st.session_state.wunsch_entries if not first.isoformat() <= wish["Datum"] <= last.isoformat()
+    ]
+    st.success("Wuensche geloescht.")
+
+
+def _entries_to_df(target_key: str, title: str) -> pd.DataFrame:
+    # The table is rebuilt from the merged intervals only after the index
+    # changed; other reruns reuse the cached one.
+    index: AbsenceIndex = st.session_state[target_key]
+    cached = st.session_state.get(f"{target_key}_table")
+    if cached is not None and cached[0] == index.version:
+        return cached[1]
+    df = pd.DataFrame(
+        [
             {
                 "Typ": title,
-                "Datum": day_key,
-                "Aerzte": ", ".join(entries[day_key]),
+                "Arzt": interval.name,
+                "Von": interval.start.isoformat(),
+                "Bis": interval.end.isoformat(),
+                "Tage": (interval.end - interval.start).days + 1,
             }
-        )
-    return pd.DataFrame(rows)
-
+            for interval in index.intervals()
+        ]
+    )
+    st.session_state[f"{target_key}_table"] = (index.version, df)
+    return df
 
-def _structured_unavailable() -> tuple[dict[date, set[str]], pd.DataFrame]:
-    unavailable: dict[date, set[str]] = defaultdict(set)
-    urlaub: dict[str, list[str]] = st.session_state.urlaub_entries
-    sperr: dict[str, list[str]] = st.session_state.sperr_entries
 
-    for day_key, names in urlaub.items():
-        unavailable[date.fromisoformat(day_key)].update(names)
-    for day_key, names in sperr.items():
-        unavailable[date.fromisoformat(day_key)].update(names)
+def _structured_unavailable() -> tuple[AbsenceIndex, pd.DataFrame]:
+    urlaub: AbsenceIndex = st.session_state.urlaub_index
+    sperr: AbsenceIndex = st.session_state.sperr_index
+    versions = (urlaub.version, sperr.version)
+    cached = st.session_state.get("unavailable_cache")
+    if cached is not None and cached[0] == versions:
+        return cached[1], cached[2]
 
-    urlaub_df = _entries_to_df(urlaub, "Urlaub")
-    sperr_df = _entries_to_df(sperr, "Sperrtag")
-    overview = pd.concat([urlaub_df, sperr_df], ignore_index=True)
+    unavailable = AbsenceIndex.union(urlaub, sperr)
+    overview = pd.concat(
+        [_entries_to_df("urlaub_index", "Urlaub"), _entries_to_df("sperr_index", "Sperrtag")], ignore_index=True
+    )
+    st.session_state.unavailable_cache = (versions, unavailable, overview)
     return unavailable, overview
 
 
+def _month_window(year: int, month: int) -> tuple[date, date]:
+    # A week either side covers the rest days that reach into the month.
+    _, last_day = calendar.monthrange(year, month)
+    return date(year, month, 1) - timedelta(days=7), date(year, month, last_day) + timedelta(days=7)
+
+
+def _urlaub_requests(year: int, month: int) -> dict[str, dict[date, set[str]]]:
+    start, end = _month_window(year, month)
+    requests: dict[str, dict[date, set[str]]] = defaultdict(dict)
+    for interval in st.session_state.urlaub_index.intervals(start, end):
+        for day in interval.days():
+            if start <= day <= end:
+                requests[f"Urlaub {interval.name}"][day] = {interval.name}
+    return dict(requests)
+
+
 def _wish_conflicts(plan_df: pd.DataFrame) -> list[str]:
     wishes: list[dict[str, str]] = st.session_state.wunsch_entries
     if not wishes:
         return []
-
-    by_date = {row["Datum"]: row for _, row in plan_df.iterrows()}
-    conflicts: list[str] = []
-
-    for wish in wishes:
-        wish_day = wish["Datum"]
-        wish_doc = wish["Arzt"]
-        wish_type = wish["Wunsch"]
-        row = by_date.get(wish_day)
-        if not row:
-            continue
-
-        weekday_day_names = [n.strip() for n in str(row["Tagdienst"]).split(",") if n.strip()]
-        is_day = wish_doc in weekday_day_names or row["Wochenend_Tagdienst"] == wish_doc
-        is_night = row["Nachtdienst"] == wish_doc
-        is_visit = row["Visitendienst"] == wish_doc
-        date_label = f"{wish_day} ({wish_doc})"
-
-        if wish_type == "Tagdienst gewuenscht" and not is_day:
-            conflicts.append(f"{date_label}: Wunsch nicht erfuellt (kein Tagdienst).")
-        if wish_type == "Nachtdienst gewuenscht" and not is_night:
-            conflicts.append(f"{date_label}: Wunsch nicht erfuellt (kein Nachtdienst).")
-        if wish_type == "Visitendienst gewuenscht" and not is_visit:
-            conflicts.append(f"{date_label}: Wunsch nicht erfuellt (kein Visitendienst).")
-        if wish_type == "Tagdienst nicht gewuenscht" and is_day:
-            conflicts.append(f"{date_label}: Wunsch verletzt (Tagdienst zugeteilt).")
-        if wish_type == "Nachtdienst nicht gewuenscht" and is_night:
-            conflicts.append(f"{date_label}: Wunsch verletzt (Nachtdienst zugeteilt).")
-        if wish_type == "Visitendienst nicht gewuenscht" and is_visit:
-            conflicts.append(f"{date_label}: Wunsch verletzt (Visitendienst zugeteilt).")
-
-    return conflicts
+    return wish_conflicts(plan_df, wishes)["Meldung"].tolist()
 
 
+@st.fragment
 def _render_constraints_ui(year: int, month: int) -> None:
-    doctor_names = [d.name for d in DOCTORS]
-    tab_urlaub, tab_sperr, tab_wunsch = st.tabs(["Urlaub", "Sperrtage", "Wuensche"])
+    doctor_names = list(_roster().names)
+    tab_urlaub, tab_sperr, tab_wunsch, tab_szenarien = st.tabs(["Urlaub", "Sperrtage", "Wuensche", "Szenarien"])
 
     with tab_urlaub:
         col1, col2 = st.columns(2)
@@ -142,11 +223,11 @@ def _render_constraints_ui(year: int, month: int) -> None:
         c1, c2 = st.columns(2)
         with c1:
             if st.button("Urlaub speichern"):
-                _add_date_range_entries("urlaub_entries", start, end, doctors)
+                _add_date_range_entries("urlaub_index", start, end, doctors)
         with c2:
-            if st.button("Urlaub loeschen"):
-                st.session_state.urlaub_entries = {}
-        df = _entries_to_df(st.session_state.urlaub_entries, "Urlaub")
+            with st.popover("Urlaub loeschen"):
+                _clear_entries("urlaub_index", "Urlaub", start, end, doctors)
+        df = _entries_to_df("urlaub_index", "Urlaub")
         if not df.empty:
             st.dataframe(df, use_container_width=True)
 
@@ -160,11 +241,11 @@ def _render_constraints_ui(year: int, month: int) -> None:
         c1, c2 = st.columns(2)
         with c1:
             if st.button("Sperrtage speichern"):
-                _add_date_range_entries("sperr_entries", start, end, doctors)
+                _add_date_range_entries("sperr_index", start, end, doctors)
         with c2:
-            if st.button("Sperrtage loeschen"):
-                st.session_state.sperr_entries = {}
-        df = _entries_to_df(st.session_state.sperr_entries, "Sperrtag")
+            with st.popover("Sperrtage loeschen"):
+                _clear_entries("sperr_index", "Sperrtage", start, end, doctors)
+        df = _entries_to_df("sperr_index", "Sperrtag")
         if not df.empty:
             st.dataframe(df, use_container_width=True)
 
@@ -190,16 +271,350 @@ def _render_constraints_ui(year: int, month: int) -> None:
         c1, c2 = st.columns(2)
         with c1:
             if st.button("Wunsch speichern"):
+                _store().add_wish(wish_day, wish_doc, wish_type)
                 st.session_state.wunsch_entries.append(
-                    {"Datum": wish_day.isoformat(), "Arzt": wish_doc, "Wunsch": wish_type}
+                    {"Datum": wish_day.isoformat(), "Arzt": wish_doc, "Wunsch": wish_type, "Gewicht": 1.0}
                 )
                 st.success("Wunsch gespeichert.")
         with c2:
-            if st.button("Wuensche loeschen"):
-                st.session_state.wunsch_entries = []
+            with st.popover("Wuensche loeschen"):
+                _clear_wishes(year, month)
         if st.session_state.wunsch_entries:
             st.dataframe(pd.DataFrame(st.session_state.wunsch_entries), use_container_width=True)
 
+    with tab_szenarien:
+        st.caption("Vergleicht Parameter und Urlaubsgenehmigungen fuer den gewaehlten Monat.")
+        limits = st.multiselect(
+            "Max. gleichzeitig frei",
+            list(range(len(doctor_names) + 1)),
+            default=[2, 3, 4],
+            key="scenario_limits",
+        )
+        rest_days = st.multiselect(
+            "Ruhetage vor Wochenend-Nachtdienst",
+            list(range(0, 8)),
+            default=[2, 3, 4],
+            key="scenario_rest_days",
+        )
+        exhaustive = st.checkbox("Alle Kombinationen der Urlaubsgenehmigungen", key="scenario_exhaustive")
+        if st.button("Szenarien berechnen"):
+            variants = approval_variants(
+                fixed=st.session_state.sperr_index.window(*_month_window(year, month)),
+                requests=_urlaub_requests(year, month),
+                exhaustive=exhaustive,
+            )
+            scenarios = scenario_grid(limits, rest_days, variants)
+            started = time.perf_counter()
+            result = run_scenarios(year, month, scenarios, doctors=_roster())
+            st.caption(f"{len(scenarios)} Szenarien in {time.perf_counter() - started:.1f} s berechnet.")
+            if not result.empty:
+                st.dataframe(result, use_container_width=True)
+
+
+def _compute_month_plan(
+    year: int,
+    month: int,
+    absences: Absences,
+    max_parallel_absent: int,
+    engine_label: str,
+    wishes: list[dict[str, str]] | None = None,
+    wish_weight: float = 1.0,
+    doctors: Roster | None = None,
+) -> tuple[pd.DataFrame, pd.DataFrame, list[str]]:
+    plan_df, stats_df, plan_warnings = generate_plan(
+        year=year,
+        month=month,
+        absences=absences,
+        max_parallel_absent=max_parallel_absent,
+        friday_night_rest_days=3,
+        engine="optimize" if engine_label == "Optimierung" else "greedy",
+        metrics=True,
+        wishes=wishes,
+        wish_weight=wish_weight,
+        doctors=doctors,
+    )
+    if engine_label == "Greedy + Nachoptimierung":
+        metrics = plan_df.attrs["metrics"]
+        plan_df, stats_df, plan_warnings = improve_plan(
+            year=year,
+            month=month,
+            plan_df=plan_df,
+            absences=absences,
+            max_parallel_absent=max_parallel_absent,
+            friday_night_rest_days=3,
+            doctors=doctors,
+            wishes=wishes,
+            wish_weight=wish_weight,
+        )
+        plan_df.attrs["metrics"] = metrics
+    return plan_df, stats_df, plan_warnings
+
+
+def _without_attrs(df: pd.DataFrame) -> pd.DataFrame:
+    # Streamlit tries to serialize DataFrame.attrs as JSON, which fails for the
+    # report objects attached by the planner.
+    view = df.copy(deep=False)
+    view.attrs = {}
+    return view
+
+
+def _render_diagnostics(metrics: PlanMetrics) -> None:
+    with st.expander("Diagnose"):
+        phases = pd.DataFrame(
+            [{"Phase": phase, "Dauer_ms": round(seconds * 1000, 2)} for phase, seconds in metrics.phases.items()]
+        )
+        st.dataframe(phases, use_container_width=True)
+        st.write(
+            f"{metrics.picks} Dienstvergaben, {metrics.candidate_evaluations} geprueft, "
+            f"im Mittel {metrics.average_pool:.1f} Kandidaten je Dienst."
+        )
+        rejected = pd.DataFrame([{"Regel": rule, "Abgelehnt": count} for rule, count in metrics.rejected.items()])
+        st.dataframe(rejected, use_container_width=True)
+
+
+def _generate(
+    year: int,
+    month: int,
+    max_parallel_absent: int,
+    planning_range: str,
+    engine_label: str,
+    keep_stable: bool,
+    wish_weight: float,
+) -> dict:
+    # Everything the plan view shows is computed here once; the fragments
+    # only render what is kept in session state.
+    unavailable, unavailable_df = _structured_unavailable()
+    roster = _roster()
+    wishes = list(st.session_state.wunsch_entries)
+    wish_key = tuple(sorted((wish["Datum"], wish["Arzt"], wish["Wunsch"]) for wish in wishes))
+    if planning_range == "Ganzes Jahr":
+        horizon = generate_horizon(
+            start=date(year, 1, 1),
+            end=date(year, 12, 31),
+            absences=unavailable,
+            max_parallel_absent=max_parallel_absent,
+            friday_night_rest_days=3,
+            doctors=roster,
+            metrics=True,
+            wishes=wishes,
+            wish_weight=wish_weight,
+        )
+        plan_df, stats_df, plan_warnings = horizon.plan_df, horizon.stats_df, horizon.warnings
+        assignments = horizon.assignments
+        months = [
+            (f"{view_month:02d}/{view_year}", *horizon.month(view_year, view_month)[:2])
+            for view_year, view_month in horizon.months
+        ]
+        period = str(year)
+    else:
+        state_key = (year, month, max_parallel_absent, engine_label, wish_weight, wish_key, roster.fingerprint)
+        previous = st.session_state.get("last_plan")
+        month_absences = unavailable.window(*_month_window(year, month))
+        inputs = dict(
+            doctors=roster,
+            year=year,
+            month=month,
+            max_parallel_absent=max_parallel_absent,
+            friday_night_rest_days=3,
+            engine=engine_label,
+            wishes=wish_key,
+            wish_weight=wish_weight,
+        )
+        added = removed = None
+        if keep_stable and previous is not None and previous["key"] == state_key:
+            added, removed = absence_delta(previous["absences"], month_absences)
+        # The month plan only reads the absences of its window, so changes in
+        # other months keep its cache entry.
+        if added is None:
+            cache_key = plan_key(month_absences, **inputs)
+            plan_df, stats_df, plan_warnings = _plan_cache().get_or_compute(
+                cache_key,
+                lambda: _compute_month_plan(
+                    year, month, month_absences, max_parallel_absent, engine_label, wishes, wish_weight, roster
+                ),
+            )
+        elif not added and not removed:
+            cache_key = previous["cache_key"]
+            plan_df, stats_df, plan_warnings = previous["result"]
+        else:
+            # A stable plan depends on the plan it was repaired from, which
+            # the key of that plan stands for.
+            cache_key = plan_key(month_absences, stable_from=previous["cache_key"], **inputs)
+            plan_df, stats_df, plan_warnings = _plan_cache().get_or_compute(
+                cache_key,
+                lambda: replan(
+                    year=year,
+                    month=month,
+                    plan_df=previous["result"][0],
+                    absences=previous["absences"],
+                    max_parallel_absent=max_parallel_absent,
+                    friday_night_rest_days=3,
+                    added=added,
+                    removed=removed,
+                    compare_full=False,
+                    doctors=roster,
+                ),
+            )
+        st.session_state.last_plan = {
+            "key": state_key,
+            "cache_key": cache_key,
+            "result": (plan_df, stats_df, plan_warnings),
+            "absences": month_absences,
+        }
+        assignments = plan_assignments(plan_df)
+        months = None
+        period = f"{year}-{month:02d}"
+
+    return _plan_result(period, plan_df, stats_df, plan_warnings, assignments, months, unavailable_df, wishes)
+
+
+def _plan_result(
+    period: str,
+    plan_df: pd.DataFrame,
+    stats_df: pd.DataFrame,
+    plan_warnings: list[str],
+    assignments: pd.DataFrame,
+    months: list[tuple[str, pd.DataFrame, pd.DataFrame | None]] | None,
+    unavailable_df: pd.DataFrame,
+    wishes: list[dict[str, str]],
+) -> dict:
+    file_name = f"dienstplan_{period.replace('-', '_')}.csv"
+    stem = file_name.removesuffix(".csv")
+    return {
+        "period": period,
+        "plan_df": _without_attrs(plan_df),
+        "stats_df": stats_df,
+        "plan_warnings": plan_warnings,
+        "months": months,
+        "warnings": plan_warnings + _wish_conflicts(plan_df),
+        "unavailable_df": unavailable_df,
+        # Recomputed here because replanning and the local search do not
+        # carry the planner's wish report along.
+        "wishes": wish_report(plan_df, wishes) if wishes else None,
+        "solver": plan_df.attrs.get("solver"),
+        "replan": plan_df.attrs.get("replan"),
+        "local_search": plan_df.attrs.get("local_search"),
+        "metrics": plan_df.attrs.get("metrics"),
+        "downloads": [
+            ("CSV herunterladen", plan_df.to_csv(index=False).encode("utf-8"), file_name, "text/csv"),
+            (
+                "Parquet herunterladen",
+                export_table(assignments, "parquet"),
+                f"{stem}.parquet",
+                "application/vnd.apache.parquet",
+            ),
+            (
+                "Arrow herunterladen",
+                export_table(assignments, "arrow"),
+                f"{stem}.arrow",
+                "application/vnd.apache.arrow.file",
+            ),
+        ],
+    }
+
+
+@st.fragment
+def _render_plan_view() -> None:
+    result = st.session_state.plan_result
+    if result["warnings"]:
+        st.warning("Hinweise / Konflikte:")
+        for warning in result["warnings"]:
+            st.write(f"- {warning}")
+
+    if not result["unavailable_df"].empty:
+        st.subheader("Harte Abwesenheiten (Urlaub + Sperrtage)")
+        st.dataframe(result["unavailable_df"], use_container_width=True)
+
+    report = result["solver"]
+    if report is not None:
+        st.caption(
+            f"Optimierung: {report.nodes} Knoten in {report.solve_seconds:.2f} s, "
+            f"Zielwert {report.initial_objective:.0f} -> {report.objective:.0f}."
+        )
+
+    fulfilment = result["wishes"]
+    if fulfilment is not None:
+        st.caption(f"Wuensche erfuellt: {fulfilment.fulfilled} von {fulfilment.total} ({fulfilment.rate:.0%}).")
+
+    replan_report = result["replan"]
+    if replan_report is not None:
+        caption = (
+            f"Stabil neu geplant: {replan_report.changed_cells} geaenderte Felder in "
+            f"{replan_report.solve_seconds * 1000:.0f} ms"
+        )
+        if replan_report.full_changed_cells is not None:
+            caption += f" (komplette Neuplanung: {replan_report.full_changed_cells} Felder)"
+        st.caption(caption + ".")
+
+    cache_stats = _plan_cache().stats
+    st.caption(f"Plan-Cache: {cache_stats.hits + cache_stats.disk_hits} Treffer, {cache_stats.misses} Fehlgriffe.")
+
+    search = result["local_search"]
+    if search is not None:
+        st.caption(
+            f"Nachoptimierung: {search.moves} Zuege in {search.solve_seconds:.2f} s, "
+            f"offene Dienste {search.initial_unfilled} -> {search.unfilled}."
+        )
+
+    if result["metrics"] is not None:
+        _render_diagnostics(result["metrics"])
+
+    if result["months"] is None:
+        st.subheader("Monatsplan")
+        st.dataframe(result["plan_df"], use_container_width=True)
+    else:
+        st.subheader("Jahresplan")
+        month_tabs = st.tabs([label for label, _, _ in result["months"]])
+        for tab, (_, month_plan_df, month_stats_df) in zip(month_tabs, result["months"]):
+            with tab:
+                st.dataframe(_without_attrs(month_plan_df), use_container_width=True)
+                if month_stats_df is not None:
+                    st.caption("Dienste in diesem Monat")
+                    st.dataframe(month_stats_df, use_container_width=True)
+
+    if st.button("Plan speichern"):
+        version = _store().save_plan(
+            result["period"], result["plan_df"], result["stats_df"], result["plan_warnings"]
+        )
+        st.success(f"Plan {result['period']} als Version {version} gespeichert.")
+
+    for column, (label, data, file_name, mime) in zip(st.columns(len(result["downloads"])), result["downloads"]):
+        with column:
+            st.download_button(label=label, data=data, file_name=file_name, mime=mime, on_click="ignore")
+
+
+def _render_saved_plans(period: str) -> None:
+    versions = _store().plan_versions(period)
+    if not versions:
+        return
+    with st.expander(f"Gespeicherte Plaene {period}"):
+        labels = {f"Version {entry.version} ({entry.created_at})": entry.version for entry in reversed(versions)}
+        choice = st.selectbox("Version", list(labels), key="saved_plan_version")
+        if st.button("Plan laden"):
+            plan_df, stats_df, plan_warnings = _store().load_plan(period, labels[choice])
+            months = None
+            if len(period) == 4:
+                months = [
+                    (f"{month:02d}/{period}", plan_df[plan_df["Datum"].str.startswith(f"{period}-{month:02d}")], None)
+                    for month in range(1, 13)
+                ]
+            st.session_state.plan_result = _plan_result(
+                period,
+                plan_df,
+                stats_df,
+                plan_warnings,
+                plan_assignments(plan_df),
+                months,
+                _structured_unavailable()[1],
+                list(st.session_state.wunsch_entries),
+            )
+
+
+@st.fragment
+def _render_statistics() -> None:
+    st.subheader("Fairness-Statistik")
+    st.dataframe(st.session_state.plan_result["stats_df"], use_container_width=True)
+
 
 def render_app() -> None:
     st.set_page_config(page_title="Dienstplanung Chirurgie", layout="wide")
@@ -233,48 +648,44 @@ def render_app() -> None:
             st.number_input(
                 "Max. gleichzeitig frei",
                 min_value=0,
-                max_value=len(DOCTORS),
+                max_value=len(_roster()),
                 value=3,
                 step=1,
             )
         )
 
+    col1, col2 = st.columns(2)
+    with col1:
+        planning_range = st.radio("Planungszeitraum", ["Monat", "Ganzes Jahr"], horizontal=True)
+    with col2:
+        engine_label = st.radio("Verfahren", ["Greedy", "Greedy + Nachoptimierung", "Optimierung"], horizontal=True)
+
+    keep_stable = st.checkbox(
+        "Bestehenden Plan stabil halten",
+        value=True,
+        help="Bei geaenderten Abwesenheiten werden nur betroffene Dienste neu vergeben.",
+    )
+    wish_weight = st.slider(
+        "Gewicht der Wuensche",
+        min_value=0.0,
+        max_value=5.0,
+        value=1.0,
+        step=0.5,
+        help="Ein Wunsch mit Gewicht 1 wiegt so viel wie ein Dienst je Vollzeitstelle. 0 = reine Greedy-Planung.",
+    )
+
     st.markdown("**Urlaub, Sperrtage und Wuensche**")
     _render_constraints_ui(year, month)
 
     if st.button("Plan generieren", type="primary"):
-        unavailable, unavailable_df = _structured_unavailable()
-        plan_df, stats_df, plan_warnings = generate_plan(
-            year=year,
-            month=month,
-            absences=unavailable,
-            max_parallel_absent=max_parallel_absent,
-            friday_night_rest_days=3,
-        )
-        warnings = plan_warnings + _wish_conflicts(plan_df)
-
-        if warnings:
-            st.warning("Hinweise / Konflikte:")
-            for warning in warnings:
-                st.write(f"- {warning}")
-
-        if not unavailable_df.empty:
-            st.subheader("Harte Abwesenheiten (Urlaub + Sperrtage)")
-            st.dataframe(unavailable_df, use_container_width=True)
-
-        st.subheader("Monatsplan")
-        st.dataframe(plan_df, use_container_width=True)
-
-        st.subheader("Fairness-Statistik")
-        st.dataframe(stats_df, use_container_width=True)
-
-        csv_data = plan_df.to_csv(index=False).encode("utf-8")
-        st.download_button(
-            label="CSV herunterladen",
-            data=csv_data,
-            file_name=f"dienstplan_{year}_{month:02d}.csv",
-            mime="text/csv",
+        st.session_state.plan_result = _generate(
+            year, month, max_parallel_absent, planning_range, engine_label, keep_stable, wish_weight
         )
+    _render_saved_plans(str(year) if planning_range == "Ganzes Jahr" else f"{year}-{month:02d}")
+    if "plan_result" in st.session_state:
+        _render_plan_view()
+        _render_statistics()
 
     st.markdown("**Aerztestamm**")
-    st.dataframe(_doctor_overview(), use_container_width=True)
+    roster = _roster()
+    st.dataframe(_doctor_overview(roster.fingerprint, roster), use_container_width=True)
@@ -0,0 +1,271 @@
+from __future__ import annotations
+
+from datetime import date, timedelta
+from typing import Sequence
+
+import numpy as np
+import pandas as pd
+
+from absences import AbsenceIndex, Absences
+from models import CAPABILITIES, Doctor, Roster, compile_roster
+from shifts import ShiftType, check_shift_types, plan_columns
+
+RULES = (
+    "unbekannt",
+    "qualifikation",
+    "abwesend",
+    "doppelt_eingeteilt",
+    "dienstblock",
+    "frei_nach_dienst",
+    "ruhetage_vor_wochenende",
+    "wochenend_limit",
+)
+RULE_TYPES = pd.CategoricalDtype(list(RULES))
+VIOLATION_COLUMNS = ["Datum", "Arzt", "Dienst", "Regel", "Meldung"]
+
+
+def _absent_matrix(absences: Absences, index: dict[str, int], first: date, n_days: int) -> np.ndarray:
+    absent = np.zeros((len(index), n_days), dtype=bool)
+    if isinstance(absences, AbsenceIndex):
+        absences = absences.window(first, first + timedelta(days=n_days - 1))
+    for day, names in absences.items():
+        col = (day - first).days
+        if 0 <= col < n_days:
+            for name in names:
+                if name in index:
+                    absent[index[name], col] = True
+    return absent
+
+
+def _shifted(mask: np.ndarray, offset: int) -> np.ndarray:
+    # Moves a doctor x day mask ``offset`` days later (earlier if negative).
+    shifted = np.zeros_like(mask)
+    if offset >= 0:
+        shifted[:, offset:] = mask[:, : mask.shape[1] - offset]
+    else:
+        shifted[:, :offset] = mask[:, -offset:]
+    return shifted
+
+
+def _violation_frame(rows: list[tuple[int, str, str, str, str]], calendar: list[date]) -> pd.DataFrame:
+    rows = sorted(rows, key=lambda row: (row[0], RULES.index(row[3]), row[1]))
+    violations = pd.DataFrame(
+        {
+            "Datum": [calendar[row[0]].isoformat() for row in rows],
+            "Arzt": [row[1] for row in rows],
+            "Dienst": [row[2] for row in rows],
+            "Regel": pd.Categorical([row[3] for row in rows], dtype=RULE_TYPES),
+            "Meldung": [f"{calendar[row[0]].isoformat()} ({row[1]}): {row[4]}" for row in rows],
+        },
+        columns=VIOLATION_COLUMNS,
+    )
+    return violations
+
+
+def _block_starts(shift_type: ShiftType, weekday: np.ndarray, planned: np.ndarray, complete: bool) -> np.ndarray:
+    # First block days whose anchor falls on one of the shift's weekdays; with
+    # ``complete`` only blocks whose whole span lies in the plan.
+    n_days = len(weekday)
+    starts = np.flatnonzero(np.isin((weekday - shift_type.start) % 7, shift_type.weekdays) & planned)
+    if not complete:
+        return starts
+    anchors = starts - shift_type.start
+    keep = anchors >= 0
+    for offset in range(shift_type.reach):
+        cols = anchors + offset
+        keep &= (cols < n_days) & planned[np.clip(cols, 0, n_days - 1)]
+    return starts[keep]
+
+
+def verify_plan(
+    plan_df: pd.DataFrame,
+    absences: Absences,
+    friday_night_rest_days: int = 3,
+    doctors: list[Doctor] | Roster | None = None,
+    shift_types: Sequence[ShiftType] | None = None,
+) -> pd.DataFrame:
+    """Checks a wide plan against the hard rules and lists every violation.
+
+    Works on any plan (greedy, optimized, replanned or edited by hand), one
+    row per broken rule, doctor and day with the rule from :data:`RULES`.
+    The rules follow ``shift_types`` (by default the usual shifts): doctors
+    missing from the roster, duties without the shift's capability (e.g.
+    Tagdienst: ``can_day``, Visitendienst: ``can_visit``, the rest
+    ``can_full_service``), duties on absent days, two duties on one day,
+    blocks split between doctors (the Fr/Sa/So night, the Sa/So day and
+    visit shifts), duties on the days off after a block (the next day after
+    a weekday night, Monday after a weekend night, Wednesday after a
+    weekend day shift), on-call duties in the ``friday_night_rest_days``
+    before a weekend night and more weekends per calendar month of the
+    Saturday than ``max_weekends_per_month``. Days off and rest windows that
+    fall outside the plan are not checked; unfilled slots are not
+    violations, the planner reports them as warnings.
+    """
+    shift_types = check_shift_types(shift_types)
+    columns = plan_columns(shift_types)
+    code_of = {shift_type.key: columns.index(shift_type.column) for shift_type in shift_types}
+    split = {shift_type.column for shift_type in shift_types if shift_type.staff_all}
+    roster = compile_roster(doctors)
+    index = roster.index
+    dates = [date.fromisoformat(day) for day in plan_df["Datum"]]
+    if not dates:
+        return _violation_frame([], [])
+    first = min(dates)
+    n_days = (max(dates) - first).days + 1
+    calendar = [first + timedelta(days=col) for col in range(n_days)]
+    weekday = np.array([day.weekday() for day in calendar])
+    planned = np.zeros(n_days, dtype=bool)
+    planned[[(day - first).days for day in dates]] = True
+
+    rows: list[tuple[int, str, str, str, str]] = []
+
+    def report(rule: str, doc_idx, cols, duties, messages) -> None:
+        for idx, col, duty, message in zip(doc_idx, cols, duties, messages):
+            rows.append((int(col), roster.names[idx], duty, rule, message))
+
+    # The wide cells are read directly; a month has only ~150 of them, far
+    # fewer than building the long table costs.
+    held = np.zeros((len(roster), n_days, len(columns)), dtype=np.int16)
+    day_cols = [(day - first).days for day in dates]
+    for code, column in enumerate(columns):
+        for col, cell in zip(day_cols, plan_df[column].tolist()):
+            if not isinstance(cell, str) or not cell:
+                continue
+            for name in cell.split(",") if column in split else (cell,):
+                name = name.strip()
+                if name in index:
+                    held[index[name], col, code] += 1
+                elif name:
+                    rows.append((col, name, column, "unbekannt", "nicht in der Aerzteliste."))
+    on = held > 0
+    working = on.any(axis=2)
+
+    def duty_names(doc_idx, cols) -> list[str]:
+        return [", ".join(columns[code] for code in np.flatnonzero(on[idx, col])) for idx, col in zip(doc_idx, cols)]
+
+    # A cell needs the capability of the shift whose block covers it, or of
+    # the first shift declared for its column.
+    need = np.zeros((n_days, len(columns)), dtype=int)
+    for shift_type in reversed(shift_types):
+        need[:, code_of[shift_type.key]] = CAPABILITIES.index(shift_type.capability)
+    for shift_type in shift_types:
+        starts = _block_starts(shift_type, weekday, planned, complete=False)
+        for offset in range(shift_type.length):
+            cols = starts[starts + offset < n_days] + offset
+            need[cols, code_of[shift_type.key]] = CAPABILITIES.index(shift_type.capability)
+    capable = np.stack([roster.capable[capability] for capability in CAPABILITIES], axis=1)[:, need]
+    doc_idx, cols, codes = np.nonzero(on & ~capable)
+    duties = [columns[code] for code in codes]
+    report("qualifikation", doc_idx, cols, duties, [f"{duty} ohne Qualifikation." for duty in duties])
+
+    absent = _absent_matrix(absences, index, first, n_days)
+    doc_idx, cols = np.nonzero(working & absent)
+    duties = duty_names(doc_idx, cols)
+    report("abwesend", doc_idx, cols, duties, [f"{duty} trotz Abwesenheit." for duty in duties])
+
+    doc_idx, cols = np.nonzero(held.sum(axis=2) > 1)
+    duties = duty_names(doc_idx, cols)
+    report("doppelt_eingeteilt", doc_idx, cols, duties, [f"Mehrere Dienste am selben Tag: {duty}." for duty in duties])
+
+    # Blocks of several days belong to one doctor each. Only blocks that lie
+    # completely in the plan.
+    for shift_type in shift_types:
+        if shift_type.length < 2:
+            continue
+        code, length = code_of[shift_type.key], shift_type.length
+        starts = _block_starts(shift_type, weekday, planned, complete=True)
+        block = sum(on[:, starts + offset, code].astype(int) for offset in range(length))
+        doc_idx, positions = np.nonzero((block > 0) & (block < length))
+        cols = starts[positions]
+        report(
+            "dienstblock",
+            doc_idx,
+            cols,
+            [columns[code]] * len(cols),
+            [
+                f"{shift_type.label} nur an {block[idx, pos]} von {length} Tagen."
+                for idx, pos in zip(doc_idx, positions)
+            ],
+        )
+
+    started = {}
+    for shift_type in shift_types:
+        if not shift_type.staff_all:
+            first_days = np.zeros(n_days, dtype=bool)
+            first_days[_block_starts(shift_type, weekday, planned, complete=False)] = True
+            started[shift_type.key] = on[:, :, code_of[shift_type.key]] & first_days
+
+    # Days off outside the block, the closest cause first.
+    days_off = sorted(
+        (off_day - shift_type.start, position, shift_type)
+        for position, shift_type in enumerate(shift_types)
+        for off_day in shift_type.off_days
+        if not shift_type.start <= off_day < shift_type.start + shift_type.length
+    )
+    for offset, _, shift_type in days_off:
+        doc_idx, cols = np.nonzero(_shifted(started[shift_type.key], offset) & working)
+        duties = duty_names(doc_idx, cols)
+        report(
+            "frei_nach_dienst",
+            doc_idx,
+            cols,
+            duties,
+            [
+                f"{duty} am freien Tag nach {shift_type.label} vom {calendar[col - offset].isoformat()}."
+                for duty, col in zip(duties, cols)
+            ],
+        )
+
+    on_call_codes = sorted({code_of[shift_type.key] for shift_type in shift_types if shift_type.on_call})
+    on_call = on[:, :, on_call_codes].any(axis=2)
+    for shift_type in shift_types:
+        if not shift_type.rest_before:
+            continue
+        for offset in range(1, friday_night_rest_days + 1):
+            doc_idx, cols = np.nonzero(_shifted(started[shift_type.key], -offset) & on_call)
+            duties = duty_names(doc_idx, cols)
+            report(
+                "ruhetage_vor_wochenende",
+                doc_idx,
+                cols,
+                duties,
+                [
+                    f"{duty} {offset} Tag(e) vor {shift_type.label} am {calendar[col + offset].isoformat()}."
+                    for duty, col in zip(duties, cols)
+                ],
+            )
+
+    # Weekends are counted by their Saturday, once per doctor even with
+    # several weekend shifts.
+    by_saturday: dict[int, np.ndarray] = {}
+    for shift_type in shift_types:
+        if not shift_type.weekend:
+            continue
+        code = code_of[shift_type.key]
+        for start in _block_starts(shift_type, weekday, planned, complete=True).tolist():
+            saturday = start + (5 - weekday[start]) % 7
+            holds = on[:, saturday, code] if saturday < n_days else np.zeros(len(roster), dtype=bool)
+            by_saturday[saturday] = by_saturday.get(saturday, np.zeros(len(roster), dtype=bool)) | holds
+    saturdays = np.array(sorted(by_saturday), dtype=int)
+    caps = roster.weekend_caps
+    weekends = np.zeros((len(roster), len(saturdays)), dtype=int)
+    for position, saturday in enumerate(saturdays.tolist()):
+        weekends[:, position] = by_saturday[saturday]
+    months = np.array([calendar[col].year * 12 + calendar[col].month for col in saturdays], dtype=int)
+    for month in np.unique(months):
+        positions = np.flatnonzero(months == month)
+        running = np.cumsum(weekends[:, positions], axis=1)
+        doc_idx, hits = np.nonzero((running > caps[:, None]) & (weekends[:, positions] > 0))
+        cols = saturdays[positions[hits]]
+        report(
+            "wochenend_limit",
+            doc_idx,
+            cols,
+            duty_names(doc_idx, cols),
+            [
+                f"{running[idx, hit]}. Wochenende im Monat (Limit {int(caps[idx])})."
+                for idx, hit in zip(doc_idx, hits)
+            ],
+        )
+
+    return _violation_frame(rows, calendar)
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Iterable, Union
+
+import numpy as np
+import pandas as pd
+
+from plan_table import plan_assignments
+
+# Wish label -> (duty the wish is about, whether it is wanted).
+WISH_TYPES = {
+    "Tagdienst gewuenscht": ("Tagdienst", True),
+    "Nachtdienst gewuenscht": ("Nachtdienst", True),
+    "Visitendienst gewuenscht": ("Visitendienst", True),
+    "Tagdienst nicht gewuenscht": ("Tagdienst", False),
+    "Nachtdienst nicht gewuenscht": ("Nachtdienst", False),
+    "Visitendienst nicht gewuenscht": ("Visitendienst", False),
+}
+# Plan columns that count as the duty of a wish; weekend day shifts are day shifts.
+WISH_DUTY = {
+    "Tagdienst": "Tagdienst",
+    "Wochenend_Tagdienst": "Tagdienst",
+    "Nachtdienst": "Nachtdienst",
+    "Visitendienst": "Visitendienst",
+}
+CONFLICT_KINDS = pd.CategoricalDtype(["nicht_erfuellt", "verletzt"])
+CONFLICT_COLUMNS = ["Datum", "Arzt", "Wunsch", "Dienst", "Konflikt", "Meldung"]
+
+# Wishes come as a DataFrame or as the UI's list of dicts with Datum, Arzt,
+# Wunsch and an optional Gewicht.
+WishInput = Union[pd.DataFrame, Iterable[dict]]
+
+
+def wish_frame(wishes: WishInput, weight: float = 1.0) -> pd.DataFrame:
+    frame = wishes if isinstance(wishes, pd.DataFrame) else pd.DataFrame(list(wishes))
+    if frame.empty:
+        frame = pd.DataFrame(columns=["Datum", "Arzt", "Wunsch"])
+    frame = frame[frame["Wunsch"].isin(WISH_TYPES)].copy()
+    frame["Dienst"] = frame["Wunsch"].map({label: duty for label, (duty, _) in WISH_TYPES.items()})
+    frame["Gewuenscht"] = frame["Wunsch"].map({label: wanted for label, (_, wanted) in WISH_TYPES.items()}).astype(bool)
+    # The optional per-wish Gewicht scales the global weight.
+    if "Gewicht" in frame:
+        frame["Gewicht"] = pd.to_numeric(frame["Gewicht"], errors="coerce").fillna(1.0).astype(float) * weight
+    else:
+        frame["Gewicht"] = float(weight)
+    return frame
+
+
+def _judge(plan_df: pd.DataFrame, frame: pd.DataFrame) -> pd.DataFrame:
+    # Adds "Erfuellt" to every wish on a planned day, keeping wish order.
+    frame = frame[frame["Datum"].isin(plan_df["Datum"])]
+    assigned = plan_assignments(plan_df).astype(str)
+    assigned["Dienst"] = assigned["Dienst"].map(WISH_DUTY)
+    assigned = assigned.dropna(subset=["Dienst"]).drop_duplicates()
+    assigned["Zugeteilt"] = True
+    joined = frame.merge(assigned, on=["Datum", "Arzt", "Dienst"], how="left")
+    joined["Erfuellt"] = joined["Gewuenscht"].to_numpy() == joined["Zugeteilt"].notna().to_numpy()
+    return joined
+
+
+def wish_conflicts(plan_df: pd.DataFrame, wishes: WishInput) -> pd.DataFrame:
+    """Joins the wishes against the plan's assignments in one pass.
+
+    Returns one row per broken wish, in wish order, with the category
+    ``nicht_erfuellt`` (wanted duty missing) or ``verletzt`` (unwanted duty
+    assigned) and the German message. Wishes for days outside the plan are
+    ignored.
+    """
+    joined = _judge(plan_df, wish_frame(wishes))
+    conflicts = joined[~joined["Erfuellt"]].copy()
+    missing = conflicts["Gewuenscht"].to_numpy(dtype=bool)
+    conflicts["Konflikt"] = pd.Categorical(
+        np.where(missing, "nicht_erfuellt", "verletzt"), dtype=CONFLICT_KINDS
+    )
+    prefix = conflicts["Datum"] + " (" + conflicts["Arzt"] + "): "
+    conflicts["Meldung"] = np.where(
+        missing,
+        prefix + "Wunsch nicht erfuellt (kein " + conflicts["Dienst"] + ").",
+        prefix + "Wunsch verletzt (" + conflicts["Dienst"] + " zugeteilt).",
+    )
+    return conflicts[CONFLICT_COLUMNS].reset_index(drop=True)
+
+
+@dataclass(frozen=True)
+class WishReport:
+    total: int
+    fulfilled: int
+    weight_total: float
+    weight_fulfilled: float
+
+    @property
+    def rate(self) -> float:
+        return self.fulfilled / self.total if self.total else 1.0
+
+    @property
+    def weighted_rate(self) -> float:
+        return self.weight_fulfilled / self.weight_total if self.weight_total else 1.0
+
+
+def wish_report(plan_df: pd.DataFrame, wishes: WishInput) -> WishReport:
+    joined = _judge(plan_df, wish_frame(wishes))
+    fulfilled = joined["Erfuellt"]
+    return WishReport(
+        total=len(joined),
+        fulfilled=int(fulfilled.sum()),
+        weight_total=float(joined["Gewicht"].sum()),
+        weight_fulfilled=float(joined.loc[fulfilled, "Gewicht"].sum()),
+    )